@@ -0,0 +1,39 @@
+"""
+Local benchmark of fused lazy expressions against their eager evaluation.
+
+Usage:
+    python -m benchmarks.bench_lazy [rows]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from vectorized2d import Vector2D
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    a, b, c = (np.random.random(size=(n, 2)).view(Vector2D) for _ in range(3))
+    dt = np.random.random(size=n)
+
+    cases = [
+        ('((a - b).normalized() * 3 + c).norm', lambda: ((a - b).normalized() * 3 + c).norm,
+         lambda: ((a.lazy() - b).normalized() * 3 + c).norm.evaluate()),
+        ('a + c.rotated(0.1) * dt', lambda: a + c.rotated(0.1) * dt[:, np.newaxis],
+         lambda: (a.lazy() + c.lazy().rotated(0.1) * dt[:, np.newaxis]).evaluate()),
+        ('(a - b).project_onto(c)', lambda: (a - b).project_onto(c),
+         lambda: (a.lazy() - b).project_onto(c).evaluate()),
+    ]
+
+    print(f'{"expression":>38} {"eager [ms]":>12} {"lazy [ms]":>12} {"speedup":>8}')
+    for name, eager_op, lazy_op in cases:
+        lazy_op()  # compile
+        eager_time = min(timeit.repeat(eager_op, number=1, repeat=3)) * 1e3
+        lazy_time = min(timeit.repeat(lazy_op, number=1, repeat=3)) * 1e3
+        print(f'{name:>38} {eager_time:>12.1f} {lazy_time:>12.1f} {eager_time / lazy_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Local benchmark of the scalar types against the array types, for single element operations.
+
+Usage:
+    python -m benchmarks.bench_scalar [repeats]
+"""
+import sys
+import timeit
+
+from vectorized2d import Coordinate, ScalarCoordinate, ScalarVector2D, Vector2D
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    c1 = Coordinate(lat=33, lon=34, units=Coordinate.Units.DEGREES)
+    c2 = Coordinate(lat=33.1, lon=34.1, units=Coordinate.Units.DEGREES)
+    s1 = ScalarCoordinate(lat=33, lon=34, units=ScalarCoordinate.Units.DEGREES)
+    s2 = ScalarCoordinate(lat=33.1, lon=34.1, units=ScalarCoordinate.Units.DEGREES)
+    v = Vector2D(magnitude=1, direction=1)
+    sv = ScalarVector2D.from_polar(1, 1)
+
+    cases = [
+        ('construct coordinate', lambda: Coordinate(lat=33, lon=34, units=Coordinate.Units.DEGREES),
+         lambda: ScalarCoordinate(lat=33, lon=34, units=ScalarCoordinate.Units.DEGREES)),
+        ('geo_dist', lambda: c1.geo_dist(c2), lambda: s1.geo_dist(s2)),
+        ('geo_dist_and_bearing', lambda: c1.geo_dist_and_bearing(c2), lambda: s1.geo_dist_and_bearing(s2)),
+        ('shifted', lambda: c1.shifted(geo_dist=1000, bearing=1), lambda: s1.shifted(geo_dist=1000, bearing=1)),
+        ('construct vector', lambda: Vector2D(magnitude=1, direction=1), lambda: ScalarVector2D.from_polar(1, 1)),
+        ('rotated', lambda: v.rotated(1), lambda: sv.rotated(1)),
+    ]
+
+    print(f'{"operation":>22} {"array [us]":>12} {"scalar [us]":>12} {"speedup":>8}')
+    for name, array_op, scalar_op in cases:
+        array_op(), scalar_op()  # compile
+        array_time = min(timeit.repeat(array_op, number=repeats, repeat=3)) / repeats * 1e6
+        scalar_time = min(timeit.repeat(scalar_op, number=repeats, repeat=3)) / repeats * 1e6
+        print(f'{name:>22} {array_time:>12.3f} {scalar_time:>12.3f} {array_time / scalar_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
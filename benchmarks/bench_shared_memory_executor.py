@@ -0,0 +1,49 @@
+"""
+Local benchmark of SharedMemoryExecutor scaling across cores.
+
+Usage:
+    python -m benchmarks.bench_shared_memory_executor [n_points] [m_points]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from vectorized2d import Coordinate, Point2D
+from vectorized2d.executor import SharedMemoryExecutor
+
+
+def _bench(executor: SharedMemoryExecutor, method: str, a, b, radius: float) -> float:
+    getattr(executor, method)(a[:10], b[:10], radius=radius)  # warm up the worker processes (and the JIT)
+    start = time.perf_counter()
+    getattr(executor, method)(a, b, radius=radius)
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    points = Point2D(np.random.random(size=(n, 2)))
+    other_points = Point2D(np.random.random(size=(m, 2)))
+    coordinates = Coordinate(lat=33 + np.random.random(size=(n,)), lon=34 + np.random.random(size=(n,)),
+                             units=Coordinate.Units.DEGREES)
+    other_coordinates = Coordinate(lat=33 + np.random.random(size=(m,)), lon=34 + np.random.random(size=(m,)),
+                                   units=Coordinate.Units.DEGREES)
+
+    print(f'{n} x {m} pairwise reductions')
+    print(f'{"workers":>8} {"euclid [s]":>12} {"speedup":>8} {"geo [s]":>12} {"speedup":>8}')
+    baseline = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with SharedMemoryExecutor(max_workers=workers) as executor:
+            euclid = _bench(executor, 'euclid_dist_reduce', points, other_points, radius=0.01)
+            geo = _bench(executor, 'geo_dist_reduce', coordinates, other_coordinates, radius=1_000)
+        baseline = baseline or (euclid, geo)
+        print(f'{workers:>8} {euclid:>12.3f} {baseline[0] / euclid:>8.2f} {geo:>12.3f} {baseline[1] / geo:>8.2f}')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Local benchmark of ThreadedExecutor throughput scaling across threads (the kernels release the GIL).
+
+Usage:
+    python -m benchmarks.bench_threaded_executor [rows] [operations]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from vectorized2d import Coordinate
+from vectorized2d.executor import ThreadedExecutor
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n_operations = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    c1 = Coordinate(lat=np.random.random(size=(n,)), lon=np.random.random(size=(n,)))
+    c2 = Coordinate(lat=np.random.random(size=(n,)), lon=np.random.random(size=(n,)))
+    c1[:10].geo_dist(c2[:10])  # compile
+
+    print(f'{n_operations} x geo_dist of {n} coordinates')
+    print(f'{"threads":>8} {"ops/s":>10} {"speedup":>8}')
+    baseline = None
+    n_threads = 1
+    while n_threads <= (os.cpu_count() or 1):
+        with ThreadedExecutor(max_workers=n_threads) as executor:
+            start = time.perf_counter()
+            executor.map(Coordinate.geo_dist, [c1] * n_operations, [c2] * n_operations)
+            throughput = n_operations / (time.perf_counter() - start)
+        baseline = baseline or throughput
+        print(f'{n_threads:>8} {throughput:>10.2f} {throughput / baseline:>8.2f}')
+        n_threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""
+Reference implementations shared by the tests of several modules.
+"""
+import numpy as np
+
+
+def brute_force_dbscan(dists, eps, min_samples):
+    # the DBSCAN labels of a dense distance matrix (border points join the cluster of their nearest core point)
+    neighbours = dists <= eps
+    is_core = neighbours.sum(axis=1) >= min_samples
+    labels = np.full(len(dists), -1)
+    n_clusters = 0
+    for i in np.flatnonzero(is_core):
+        if labels[i] >= 0:
+            continue
+        labels[i] = n_clusters
+        stack = [i]
+        while stack:
+            for j in np.flatnonzero(neighbours[stack.pop()] & is_core):
+                if labels[j] < 0:
+                    labels[j] = n_clusters
+                    stack.append(j)
+        n_clusters += 1
+    for i in np.flatnonzero(~is_core):
+        cores = np.flatnonzero(neighbours[i] & is_core)
+        if len(cores) > 0:
+            labels[i] = labels[cores[np.argmin(dists[i, cores])]]
+    return labels
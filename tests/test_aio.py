@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from vectorized2d import Coordinate, Point2D
+from vectorized2d.aio import AsyncExecutor
+
+
+def _rand_coordinates(n):
+    return Coordinate(lat=33 + np.random.random(size=(n,)), lon=34 + np.random.random(size=(n,)),
+                      units=Coordinate.Units.DEGREES)
+
+
+def test_async_geo_dist_and_bearing():
+    c1 = _rand_coordinates(1000)
+    c2 = _rand_coordinates(1000)
+
+    async def main():
+        async with AsyncExecutor(max_workers=4, chunk_size=128) as executor:
+            return (await executor.geo_dist_and_bearing(c1, c2), await executor.geo_dist(c1, c2[0]),
+                    await executor.shifted(c1, geo_dist=1000, bearing=np.ones(len(c1))))
+
+    (dists, bearings), one_to_many_dists, shifted = asyncio.run(main())
+
+    assert np.array_equal(dists, c1.geo_dist(c2))
+    assert np.array_equal(bearings, c1.bearing(c2))
+    assert np.array_equal(one_to_many_dists, c1.geo_dist(c2[0]))
+    assert shifted == c1.shifted(geo_dist=1000, bearing=1)
+
+
+def test_async_euclid_dist():
+    p1 = Point2D(np.random.random(size=(300, 2)))
+    p2 = Point2D(np.random.random(size=(300, 2)))
+
+    async def main():
+        async with AsyncExecutor(max_workers=4, chunk_size=64) as executor:
+            return (await executor.euclid_dist(p1, p2),
+                    await executor.euclid_dist(p1, p2, pairing=Point2D.Pairing.ALIGNED))
+
+    dists, aligned_dists = asyncio.run(main())
+
+    assert np.array_equal(dists, p1.euclid_dist(p2))
+    assert np.array_equal(aligned_dists, p1.euclid_dist(p2, pairing=Point2D.Pairing.ALIGNED))
+
+
+def test_async_prepared_queries():
+    prepared = _rand_coordinates(2000).prepare()
+    query = _rand_coordinates(500)
+
+    async def main():
+        async with AsyncExecutor(max_workers=4, chunk_size=64) as executor:
+            return (await executor.argmin_geo_dist(prepared, query),
+                    await executor.within_radius(prepared, query, radius=5_000))
+
+    argmins, (offsets, indices, dists) = asyncio.run(main())
+    assert len(prepared._memo) == 0  # the chunks of the queries are not memoized
+    expected_offsets, expected_indices, expected_dists = prepared.within_radius(query, radius=5_000)
+
+    assert np.array_equal(argmins, prepared.argmin_geo_dist(query))
+    assert np.array_equal(offsets, expected_offsets)
+    assert np.array_equal(indices, expected_indices)
+    assert np.array_equal(dists, expected_dists)
+
+
+def test_async_dist_reduce():
+    c1 = _rand_coordinates(500)
+    c2 = _rand_coordinates(300)
+    dists = c1.repeat(len(c2)).geo_dist(c2.tile(len(c1))).reshape(len(c1), len(c2))
+
+    async def main():
+        async with AsyncExecutor(max_workers=4, chunk_size=64) as executor:
+            return await executor.geo_dist_reduce(c1, c2, radius=10_000)
+
+    reduction = asyncio.run(main())
+
+    assert np.allclose(reduction.min_dist, dists.min(axis=1))
+    assert np.array_equal(reduction.argmin, dists.argmin(axis=1))
+    assert np.array_equal(reduction.count_within, (dists <= 10_000).sum(axis=1))
+
+
+def test_async_cancellation():
+    started = []
+
+    def slow_chunk(a):
+        started.append(len(a))
+        time.sleep(0.05)
+        return a
+
+    async def main():
+        async with AsyncExecutor(max_workers=1, chunk_size=1) as executor:
+            task = asyncio.ensure_future(executor.split(slow_chunk, np.arange(100)))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(main())
+
+    assert 0 < len(started) < 100
+
+
+def test_async_exit_does_not_block_the_loop():
+    started, released = threading.Event(), threading.Event()
+
+    def blocking_chunk(a):
+        started.set()
+        # released from the event loop - which must keep running while the executor shuts down
+        return np.full(len(a), released.wait(timeout=5))
+
+    async def release():
+        await asyncio.sleep(0.05)
+        released.set()
+
+    async def main():
+        async with AsyncExecutor(max_workers=1) as executor:
+            task = asyncio.ensure_future(executor.split(blocking_chunk, np.arange(10)))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            releaser = asyncio.ensure_future(release())
+        await releaser
+        return await task
+
+    assert np.all(asyncio.run(main()))
+
+
+def test_async_memory_budget():
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+
+    def tracked_chunk(a):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return a
+
+    async def main():
+        async with AsyncExecutor(max_workers=4, chunk_size=10, max_in_flight_bytes=2 * 10 * 8) as executor:
+            return await asyncio.gather(*(executor.split(tracked_chunk, np.arange(50), row_bytes=8) for _ in range(3)))
+
+    results = asyncio.run(main())
+
+    assert all(np.array_equal(result, np.arange(50)) for result in results)
+    assert max_in_flight[0] == 2
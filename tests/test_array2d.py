@@ -1,8 +1,10 @@
+import pickle
 import random
 
 import numpy as np
+import pytest
 
-from vectorized2d import Array2D
+from vectorized2d import Array2D, array2d
 
 
 def test_construct_single_2d_array_from_array():
@@ -186,3 +188,161 @@ def test_hash():
     is_hash_equal = hash(a1) == hash(a2)
 
     assert is_equal == is_hash_equal
+
+
+def test_pickle():
+    a = np.random.random(size=(random.randint(1, 1000), 2)).view(Array2D)
+
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        unpickled = pickle.loads(pickle.dumps(a, protocol=protocol))
+        assert type(unpickled) is Array2D
+        assert unpickled == a
+
+
+def test_pickle_out_of_band_buffers():
+    a = np.random.random(size=(random.randint(1, 1000), 2)).view(Array2D)
+    a_fortran = np.asfortranarray(a).view(Array2D)
+
+    for array in (a, a_fortran):
+        buffers = []
+        pickled = pickle.dumps(array, protocol=5, buffer_callback=buffers.append)
+        unpickled = pickle.loads(pickled, buffers=buffers)
+
+        assert len(buffers) == 1
+        assert len(pickled) < array.nbytes
+        assert unpickled == array
+        assert np.shares_memory(unpickled, array)
+
+
+def test_take():
+    a = np.random.random(size=(1000, 2)).view(Array2D)
+    indices = np.random.randint(-len(a), len(a), size=500)
+    out = np.empty((len(indices), 2))
+
+    taken = a.take(indices, out=out)
+
+    assert type(taken) is Array2D
+    assert np.shares_memory(taken, out)
+    assert np.array_equal(taken, a.view(np.ndarray)[indices])
+    assert a.take(3) == a[3]
+    with pytest.raises(IndexError):
+        a.take([len(a)])
+    for mode in ('clip', 'wrap'):
+        out_of_bounds = [-len(a) - 3, len(a) + 5, 1]
+        expected = np.take(a.view(np.ndarray), out_of_bounds, axis=0, mode=mode)
+        assert a.take(out_of_bounds, mode=mode).shape == (3, 2)
+        assert np.array_equal(a.take(out_of_bounds, mode=mode), expected)
+
+
+def test_compress():
+    a = np.random.random(size=(200_000, 2)).view(Array2D)
+    mask = np.random.random(size=len(a)) < 0.3
+
+    compressed = a.compress(mask)
+
+    assert type(compressed) is Array2D
+    assert np.array_equal(compressed, a.view(np.ndarray)[mask])
+    assert len(a.compress(np.zeros(len(a), dtype=bool))) == 0
+
+
+def test_put():
+    a = np.random.random(size=(100, 2)).view(Array2D)
+    expected = a.copy().view(np.ndarray)
+    indices = [3, -1, 3]
+    values = np.random.random(size=(3, 2))
+    expected[indices] = values
+
+    a.put(indices, values)
+
+    assert np.array_equal(a, expected)
+    a.put([0, 1], [7, 8])
+    assert np.array_equal(a[:2], Array2D([[7, 8], [7, 8]]))
+    for mode, written_rows in (('clip', [0, len(a) - 1]), ('wrap', [len(a) - 3, 5])):
+        a.put([-3, len(a) + 5], [[1, 2], [3, 4]], mode=mode)
+        assert np.array_equal(a[written_rows], Array2D([[1, 2], [3, 4]]))
+
+
+def test_argsort_by():
+    a = np.random.random(size=(1000, 2)).view(Array2D)
+
+    sorted_a, order = a.argsort_by(lambda array: array.x2)
+
+    assert type(sorted_a) is Array2D
+    assert np.array_equal(order, np.argsort(a.x2, kind='stable'))
+    assert np.array_equal(sorted_a, a.view(np.ndarray)[order])
+    assert np.all(np.diff(sorted_a.x2) >= 0)
+
+
+def test_statistics():
+    a = (np.random.random(size=(1000, 2)) * 10 + 1e6).view(Array2D)
+    weights = np.random.random(size=len(a))
+    values = a.view(np.ndarray)
+
+    statistics = a.statistics(weights=weights)
+
+    assert statistics.count == len(a)
+    assert np.isclose(statistics.weight, weights.sum())
+    assert np.array_equal(statistics.bbox_min, values.min(axis=0))
+    assert np.array_equal(statistics.bbox_max, values.max(axis=0))
+    assert np.allclose(statistics.centroid, np.average(values, axis=0, weights=weights))
+    assert np.allclose(statistics.covariance, np.cov(values.T, aweights=weights, bias=True))
+    assert np.isclose(statistics.dispersion, np.sqrt(np.trace(statistics.covariance)))
+
+
+def test_group_statistics():
+    a = np.random.random(size=(200_000, 2)).view(Array2D)
+    labels = np.random.randint(0, 10, size=len(a))
+
+    statistics = a.group_statistics(labels, n_groups=11)
+
+    for group in range(10):
+        values = a.view(np.ndarray)[labels == group]
+        assert statistics.count[group] == len(values)
+        assert np.allclose(statistics.centroid[group], values.mean(axis=0))
+        assert np.allclose(statistics.covariance[group], np.cov(values.T, bias=True))
+        assert np.array_equal(statistics.bbox_max[group], values.max(axis=0))
+    assert statistics.count[10] == 0
+    assert np.all(np.isnan(statistics.centroid[10]))
+    with pytest.raises(IndexError):
+        a.group_statistics(labels, n_groups=5)
+    # the chunk moments are merged per group - as a single chunk of all the rows
+    chunked = Array2D._group_moments(a.view(np.ndarray), np.empty(0), labels, 11, 4)
+    assert np.allclose(chunked, Array2D._group_moments(a.view(np.ndarray), np.empty(0), labels, 11, 1))
+    # with about a row per group, the rows are not split into chunks (of accumulators of all the groups)
+    assert array2d._n_group_chunks(len(a), len(a)) == 1
+
+
+def test_interpolate():
+    offsets = np.array([0, 50, 50, 120])
+    a = np.random.random(size=(120, 2)).view(Array2D)
+    times = np.concatenate([np.sort(np.random.random(size=50)) * 10, np.sort(np.random.random(size=70)) * 20])
+    query_times = np.linspace(-1, 21, 500)
+
+    interpolated = a.interpolate(times, query_times, offsets=offsets)
+
+    assert interpolated.shape == (3 * len(query_times), 2)
+    for track in range(3):
+        start, end = offsets[track], offsets[track + 1]
+        block = interpolated[track * len(query_times):(track + 1) * len(query_times)].view(np.ndarray)
+        if start == end:
+            assert np.all(np.isnan(block))
+            continue
+        track_times = times[start:end]
+        inside = (query_times >= track_times[0]) & (query_times <= track_times[-1])
+        for axis in range(2):
+            expected = np.interp(query_times[inside], track_times, a.view(np.ndarray)[start:end, axis])
+            assert np.allclose(block[inside, axis], expected)
+        assert np.all(np.isnan(block[~inside]))
+
+
+def test_interpolate_with_query_offsets():
+    a = Array2D([[0., 0.], [1., 2.], [10., 10.], [20., 0.]])
+    times = np.array([0., 1., 0., 2.])
+
+    interpolated = a.interpolate(times, [0.5, 1., 1.5, 0.5], offsets=[0, 2, 4], query_offsets=[0, 3, 4])
+
+    assert np.allclose(interpolated[:2], [[0.5, 1.], [1., 2.]])
+    assert np.all(np.isnan(interpolated[2]))
+    assert np.allclose(interpolated[3], [12.5, 7.5])
+    with pytest.raises(AssertionError):
+        a.interpolate(times, [0.5], offsets=[0, 2, 4], query_offsets=[0, 1])
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from vectorized2d import Coordinate, Point2D, Vector2D, batched
+
+
+def test_row_wise():
+    a = np.random.uniform(-1, 1, size=(4, 3, 50, 2))
+
+    assert np.allclose(batched.norm(a), np.reshape([v.view(Vector2D).norm for v in a.reshape(-1, 50, 2)], (4, 3, 50)))
+    assert np.allclose(batched.direction(a),
+                       np.reshape([v.view(Vector2D).direction for v in a.reshape(-1, 50, 2)], (4, 3, 50)))
+    assert batched.norm(a[0, 0, 0]).shape == ()
+
+
+def test_euclid_dist():
+    a, b = np.random.random(size=(5, 40, 2)), np.random.random(size=(5, 30, 2))
+
+    dists = batched.euclid_dist(a, b)
+
+    assert dists.shape == (5, 40, 30)
+    for scene in range(5):
+        assert np.allclose(dists[scene], Point2D(a[scene]).euclid_dist(Point2D(b[scene])))
+    aligned_dists = batched.euclid_dist(a, a[::-1], pairing=Point2D.Pairing.ALIGNED)
+    assert np.allclose(aligned_dists, np.linalg.norm(a - a[::-1], axis=-1))
+    # the batch dimensions are broadcast
+    assert np.allclose(batched.euclid_dist(a, b[0]), batched.euclid_dist(a, np.broadcast_to(b[0], b.shape)))
+
+
+def test_geo_dist_and_shifted():
+    a = np.deg2rad(np.random.uniform(-60, 60, size=(6, 20, 2)))
+    b = a + np.random.uniform(-0.01, 0.01, size=a.shape)
+    bearings = np.random.uniform(0, 2 * np.pi, size=(6, 20))
+
+    dists = batched.geo_dist(a, b)
+    aligned_dists = batched.geo_dist(a, b, pairing=Point2D.Pairing.ALIGNED)
+    shifted = batched.shifted(a, 1000., bearings)
+
+    assert dists.shape == (6, 20, 20) and aligned_dists.shape == (6, 20) and shifted.shape == a.shape
+    for scene in range(6):
+        c1, c2 = Coordinate(lat=a[scene, :, 0], lon=a[scene, :, 1]), Coordinate(lat=b[scene, :, 0], lon=b[scene, :, 1])
+        assert np.allclose(aligned_dists[scene], c1.geo_dist(c2))
+        for i in range(20):
+            assert np.allclose(dists[scene, i], c1[i].geo_dist(c2))
+        assert np.allclose(shifted[scene], c1.shifted(1000., bearings[scene]))
+
+
+def _batched_results(a, b, bearings):
+    return [batched.norm(a), batched.direction(a), batched.euclid_dist(a, b),
+            batched.euclid_dist(a, b, pairing=Point2D.Pairing.ALIGNED), batched.geo_dist(a, b),
+            batched.geo_dist(a, b, pairing=Point2D.Pairing.ALIGNED), batched.shifted(a, 1000., bearings)]
+
+
+def test_without_jit(tmp_path):
+    a = np.deg2rad(np.random.uniform(-60, 60, size=(3, 10, 2)))
+    b = a + np.random.uniform(-0.01, 0.01, size=a.shape)
+    bearings = np.random.uniform(0, 2 * np.pi, size=(3, 10))
+    np.savez(tmp_path / 'inputs.npz', a=a, b=b, bearings=bearings)
+
+    # the jit is disabled at import time - thus, in a fresh interpreter
+    subprocess.run([sys.executable, '-c', f"""
+import numpy as np
+from tests.test_batched import _batched_results
+inputs = np.load({str(tmp_path / 'inputs.npz')!r})
+np.savez({str(tmp_path / 'results.npz')!r}, *_batched_results(inputs['a'], inputs['b'], inputs['bearings']))
+"""], env={**os.environ, 'NUMBA_DISABLE_JIT': '1'}, cwd=Path(__file__).parent.parent, check=True)
+
+    no_jit_results = np.load(tmp_path / 'results.npz')
+    for i, result in enumerate(_batched_results(a, b, bearings)):
+        assert result.shape == no_jit_results[f'arr_{i}'].shape
+        assert np.allclose(result, no_jit_results[f'arr_{i}'])
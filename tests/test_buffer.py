@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from vectorized2d import Array2D, Array2DBuffer, Coordinate
+
+
+def test_append_and_grow():
+    buffer = Array2DBuffer(Coordinate, capacity=4)
+    batches = [np.random.random(size=(n, 2)) for n in (1, 3, 10, 0, 7)]
+
+    views = []
+    for batch in batches:
+        buffer.append(batch)
+        views.append(buffer.view())
+
+    assert len(buffer) == buffer.n_appended == 21
+    assert buffer.capacity >= 21
+    assert type(views[-1]) is Coordinate
+    for k, view in enumerate(views):
+        # earlier views are unchanged by the later appends
+        assert np.array_equal(view, np.concatenate(batches[:k + 1]))
+    with pytest.raises(ValueError):
+        views[-1][0, 0] = 0
+
+
+def test_ring_buffer():
+    buffer = Array2DBuffer(capacity=2, max_rows=10)
+    rows = np.random.random(size=(100, 2))
+
+    first_view = None
+    for end in range(3, 100, 3):
+        buffer.append(rows[end - 3:end])
+        if first_view is None and len(buffer) == 10:
+            first_view = buffer.view()
+        assert np.array_equal(buffer.view(), rows[max(0, end - 10):end])
+    assert np.array_equal(first_view, rows[2:12])
+    assert buffer.capacity == 20
+    assert buffer.n_appended == 99
+
+    buffer.append(rows[:25])
+    assert np.array_equal(buffer.view(), rows[15:25])
+    buffer.clear()
+    assert len(buffer) == 0 and type(buffer.view()) is Array2D
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from vectorized2d import Coordinate, codec
+
+
+def _rand_track(n):
+    return Coordinate(lat=33 + np.cumsum(np.random.randn(n) * 1e-4), lon=34 + np.cumsum(np.random.randn(n) * 1e-4),
+                      units=Coordinate.Units.DEGREES)
+
+
+def test_encode_decode():
+    c = Coordinate(lat=np.random.random(size=(1000,)) * 180 - 90, lon=np.random.random(size=(1000,)) * 360 - 180,
+                   units=Coordinate.Units.DEGREES)
+
+    encoded = c.encode()
+    decoded = Coordinate.decode(encoded)
+
+    assert isinstance(decoded, Coordinate)
+    assert len(encoded) < c.nbytes / 2 + 32
+    assert np.allclose(np.rad2deg(decoded), np.rad2deg(c), rtol=0, atol=0.5 / codec.DEFAULT_SCALE)
+
+
+def test_encode_decode_delta():
+    c = _rand_track(200_000)
+
+    encoded = c.encode(delta=True)
+    decoded = Coordinate.decode(encoded)
+
+    assert len(encoded) < c.nbytes / 4 + 32
+    # half a quantization step (up to the rounding of the conversions to and from degrees)
+    assert np.allclose(np.rad2deg(decoded), np.rad2deg(c), rtol=0, atol=0.5 / codec.DEFAULT_SCALE * (1 + 1e-6))
+    assert decoded == Coordinate.decode(c.encode())
+
+
+def test_encode_decode_delta_large_jumps():
+    c = Coordinate(lat=[0, 10, -10, 0], lon=[0, 170, -170, 0], units=Coordinate.Units.DEGREES)
+
+    decoded = Coordinate.decode(c.encode(delta=True))
+
+    assert np.allclose(np.rad2deg(decoded), np.rad2deg(c), rtol=0, atol=0.5 / codec.DEFAULT_SCALE)
+
+
+def test_encode_decode_empty():
+    c = Coordinate(lat=[], lon=[])
+
+    assert len(Coordinate.decode(c.encode())) == 0
+    assert len(Coordinate.decode(c.encode(delta=True))) == 0
+
+
+def test_decode_delta_without_jit():
+    # a track across all the longitudes - the total of the deltas of its first block overflows int32
+    n = 100_000
+    c = Coordinate(lat=np.zeros(n), lon=np.linspace(-179.9, 179.9, n), units=Coordinate.Units.DEGREES)
+    first, deltas, _ = codec._encode_delta(c.lat, c.lon, codec.DEFAULT_SCALE)
+    out = np.empty((n, 2))
+    decode_delta = getattr(codec._decode_delta, 'py_func', codec._decode_delta)
+
+    decode_delta(first, deltas.astype(np.int32), codec.DEFAULT_SCALE, out)
+
+    assert np.allclose(np.rad2deg(out), np.rad2deg(c), rtol=0, atol=0.5 / codec.DEFAULT_SCALE)
+
+
+def test_decode_trailing_bytes():
+    c = _rand_track(100)
+
+    for encoded in (c.encode(), c.encode(delta=True)):
+        assert Coordinate.decode(encoded + b'\0' * 7) == Coordinate.decode(encoded)
+        with pytest.raises(AssertionError):
+            Coordinate.decode(encoded[:-1])
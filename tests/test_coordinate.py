@@ -5,7 +5,9 @@ import numpy as np
 import pytest
 
 from vectorized2d.utils import units as units
-from vectorized2d import Array2D, Coordinate
+from vectorized2d import Array2D, Coordinate, Point2D, Vector2D
+from vectorized2d.point2d import GridSpec
+from tests.helpers import brute_force_dbscan
 
 
 def _rand_degree():
@@ -43,6 +45,31 @@ def test_create_single_coordinate_with_lat_lon_degrees():
     assert np.array_equal(c, np.deg2rad(Array2D([lat, lon])))
 
 
+def test_from_columns():
+    for n in (1000, 100_000):  # serially and in parallel
+        lat = np.random.uniform(-90, 90, size=(n,))
+        lon = np.random.uniform(-180, 180, size=(n,))
+
+        c = Coordinate.from_columns(lat, lon, units=Coordinate.Units.DEGREES)
+
+        assert isinstance(c, Coordinate)
+        assert c.flags.c_contiguous
+        assert np.array_equal(c, np.deg2rad(np.stack([lat, lon], axis=1)))
+    assert np.array_equal(Coordinate.from_columns(1, lon[:3]), Array2D([[1, lon[0]], [1, lon[1]], [1, lon[2]]]))
+
+
+def test_from_radians_array():
+    a = np.random.random(size=(100, 2))
+
+    c = Coordinate.from_radians_array(a)
+    c_fortran = Coordinate.from_radians_array(np.asfortranarray(a))
+
+    assert isinstance(c, Coordinate)
+    assert np.shares_memory(c, a)
+    assert np.array_equal(c.lat, a[:, 0]) and np.array_equal(c.lon, a[:, 1])
+    assert np.array_equal(c_fortran, a)
+
+
 def test_create_multi_coordinate_with_coordinates_degrees():
     lat1, lon1 = _rand_degree(), _rand_degree()
     lat2, lon2 = _rand_degree(), _rand_degree()
@@ -231,6 +258,71 @@ def test_shifted_same_shape():
     assert np.allclose(c.bearing(shifted), bearing, rtol=0.01)
 
 
+def test_propagate():
+    n = 100
+    c = Coordinate(lat=np.random.uniform(-60, 60, n), lon=np.random.uniform(-170, 170, n),
+                   units=Coordinate.Units.DEGREES)
+    speed, course = np.random.uniform(0, 15, n), np.random.uniform(0, 2 * np.pi, n)
+    velocities = Vector2D.from_polar(speed, course)
+    times = np.arange(0, 601, 10.0)
+
+    positions = c.propagate(velocities, times)
+    assert isinstance(positions, Coordinate) and positions.shape == (len(times) * n, 2)
+    expected = Coordinate.concat([c.shifted(geo_dist=speed * t, bearing=course) for t in times])
+    assert np.allclose(positions, expected, rtol=0, atol=1e-12)
+
+    # per-step velocities - a leg to the north, then a leg to the east
+    per_step = Vector2D.from_polar(np.full(2 * n, 10.0), np.repeat([0, np.pi / 2], n))
+    positions = c.propagate(per_step, [60, 120])
+    north = c.shifted(geo_dist=600, bearing=0)
+    assert np.allclose(positions[:n], north, rtol=0, atol=1e-12)
+    assert np.allclose(positions[n:], north.shifted(geo_dist=600, bearing=np.pi / 2), rtol=0, atol=1e-12)
+
+
+def test_propagate_turn_rate():
+    c = Coordinate(lat=[0, 33], lon=[0, 34], units=Coordinate.Units.DEGREES)
+    velocities = Vector2D.from_polar(10.0, [0, np.pi / 3])
+    period = 600
+    times = np.arange(1, period + 1, 1.0)
+
+    positions = c.propagate(velocities, times, turn_rates=2 * np.pi / period)
+    # half a circle away is the diameter (2 * speed / turn_rate), and a full circle is back at the start
+    half = positions[(period // 2 - 1) * 2:(period // 2) * 2]
+    assert np.allclose(c.geo_dist(half), 2 * 10.0 * period / (2 * np.pi), rtol=0.01)
+    assert np.all(c.geo_dist(positions[-2:]) < 5)
+    # a (clockwise) turn to the right of the course
+    assert np.allclose(c.bearing(half), (np.array([0, np.pi / 3]) + np.pi / 2) % (2 * np.pi), atol=0.01)
+    # no turn is a straight leg
+    assert np.allclose(c.propagate(velocities, times, turn_rates=[0, 0]), c.propagate(velocities, times))
+
+
+def test_cpa():
+    # head-on at 10 [m/s] each, 2 [km] apart
+    c1 = Coordinate(lat=33, lon=34, units=Coordinate.Units.DEGREES)
+    c2 = c1.shifted(geo_dist=2000, bearing=np.pi / 2)
+    v1 = Vector2D.from_polar(10.0, np.pi / 2)
+    v2 = Vector2D.from_polar(10.0, 3 * np.pi / 2)
+
+    tcpa, dcpa = c1.cpa(v1, c2, v2)
+    assert np.allclose(tcpa, 100, rtol=0.01) and np.allclose(dcpa, 0, atol=1)
+    tcpa, dcpa = c1.cpa(-v1, c2, -v2)  # diverging
+    assert tcpa[0, 0] == 0 and np.isclose(dcpa[0, 0], c1.geo_dist(c2)[0])
+
+    # the closest approach agrees with propagated positions (up to the local plane approximation)
+    n = 400
+    c = Coordinate(lat=np.random.uniform(33, 33.1, n), lon=np.random.uniform(34, 34.1, n),
+                   units=Coordinate.Units.DEGREES)
+    v = Vector2D.from_polar(np.random.uniform(0, 10, n), np.random.uniform(0, 2 * np.pi, n))
+    tcpa, dcpa = c.cpa(v, c, v)
+    offsets, indices, within_tcpa, within_dcpa = c.cpa_within(v, 200)
+    rows = np.repeat(np.arange(n), np.diff(offsets))
+    assert np.array_equal(np.stack([rows, indices], axis=1), np.argwhere(np.triu(dcpa <= 200, k=1)))
+    assert np.allclose(within_tcpa, tcpa[rows, indices]) and np.allclose(within_dcpa, dcpa[rows, indices])
+    for i, j, t, d in zip(rows, indices, within_tcpa, within_dcpa):
+        positions = c[[i, j]].propagate(v[[i, j]], [t])
+        assert np.isclose(positions[:1].geo_dist(positions[1:])[0], d, atol=0.03 * c[[i]].geo_dist(c[[j]])[0])
+
+
 def test_circle_around_fails_for_multi_coordinate():
     c = Coordinate(lat=np.deg2rad(np.random.random(size=(1000,)) * randint(0, 360)),
                    lon=np.deg2rad(np.random.random(size=(1000,)) * randint(0, 360)),
@@ -275,3 +367,204 @@ def test_ellipse_around():
     assert np.allclose(bearings, np.arange(0, math.pi * 2, (math.pi * 2) / number_of_points) % (math.pi * 2),
                        rtol=0.01, atol=1e-3)
     assert len(ellipse) == number_of_points
+
+
+def test_nearest():
+    c1 = Coordinate(lat=33 + np.random.random(size=(300,)), lon=34 + np.random.random(size=(300,)),
+                    units=Coordinate.Units.DEGREES)
+    c2 = Coordinate(lat=33 + np.random.random(size=(3000,)), lon=34 + np.random.random(size=(3000,)),
+                    units=Coordinate.Units.DEGREES)
+    k = randint(1, 10)
+    dists = c1.repeat(len(c2)).geo_dist(c2.tile(len(c1))).reshape(len(c1), len(c2))
+
+    indices, nearest_dists = c1.nearest(c2, k=k)
+
+    assert indices.shape == nearest_dists.shape == (len(c1), k)
+    assert np.array_equal(indices, np.argsort(dists, axis=1, kind='stable')[:, :k])
+    assert np.allclose(nearest_dists, np.sort(dists, axis=1)[:, :k])
+
+
+def test_within_distance():
+    c1 = Coordinate(lat=np.random.random(size=(300,)) * 170 - 85, lon=np.random.random(size=(300,)) * 360 - 180,
+                    units=Coordinate.Units.DEGREES)
+    c2 = Coordinate(lat=np.random.random(size=(3000,)) * 170 - 85, lon=np.random.random(size=(3000,)) * 360 - 180,
+                    units=Coordinate.Units.DEGREES)
+    radius = random() * 1_000_000
+    dists = c1.repeat(len(c2)).geo_dist(c2.tile(len(c1))).reshape(len(c1), len(c2))
+
+    offsets, indices, within_dists = c1.within_distance(c2, radius)
+
+    assert len(offsets) == len(c1) + 1
+    for i in range(len(c1)):
+        expected = np.flatnonzero(dists[i] <= radius)
+        assert np.array_equal(indices[offsets[i]:offsets[i + 1]], expected)
+        assert np.allclose(within_dists[offsets[i]:offsets[i + 1]], dists[i, expected])
+
+
+def test_geo_centroid():
+    c = Coordinate(lat=[10, -10, 10, -10], lon=[179, 179, -179, -179], units=Coordinate.Units.DEGREES)
+
+    centroid = c.geo_centroid()
+    group_centroids = c.geo_centroid(labels=[0, 0, 1, 1], n_groups=3)
+
+    assert isinstance(centroid, Coordinate)
+    assert np.allclose(np.abs(np.rad2deg(centroid)), [[0, 180]])  # across the antimeridian
+    assert np.allclose(np.rad2deg(group_centroids[:2]), [[0, 179], [0, -179]])
+    assert np.all(np.isnan(group_centroids[2]))
+    assert np.rad2deg(c.geo_centroid(weights=[3, 1, 0, 0]).lat[0]) > 0
+    # the chunk sums are merged per group - as a single chunk of all the rows
+    labels = np.array([0, 1, 1, 2])
+    assert np.allclose(Coordinate._group_unit_vector_sums(c.lat, c.lon, np.empty(0), labels, 3, 3),
+                       Coordinate._group_unit_vector_sums(c.lat, c.lon, np.empty(0), labels, 3, 1))
+
+
+def test_convex_hull_and_min_enclosing_circle():
+    c = Coordinate(lat=[10, -10, 10, -10, 0], lon=[179, 179, -179, -179, 180], units=Coordinate.Units.DEGREES)
+
+    hull = c.convex_hull()
+    center, radius = c.min_enclosing_circle()
+
+    assert isinstance(hull, Coordinate)
+    assert len(hull) == 4  # across the antimeridian
+    assert -math.pi <= center.lon[0] < math.pi
+    assert np.allclose(np.abs(np.rad2deg(center)), [[0, 180]])
+    assert np.isclose(radius, c[0].geo_dist(Coordinate.from_columns(center.lat, np.abs(center.lon)))[0], rtol=1e-3)
+
+
+def test_min_enclosing_circle_across_the_antimeridian():
+    c = Coordinate(lat=[0, 0], lon=[179.9, -179.7], units=Coordinate.Units.DEGREES)
+
+    center, radius = c.min_enclosing_circle()
+
+    assert -math.pi <= center.lon[0] < math.pi
+    assert np.allclose(np.rad2deg(center), [[0, -179.9]])
+    assert np.isclose(radius, c[1].geo_dist(center)[0], rtol=1e-3)  # (geo_dist itself is not wrapped)
+
+
+def test_min_enclosing_circle_ragged():
+    c = Coordinate(lat=33 + np.random.random(size=1000) / 10, lon=34 + np.random.random(size=1000) / 10,
+                   units=Coordinate.Units.DEGREES)
+    offsets = np.array([0, 500, 1000])
+
+    centers, radii = c.min_enclosing_circle(offsets)
+    hull_offsets, hulls = c.convex_hull(offsets)
+
+    assert len(centers) == len(radii) == 2
+    for group in range(2):
+        group_coordinates = c[offsets[group]:offsets[group + 1]]
+        dists = group_coordinates.geo_dist(centers[group])
+        assert np.isclose(dists.max(), radii[group], rtol=1e-3)
+        assert hull_offsets[group + 1] > hull_offsets[group]
+
+
+def test_bin():
+    lat, lon = 33 + np.random.random(size=1000), 34 + np.random.random(size=1000)
+    c = Coordinate(lat=lat, lon=lon, units=Coordinate.Units.DEGREES)
+    counts, _, _ = np.histogram2d(lat, lon, bins=[4, 5], range=[[33, 34], [34, 35]])
+
+    binned = c.bin(GridSpec.from_bounds(33, 34, 34, 35, 4, 5), units=Coordinate.Units.DEGREES)
+
+    assert np.array_equal(binned.counts, counts)
+
+
+def test_dbscan():
+    c = Coordinate(lat=60 + np.random.random(size=500) / 20, lon=34 + np.random.random(size=500) / 10,
+                   units=Coordinate.Units.DEGREES)
+    dists = c.repeat(len(c)).geo_dist(c.tile(len(c))).reshape(len(c), len(c))
+
+    labels = c.dbscan(eps=200, min_samples=4)
+
+    assert np.array_equal(labels, brute_force_dbscan(dists, 200, 4))
+
+
+def test_interpolate():
+    c = Coordinate(lat=np.array([10., 20., 0., 0.]), lon=np.array([179., -179., 170., 170.]),
+                   units=Coordinate.Units.DEGREES)
+    times = np.array([0., 10., 0., 0.])
+    query_times = np.array([0., 5., 10., 11.])
+
+    great_circle = c.interpolate(times, query_times, offsets=[0, 2, 4])
+    lat_lon = c.interpolate(times, query_times, offsets=[0, 2, 4], great_circle=False)
+
+    for interpolated in (great_circle, lat_lon):
+        assert np.allclose(interpolated[[0, 2]], c[:2])
+        assert np.all(np.isnan(interpolated[[3, 5, 6, 7]]))
+        assert np.allclose(interpolated[4], c[2])
+        assert abs(np.rad2deg(interpolated.lon[1]) - 180) % 360 < 1  # across the antimeridian
+    assert np.allclose(np.rad2deg(lat_lon[1]), [15., 180.])
+    # the great circle midpoint is equidistant from both ends (in central angle)
+    unit_vectors = np.stack([np.cos(great_circle.lat[:3]) * np.cos(great_circle.lon[:3]),
+                             np.cos(great_circle.lat[:3]) * np.sin(great_circle.lon[:3]),
+                             np.sin(great_circle.lat[:3])], axis=1)
+    assert np.isclose(unit_vectors[0] @ unit_vectors[1], unit_vectors[1] @ unit_vectors[2])
+    assert not np.isclose(great_circle.lat[1], lat_lon.lat[1])
+
+
+def test_mercator_and_equirectangular():
+    c = Coordinate(lat=np.random.uniform(-80, 80, size=1000), lon=np.random.uniform(-180, 180, size=1000),
+                   units=Coordinate.Units.DEGREES)
+    out = np.empty((1000, 2))
+
+    mercator = c.to_mercator(out=out)
+    equirectangular = c.to_equirectangular(standard_lat=math.radians(30))
+
+    assert type(mercator) is Point2D and np.shares_memory(mercator, out)
+    assert np.allclose(Coordinate(lat=85.0511287798, lon=180, units=Coordinate.Units.DEGREES).to_mercator(),
+                       [[20037508.34, 20037508.34]])
+    assert np.allclose(mercator.x1, 6378137 * c.lon)
+    assert np.allclose(Coordinate.from_mercator(mercator), c)
+    assert np.allclose(Coordinate.from_equirectangular(equirectangular, standard_lat=math.radians(30)), c)
+
+
+def test_utm():
+    c = Coordinate(lat=np.random.uniform(-80, 84, size=10_000), lon=np.random.uniform(-180, 180, size=10_000),
+                   units=Coordinate.Units.DEGREES)
+
+    points, zones = c.to_utm()
+
+    regular = np.rad2deg(c.lat) < 56  # the zones of Norway and Svalbard are exceptions
+    assert np.array_equal(np.abs(zones[regular]), (np.rad2deg(c.lon[regular]) + 180) // 6 + 1)
+    assert np.array_equal(zones < 0, c.lat < 0)
+    assert np.all((points.x1 > 100_000) & (points.x1 < 900_000))
+    back = Coordinate.from_utm(points, zones)
+    assert np.allclose(back.lat, c.lat, rtol=0, atol=1e-9)
+    assert np.allclose((back.lon - c.lon + np.pi) % (2 * np.pi) - np.pi, 0, atol=1e-9)
+    # the meridian arc on the central meridian, and the zone exceptions
+    known, known_zones = Coordinate(lat=[45, 60, 78, -1], lon=[3, 5, 15, 3], units=Coordinate.Units.DEGREES).to_utm()
+    assert np.allclose(known[0], [[500_000, 4_982_950.4]])
+    assert np.array_equal(known_zones, [31, 32, 33, -31])
+    # a given zone (e.g. of the neighbouring zones)
+    neighbours = Coordinate(lat=[10, 50, -20], lon=[8, 16, 22], units=Coordinate.Units.DEGREES)
+    assert np.allclose(Coordinate.from_utm(*neighbours.to_utm(33)), neighbours, rtol=0, atol=1e-9)
+
+
+def test_spatial_keys():
+    c = Coordinate(lat=np.random.uniform(-0.5, 0.5, 100), lon=np.random.uniform(-1, 1, 100))
+
+    # the keys of coordinates are of the whole globe (rather than of their bounding box)
+    assert np.array_equal(c.spatial_keys(), c.spatial_keys(bounds=(-math.pi / 2, math.pi / 2, -math.pi, math.pi)))
+    assert np.array_equal(c.spatial_keys()[:10], c[:10].spatial_keys())
+    sorted_c, order = c.sort_spatially()
+    assert type(sorted_c) is Coordinate
+    assert np.array_equal(sorted_c, c[order])
+
+
+def test_simplify():
+    # a track along the equator, with a detour of ~100 meters to the north
+    c = Coordinate(lat=[0., 0., 100 / units.NM_TO_METERS / 60, 0., 0.], lon=[0., 0.01, 0.02, 0.03, 0.04],
+                   units=Coordinate.Units.DEGREES)
+    track_offsets = [0, 5, 10]
+    tracks = np.concatenate([c, c]).view(Coordinate)
+
+    assert np.array_equal(c.simplify_mask(50.), [True, False, True, False, True])
+    assert np.array_equal(c.simplify_mask(150.), [True, False, False, False, True])
+    simplified, offsets = tracks.simplify(150., offsets=track_offsets)
+    assert type(simplified) is Coordinate
+    assert np.array_equal(offsets, [0, 2, 4])
+    assert np.array_equal(simplified, tracks[[0, 4, 5, 9]])
+    # the triangle of the detour is of ~100 * 4 * 1113 / 2 square meters (once its neighbours are removed)
+    assert c.simplify_mask(1e5, Coordinate.Simplification.VISVALINGAM)[2]
+    assert not c.simplify_mask(3e5, Coordinate.Simplification.VISVALINGAM)[2]
+    # across the antimeridian
+    c_across = Coordinate(lat=[0., 0., 0.], lon=[179.99, 180., -179.99], units=Coordinate.Units.DEGREES)
+    assert np.array_equal(c_across.simplify_mask(1.), [True, False, True])
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from random import randint
+
+import numpy as np
+import pytest
+
+from vectorized2d import Array2D, Coordinate, Point2D
+from vectorized2d.executor import SharedMemoryExecutor, ThreadedExecutor
+
+
+@pytest.fixture(scope='module')
+def shared_memory_executor():
+    with SharedMemoryExecutor(max_workers=2, block_size=64) as executor:
+        yield executor
+
+
+def test_shared_memory_euclid_dist_reduce(shared_memory_executor):
+    p1 = Point2D(np.random.random(size=(500, 2)))
+    p2 = Point2D(np.random.random(size=(300, 2)))
+    radius = 0.1
+    dists = p1.euclid_dist(p2)
+
+    reduction = shared_memory_executor.euclid_dist_reduce(p1, p2, radius=radius)
+
+    assert np.allclose(reduction.min_dist, dists.min(axis=1))
+    assert np.array_equal(reduction.argmin, dists.argmin(axis=1))
+    assert np.array_equal(reduction.count_within, (dists <= radius).sum(axis=1))
+
+
+def test_shared_memory_euclid_dist_reduce_without_radius(shared_memory_executor):
+    p1 = Point2D(np.random.random(size=(100, 2)))
+    p2 = Point2D(np.random.random(size=(100, 2)))
+
+    min_dist, argmin, count_within = shared_memory_executor.euclid_dist_reduce(p1, p2)
+
+    assert np.array_equal(argmin, p1.euclid_dist(p2).argmin(axis=1))
+    assert count_within is None
+
+
+def test_shared_memory_geo_dist_reduce(shared_memory_executor):
+    c1 = Coordinate(lat=33 + np.random.random(size=(400,)), lon=34 + np.random.random(size=(400,)),
+                    units=Coordinate.Units.DEGREES)
+    c2 = Coordinate(lat=33 + np.random.random(size=(200,)), lon=34 + np.random.random(size=(200,)),
+                    units=Coordinate.Units.DEGREES)
+    radius = 10_000
+    dists = c1.repeat(len(c2)).geo_dist(c2.tile(len(c1))).reshape(len(c1), len(c2))
+
+    reduction = shared_memory_executor.geo_dist_reduce(c1, c2, radius=radius)
+
+    assert np.allclose(reduction.min_dist, dists.min(axis=1))
+    assert np.array_equal(reduction.argmin, dists.argmin(axis=1))
+    assert np.array_equal(reduction.count_within, (dists <= radius).sum(axis=1))
+
+
+def test_threaded_split():
+    c1 = Coordinate(lat=np.random.random(size=(1000,)), lon=np.random.random(size=(1000,)))
+    c2 = Coordinate(lat=np.random.random(size=(1000,)), lon=np.random.random(size=(1000,)))
+
+    with ThreadedExecutor(max_workers=4) as executor:
+        dists, bearings = executor.split(Coordinate.geo_dist_and_bearing, c1, c2, chunk_size=128)
+        one_to_many_dists = executor.split(Coordinate.geo_dist, c1, c2[0], chunk_size=128)
+        shifted = executor.split(Coordinate.shifted, c1, geo_dist=1000, bearing=1, chunk_size=128)
+
+    assert np.array_equal(dists, c1.geo_dist(c2))
+    assert np.array_equal(bearings, c1.bearing(c2))
+    assert np.array_equal(one_to_many_dists, c1.geo_dist(c2[0]))
+    assert isinstance(shifted, Coordinate)
+    assert shifted == c1.shifted(geo_dist=1000, bearing=1)
+
+
+def test_threaded_split_keyword_arrays():
+    c = Coordinate(lat=np.random.random(size=(1000,)), lon=np.random.random(size=(1000,)))
+    geo_dists, bearings = np.random.random(size=(1000,)) * 1000, np.random.random(size=(1000,))
+    p1 = Point2D(np.random.random(size=(300, 2)))
+    p2 = Point2D(np.random.random(size=(300, 2)))
+
+    with ThreadedExecutor(max_workers=4) as executor:
+        shifted = executor.split(Coordinate.shifted, c, geo_dist=geo_dists, bearing=bearings, chunk_size=128)
+        pairwise_dists = executor.split(Point2D.euclid_dist, p1, other=p2, chunk_size=64)  # `other` is never split
+
+    assert shifted == c.shifted(geo_dist=geo_dists, bearing=bearings)
+    assert np.array_equal(pairwise_dists, p1.euclid_dist(p2))
+
+
+def test_threaded_map():
+    arrays = [Array2D(np.random.random(size=(randint(1, 1000), 2))) for _ in range(20)]
+
+    with ThreadedExecutor(max_workers=4) as executor:
+        norms = executor.map(lambda a: a.norm, arrays)
+
+    assert len(norms) == len(arrays)
+    for a, norm in zip(arrays, norms):
+        assert np.array_equal(norm, a.norm)
+
+
+def test_threaded_map_of_multiple_arguments():
+    c1 = Coordinate(lat=np.random.random(size=(10_000,)), lon=np.random.random(size=(10_000,)))
+    c2 = Coordinate(lat=np.random.random(size=(10_000,)), lon=np.random.random(size=(10_000,)))
+
+    with ThreadedExecutor(max_workers=2) as executor:
+        dists = executor.map(Coordinate.geo_dist, [c1] * 8, [c2] * 8)
+
+    assert len(dists) == 8
+    for d in dists:
+        assert np.array_equal(d, c1.geo_dist(c2))
+
+
+def test_threaded_parallel_kernels_exit_under_tbb():
+    pytest.importorskip('numba.np.ufunc.tbbpool', reason='the TBB threading layer is not available')
+
+    # the first parallel kernels run on the worker threads - thus, in a fresh interpreter
+    subprocess.run([sys.executable, '-c', """
+import numpy as np
+from vectorized2d import Point2D
+from vectorized2d.executor import ThreadedExecutor
+points = [Point2D(np.random.random(size=(1000, 2))) for _ in range(8)]
+with ThreadedExecutor(max_workers=4) as executor:
+    executor.map(lambda p: p.within_distance(p, 0.01), points)
+"""], env={**os.environ, 'NUMBA_THREADING_LAYER': 'tbb'}, cwd=Path(__file__).parent.parent, check=True, timeout=120)
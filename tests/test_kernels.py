@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+from numba import njit
+
+from vectorized2d import Coordinate, Point2D, Vector2D, kernels
+
+
+@njit
+def _row_by_row(kernel, a, b):
+    # calls a kernel of two elements on floats, from compiled code
+    out = np.empty(len(a))
+    for i in range(len(a)):
+        out[i] = kernel(a[i, 0], a[i, 1], b[i, 0], b[i, 1])
+    return out
+
+
+@njit
+def _vectorized(kernel, a, b):
+    # calls a kernel of two elements on arrays, from compiled code
+    return kernel(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+
+
+def test_point_and_vector_kernels():
+    a, b = np.random.uniform(-1, 1, size=(2, 100, 2))
+    v1, v2 = a.view(Vector2D), b.view(Vector2D)
+
+    for kernel, expected in ((kernels.euclid_dist, Point2D(a).euclid_dist(Point2D(b), pairing=Point2D.Pairing.ALIGNED)),
+                             (kernels.euclid_dist_squared,
+                              Point2D(a).euclid_dist_squared(Point2D(b), pairing=Point2D.Pairing.ALIGNED)),
+                             (kernels.dot, v1.dot(v2)), (kernels.cross, v1.cross(v2)),
+                             (kernels.angle_to, v1.angle_to(v2)), (kernels.angle_between, v1.angle_between(v2))):
+        assert np.allclose(_row_by_row(kernel, a, b), expected)
+        assert np.allclose(_vectorized(kernel, a, b), expected)
+    assert np.allclose(kernels.norm(a[:, 0], a[:, 1]), v1.norm)
+    assert np.allclose(kernels.norm_squared(a[:, 0], a[:, 1]), v1.norm_squared)
+    assert np.allclose(kernels.direction(a[:, 0], a[:, 1]), v1.direction)
+    assert np.allclose(np.stack(kernels.rotated(a[:, 0], a[:, 1], 0.5), axis=1), v1.rotated(0.5))
+    assert np.allclose(np.stack(kernels.from_polar(2., a[:, 0]), axis=1), Vector2D(magnitude=2., direction=a[:, 0]))
+    assert kernels.angle_to(1., 0., -1., 0.) == -math.pi
+    # the angles of zero vectors are exactly 0 (rather than -0. or -pi)
+    zeros = np.full((len(a), 2), -0.)
+    for kernel in (kernels.angle_to, kernels.angle_between):
+        assert not np.any(np.signbit(_vectorized(kernel, -a, zeros))) and np.all(_vectorized(kernel, -a, zeros) == 0)
+        assert not np.any(np.signbit(_row_by_row(kernel, -a, zeros))) and np.all(_row_by_row(kernel, -a, zeros) == 0)
+
+
+def test_coordinate_kernels():
+    a = np.deg2rad(np.random.uniform(-60, 60, size=(100, 2)))
+    b = a + np.random.uniform(-0.01, 0.01, size=a.shape)
+    c1, c2 = Coordinate(lat=a[:, 0], lon=a[:, 1]), Coordinate(lat=b[:, 0], lon=b[:, 1])
+
+    for kernel, expected in ((kernels.geo_dist, c1.geo_dist(c2)), (kernels.geo_dist_squared, c1.geo_dist_squared(c2)),
+                             (kernels.bearing, c1.bearing(c2))):
+        assert np.allclose(_row_by_row(kernel, a, b), expected)
+        assert np.array_equal(_vectorized(kernel, a, b), expected)
+    assert np.array_equal(np.stack(kernels.geo_dist_and_bearing(a[:, 0], a[:, 1], b[:, 0], b[:, 1])),
+                          np.stack(c1.geo_dist_and_bearing(c2)))
+    assert np.array_equal(np.stack(kernels.delta_east_and_north(a[:, 0], a[:, 1], b[:, 0], b[:, 1])),
+                          np.stack(c1._delta_east_and_north(c2)))
+    assert np.array_equal(np.stack(kernels.shifted(a[:, 0], a[:, 1], 1000., 1.), axis=1), c1.shifted(1000., 1.))
+    assert np.allclose(kernels.shifted(a[0, 0], a[0, 1], 1000., 1.), c1[0].shifted(1000., 1.))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from vectorized2d import Array2D, Point2D, Vector2D
+from vectorized2d import lazy
+
+
+def test_fused_expression_matches_eager():
+    a, b, c = (np.random.random(size=(1000, 2)).view(Vector2D) for _ in range(3))
+    a[0] = b[0]  # a zero vector to normalize
+
+    fused = ((a.lazy() - b).normalized() * 3 + c).norm.evaluate()
+
+    assert np.allclose(fused, ((a - b).normalized() * 3 + c).norm)
+
+
+def test_row_wise_operations():
+    a, b = (np.random.random(size=(1000, 2)).view(Vector2D) for _ in range(2))
+    angles = np.random.random(size=1000)
+
+    rotated = (a.lazy().rotated(30, Vector2D.Units.DEGREES) + a.lazy().rotated(angles)).evaluate()
+    projected = (2 / (1 - a.lazy().project_onto(b))).evaluate()
+
+    assert type(rotated) is Vector2D
+    assert np.allclose(rotated, a.rotated(30, Vector2D.Units.DEGREES) + a.rotated(angles))
+    assert np.allclose(projected, 2 / (1 - a.project_onto(b)))
+    assert np.allclose((-a.lazy()).direction.evaluate(), (-a).direction)
+    assert np.allclose((a.lazy().x1 * a.lazy().norm_squared - a.lazy().x2).evaluate(),
+                       a.x1 * a.norm_squared - a.x2)
+
+
+def test_broadcasting_and_out():
+    a = np.random.random(size=(1000, 2)).view(Point2D)
+    column = np.random.random(size=1000)
+    out = np.empty((1000, 2))
+
+    result = (a.lazy() * column[:, np.newaxis] - Array2D([1., 2.])).evaluate(out=out)
+
+    assert type(result) is Point2D
+    assert np.shares_memory(result, out)
+    assert np.allclose(result, a * column[:, np.newaxis] - Array2D([1., 2.]))
+    # a 1D operand is a row, broadcast to all the rows (as in numpy) - also of 2 rows
+    for b in (a, a[:2]):
+        assert np.array_equal((b.lazy() + np.array([1., 2.])).evaluate(), b + np.array([1., 2.]))
+        assert np.array_equal((np.array([1., 2.]) * b.lazy()).evaluate(), np.array([1., 2.]) * b)
+    with pytest.raises(AssertionError):  # a per-row column must be Nx1
+        a.lazy() * column
+    # a result may overwrite an array of the expression
+    expected = (a + a.norm[:, np.newaxis]).view(np.ndarray)
+    (a.lazy() + a.lazy().norm).evaluate(out=a)
+    assert np.allclose(a, expected)
+    with pytest.raises(AssertionError):
+        (a.lazy() + np.random.random(size=(10, 2))).evaluate()
+    with pytest.raises(AssertionError):
+        a.lazy().norm.evaluate(out=np.empty(10))
+    with pytest.raises(AssertionError):  # a shifted view of an array of the expression
+        (a[1:].lazy() * 2).evaluate(out=a[:-1])
+    column_out = column.copy()
+    (a.lazy().norm + column_out).evaluate(out=column_out)
+    assert np.allclose(column_out, a.norm + column)
+
+
+def test_kernels_are_cached_by_structure():
+    a = np.random.random(size=(100_000, 2)).view(Vector2D)  # a parallel kernel
+    n_kernels = len(lazy._kernels)
+
+    first = ((a.lazy() * 2).normalized() + 1.5).evaluate()
+    second = ((a[::-1].lazy() * 3).normalized() + 0.5).evaluate()
+
+    assert len(lazy._kernels) == n_kernels + 1
+    assert np.allclose(first, (a * 2).normalized() + 1.5)
+    assert np.allclose(second, (a[::-1] * 3).normalized() + 0.5)
@@ -2,7 +2,10 @@ from random import randint
 
 import numpy as np
 
-from vectorized2d import Point2D
+from vectorized2d import Point2D, Vector2D
+from vectorized2d.point2d import GridSpec
+from vectorized2d.utils.spatial_grid import radix_argsort
+from tests.helpers import brute_force_dbscan
 
 
 def test_euclidean_distance_same_shape_aligned():
@@ -84,3 +87,319 @@ def test_euclidean_distance_squared_aligned():
                        p1.euclid_dist_squared(p2, pairing=Point2D.Pairing.ALIGNED))
     assert np.allclose(p2.euclid_dist(p1, pairing=Point2D.Pairing.ALIGNED) ** 2,
                        p2.euclid_dist_squared(p1, pairing=Point2D.Pairing.ALIGNED))
+
+
+def test_nearest():
+    p1 = Point2D(np.random.random(size=(randint(1, 300), 2)))
+    p2 = Point2D(np.random.random(size=(randint(10, 3000), 2)))
+    k = randint(1, 10)
+    dists = p1.euclid_dist(p2)
+
+    indices, nearest_dists = p1.nearest(p2, k=k)
+
+    assert indices.shape == nearest_dists.shape == (len(p1), k)
+    assert np.array_equal(indices, np.argsort(dists, axis=1, kind='stable')[:, :k])
+    assert np.allclose(nearest_dists, np.sort(dists, axis=1)[:, :k])
+
+
+def test_nearest_single():
+    p1 = Point2D(np.random.random(size=(100, 2)))
+    p2 = Point2D(np.random.random(size=(50, 2)))
+
+    indices, nearest_dists = p1.nearest(p2)
+
+    assert np.array_equal(indices[:, 0], p1.euclid_dist(p2).argmin(axis=1))
+    assert np.allclose(nearest_dists[:, 0], p1.euclid_dist(p2).min(axis=1))
+
+
+def test_within_distance():
+    p1 = Point2D(np.random.random(size=(randint(1, 300), 2)) * 100)
+    p2 = Point2D(np.random.random(size=(randint(1, 3000), 2)) * 100)
+    radius = np.random.random() * 10
+    dists = p1.euclid_dist(p2).view(np.ndarray)
+
+    offsets, indices, within_dists = p1.within_distance(p2, radius)
+
+    assert len(offsets) == len(p1) + 1
+    assert offsets[-1] == len(indices) == len(within_dists) == np.count_nonzero(dists <= radius)
+    for i in range(len(p1)):
+        expected = np.flatnonzero(dists[i] <= radius)
+        assert np.array_equal(indices[offsets[i]:offsets[i + 1]], expected)
+        assert np.allclose(within_dists[offsets[i]:offsets[i + 1]], dists[i, expected])
+
+
+def test_within_distance_zero_radius():
+    p = Point2D(np.random.randint(0, 10, size=(500, 2)))
+    dists = p.euclid_dist(p).view(np.ndarray)
+
+    offsets, indices, _ = p.within_distance(p, 0)
+
+    assert offsets[-1] == np.count_nonzero(dists == 0)
+    for i in range(len(p)):
+        assert np.array_equal(indices[offsets[i]:offsets[i + 1]], np.flatnonzero(dists[i] == 0))
+
+
+def test_cpa():
+    p1, p2 = Point2D(np.random.random(size=(300, 2)) * 100), Point2D(np.random.random(size=(3000, 2)) * 100)
+    v1, v2 = np.random.normal(size=(300, 2)).view(Vector2D), np.random.normal(size=(3000, 2)).view(Vector2D)
+
+    tcpa, dcpa = p1.cpa(v1, p2, v2)
+
+    d = p2.view(np.ndarray)[np.newaxis] - p1.view(np.ndarray)[:, np.newaxis]
+    w = v2.view(np.ndarray)[np.newaxis] - v1.view(np.ndarray)[:, np.newaxis]
+    expected_tcpa = np.maximum(0, -np.sum(d * w, axis=2) / np.sum(w * w, axis=2))
+    assert tcpa.shape == dcpa.shape == (300, 3000)
+    assert np.allclose(tcpa, expected_tcpa)
+    assert np.allclose(dcpa, np.linalg.norm(d + w * expected_tcpa[..., np.newaxis], axis=2))
+    aligned_tcpa, aligned_dcpa = p1.cpa(v1, p2[:300], v2[:300], pairing=Point2D.Pairing.ALIGNED)
+    assert np.array_equal(aligned_tcpa, np.diagonal(tcpa)) and np.array_equal(aligned_dcpa, np.diagonal(dcpa))
+
+    # head-on, diverging and parallel
+    p, v = Point2D([[0, 0], [10, 0]]), Vector2D.from_polar([1, 1], [0, np.pi])
+    assert np.allclose(p.cpa(v, p[::-1], v[::-1], pairing=Point2D.Pairing.ALIGNED), [[5, 5], [0, 0]])
+    assert np.allclose(p.cpa(-v, p[::-1], -v[::-1], pairing=Point2D.Pairing.ALIGNED), [[0, 0], [10, 10]])
+    assert np.allclose(p.cpa(v, p[::-1], v, pairing=Point2D.Pairing.ALIGNED), [[0, 0], [10, 10]])
+
+
+def test_cpa_within():
+    p = Point2D(np.random.random(size=(2000, 2)) * 400)
+    v = np.random.normal(size=(2000, 2)).view(Vector2D)
+    tcpa, dcpa = p.cpa(v, p, v)
+    found = (dcpa <= 5) & (tcpa <= 100)
+
+    for other, expected in ((p, found), (None, np.triu(found, k=1))):
+        offsets, indices, within_tcpa, within_dcpa = p.cpa_within(v, 5, other, None if other is None else v,
+                                                                  max_tcpa=100)
+        assert offsets[-1] == len(indices) == np.count_nonzero(expected)
+        rows = np.repeat(np.arange(len(p)), np.diff(offsets))
+        assert np.array_equal(np.stack([rows, indices], axis=1), np.argwhere(expected))
+        assert np.allclose(within_tcpa, tcpa[rows, indices]) and np.allclose(within_dcpa, dcpa[rows, indices])
+
+    # candidates of a threshold join
+    candidates = p.within_distance(p, 50)[:2]
+    offsets, indices, _, _ = p.cpa_within(v, 5, max_tcpa=100, candidates=candidates)
+    rows = np.repeat(np.arange(len(p)), np.diff(offsets))
+    expected = np.triu(found & (p.euclid_dist(p) <= 50), k=1)
+    assert np.array_equal(np.stack([rows, indices], axis=1), np.argwhere(expected))
+
+
+def _assert_convex_hull(points, hull):
+    edges_start = hull.view(np.ndarray)
+    edges_end = np.roll(edges_start, -1, axis=0)
+    # every point is on the left of (or on) every counter-clockwise edge
+    cross = ((edges_end[:, 0] - edges_start[:, 0])[:, np.newaxis] * (points[:, 1] - edges_start[:, 1:2])
+             - (edges_end[:, 1] - edges_start[:, 1])[:, np.newaxis] * (points[:, 0] - edges_start[:, 0:1]))
+    assert np.all(cross >= -1e-12)
+    assert all(np.any(np.all(points == vertex, axis=1)) for vertex in edges_start)
+
+
+def test_convex_hull():
+    points = np.random.random(size=(1000, 2))
+
+    hull = Point2D(points).convex_hull()
+
+    assert isinstance(hull, Point2D)
+    _assert_convex_hull(points, hull)
+    assert Point2D([[0, 0], [1, 0], [1, 1], [0, 1], [0.5, 0], [0.5, 0.5], [1, 1]]).convex_hull() == \
+        Point2D([[0, 0], [1, 0], [1, 1], [0, 1]])
+    assert Point2D([[0, 0], [2, 0], [1, -1]]).convex_hull() == Point2D([[0, 0], [1, -1], [2, 0]])
+    assert Point2D([[1, 1], [1, 1]]).convex_hull() == Point2D([[1, 1]])
+    assert Point2D([[0, 0], [2, 2], [1, 1]]).convex_hull() == Point2D([[0, 0], [2, 2]])
+
+
+def test_convex_hull_ragged():
+    points = np.random.random(size=(1000, 2))
+    offsets = np.array([0, 3, 3, 400, 1000])
+
+    hull_offsets, hulls = Point2D(points).convex_hull(offsets)
+
+    assert len(hull_offsets) == len(offsets)
+    assert hull_offsets[2] - hull_offsets[1] == 0
+    for group in range(len(offsets) - 1):
+        hull = hulls[hull_offsets[group]:hull_offsets[group + 1]]
+        assert hull == Point2D(points[offsets[group]:offsets[group + 1]]).convex_hull()
+
+
+def test_min_enclosing_circle():
+    points = np.random.random(size=(20, 2))
+    hull = Point2D(points).convex_hull().view(np.ndarray)
+    # the minimal circle is defined by 2 or 3 (hull) points
+    candidates = [((a + b) / 2, np.linalg.norm(a - b) / 2) for a in hull for b in hull]
+    for a in hull:
+        for b in hull:
+            for c in hull:
+                d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+                if d != 0:
+                    center = np.array([
+                        (a @ a * (b[1] - c[1]) + b @ b * (c[1] - a[1]) + c @ c * (a[1] - b[1])) / d,
+                        (a @ a * (c[0] - b[0]) + b @ b * (a[0] - c[0]) + c @ c * (b[0] - a[0])) / d
+                    ])
+                    candidates.append((center, np.linalg.norm(a - center)))
+    expected_radius = min(r for center, r in candidates if np.linalg.norm(points - center, axis=1).max() <= r + 1e-9)
+
+    center, radius = Point2D(points).min_enclosing_circle()
+
+    assert isinstance(center, Point2D)
+    assert np.isclose(radius, expected_radius)
+    assert np.linalg.norm(points - center.view(np.ndarray), axis=1).max() <= radius * (1 + 1e-9)
+
+
+def test_min_enclosing_circle_ragged():
+    points = np.random.random(size=(1000, 2)) + 1e6
+    offsets = np.array([0, 1, 1, 500, 1000])
+
+    centers, radii = Point2D(points).min_enclosing_circle(offsets)
+
+    assert centers.shape == (len(offsets) - 1, 2)
+    assert radii[0] == 0 and np.all(centers[0] == Point2D(points[0]))
+    assert np.isnan(radii[1])
+    for group in (2, 3):
+        center, radius = Point2D(points[offsets[group]:offsets[group + 1]]).min_enclosing_circle()
+        assert np.isclose(radii[group], radius)
+        assert np.allclose(centers[group], center)
+
+
+def test_bin():
+    points = np.random.random(size=(200_000, 2))
+    values = np.random.random(size=len(points))
+    counts, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=[10, 20], range=[[0, 1], [0, 1]])
+    sums, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=[10, 20], range=[[0, 1], [0, 1]], weights=values)
+
+    binned = Point2D(points).bin(GridSpec.from_bounds(0, 1, 0, 1, 10, 20), values)
+
+    assert binned.cells is None
+    assert np.array_equal(binned.counts, counts)
+    assert np.allclose(binned.sums, sums)
+    assert np.allclose(binned.means, sums / counts)
+    assert Point2D(points).bin(GridSpec.from_bounds(0, 0.5, 0, 1, 2, 2)).counts.sum() == np.sum(points[:, 0] < 0.5)
+
+
+def test_bin_sparse():
+    points = np.random.random(size=(10_000, 2))
+    values = np.random.random(size=(len(points), 2))
+    grid_spec = GridSpec.from_bounds(0, 0.5, 0, 1, 10_000, 10_000)
+    dense = Point2D(points).bin(GridSpec.from_bounds(0, 0.5, 0, 1, 100, 100), values)
+
+    binned = Point2D(points).bin(grid_spec, values, sparse=True)
+    coarse = Point2D(points).bin(GridSpec.from_bounds(0, 0.5, 0, 1, 100, 100), values, sparse=True)
+
+    assert binned.counts.sum() == np.sum(points[:, 0] < 0.5)
+    assert np.all(np.diff(binned.cells) > 0)
+    assert binned.sums.shape == binned.means.shape == (len(binned.cells), 2)
+    assert np.array_equal(coarse.counts, dense.counts.reshape(-1)[coarse.cells])
+    assert np.allclose(coarse.means, dense.means.reshape(-1, 2)[coarse.cells])
+
+
+def test_dbscan():
+    for scale, eps, min_samples in ((1, 0.05, 4), (5, 0.3, 8), (20, 0.3, 1)):
+        p = Point2D(np.random.random(size=(600, 2)) * scale)
+
+        labels = p.dbscan(eps, min_samples)
+
+        assert np.array_equal(labels, brute_force_dbscan(p.euclid_dist(p), eps, min_samples))
+
+
+def test_spatial_keys():
+    cells = np.stack(np.meshgrid(np.arange(8), np.arange(8), indexing='ij'), axis=-1).reshape(-1, 2).astype(float)
+    p = Point2D(cells + 0.5)
+    bounds = (0., 8., 0., 8.)
+
+    hilbert_keys = p.spatial_keys(bits=3, bounds=bounds)
+    morton_keys = p.spatial_keys(Point2D.Curve.MORTON, bits=3, bounds=bounds)
+
+    assert np.array_equal(np.sort(hilbert_keys), np.arange(64))
+    assert np.array_equal(np.sort(morton_keys), np.arange(64))
+    # consecutive cells along the Hilbert curve are adjacent
+    steps = np.abs(np.diff(cells[np.argsort(hilbert_keys)], axis=0)).sum(axis=1)
+    assert np.all(steps == 1)
+    x1, x2 = cells[:, 0].astype(int), cells[:, 1].astype(int)
+    expected_morton_keys = sum((((x1 >> bit) & 1) << (2 * bit + 1)) | (((x2 >> bit) & 1) << (2 * bit))
+                               for bit in range(3))
+    assert np.array_equal(morton_keys, expected_morton_keys)
+    # points outside of the bounds are clamped to the border cells
+    assert np.array_equal(Point2D([[-5., -5.], [100., 100.]]).spatial_keys(bits=3, bounds=bounds),
+                          p.spatial_keys(bits=3, bounds=bounds)[[0, -1]])
+
+
+def test_sort_spatially():
+    p = Point2D(np.random.random(size=(5000, 2)))
+
+    for curve in (Point2D.Curve.HILBERT, Point2D.Curve.MORTON):
+        sorted_p, order = p.sort_spatially(curve)
+
+        assert type(sorted_p) is Point2D
+        assert np.array_equal(order, np.argsort(p.spatial_keys(curve), kind='stable'))
+        assert np.array_equal(sorted_p, p[order])
+        assert np.all(np.diff(sorted_p.spatial_keys(curve)) >= 0)
+        assert np.linalg.norm(np.diff(sorted_p, axis=0), axis=1).mean() < \
+               np.linalg.norm(np.diff(p, axis=0), axis=1).mean() / 10
+
+    sorted_empty, empty_order = Point2D(np.empty((0, 2))).sort_spatially()
+    assert len(sorted_empty) == len(empty_order) == 0
+    assert len(radix_argsort(np.empty(0, dtype=np.int64), 32)) == 0
+
+
+def _brute_force_douglas_peucker(points, tolerance):
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+
+    def simplify(a, b):
+        if b - a < 2:
+            return
+        d = points[b] - points[a]
+        t = np.clip((points[a + 1:b] - points[a]) @ d / (d @ d), 0, 1)
+        dists = np.linalg.norm(points[a + 1:b] - points[a] - t[:, None] * d, axis=1)
+        farthest = a + 1 + np.argmax(dists)
+        if dists.max() > tolerance:
+            keep[farthest] = True
+            simplify(a, farthest)
+            simplify(farthest, b)
+
+    simplify(0, len(points) - 1)
+    return keep
+
+
+def _brute_force_visvalingam(points, tolerance):
+    def area(a, i, b):
+        (a1, a2), (b1, b2) = points[a] - points[i], points[b] - points[i]
+        return abs(a1 * b2 - a2 * b1) / 2
+
+    kept = list(range(len(points)))
+    areas = {i: area(i - 1, i, i + 1) for i in range(1, len(points) - 1)}
+    while len(kept) > 2:
+        k = min(range(1, len(kept) - 1), key=lambda k: (areas[kept[k]], kept[k]))
+        removed_area = areas[kept[k]]
+        if removed_area >= tolerance:
+            break
+        kept.pop(k)
+        if k > 1:
+            areas[kept[k - 1]] = max(area(kept[k - 2], kept[k - 1], kept[k]), removed_area)
+        if k < len(kept) - 1:
+            areas[kept[k]] = max(area(kept[k - 1], kept[k], kept[k + 1]), removed_area)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[kept] = True
+    return keep
+
+
+def test_simplify():
+    lengths = [0, 1, 2, 3, 50, 200, 7]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    p = Point2D(np.cumsum(np.random.normal(size=(offsets[-1], 2)), axis=0))
+
+    for method, brute_force in ((Point2D.Simplification.DOUGLAS_PEUCKER, _brute_force_douglas_peucker),
+                                (Point2D.Simplification.VISVALINGAM, _brute_force_visvalingam)):
+        for tolerance in (0., 0.5, 2., 100.):
+            keep = p.simplify_mask(tolerance, method, offsets=offsets)
+
+            assert np.array_equal(keep, np.concatenate([brute_force(np.asarray(p[start:end]), tolerance)
+                                                        if end > start else np.zeros(0, dtype=bool)
+                                                        for start, end in zip(offsets[:-1], offsets[1:])]))
+            simplified, simplified_offsets = p.simplify(tolerance, method, offsets=offsets)
+            assert type(simplified) is Point2D
+            assert np.array_equal(simplified, p[keep])
+            assert np.array_equal(np.diff(simplified_offsets), [keep[start:end].sum()
+                                                                for start, end in zip(offsets[:-1], offsets[1:])])
+    # a single polyline
+    assert np.array_equal(p[offsets[4]:offsets[5]].simplify(2.),
+                          p[offsets[4]:offsets[5]][_brute_force_douglas_peucker(np.asarray(p[offsets[4]:offsets[5]]),
+                                                                                2.)])
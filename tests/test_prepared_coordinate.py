@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from vectorized2d import Coordinate, PreparedCoordinate
+
+
+def _rand_coordinates(n):
+    return Coordinate(lat=33 + np.random.random(size=(n,)), lon=34 + np.random.random(size=(n,)),
+                      units=Coordinate.Units.DEGREES)
+
+
+def _pairwise(query, targets, func):
+    return func(query.repeat(len(targets)), targets.tile(len(query))).reshape(len(query), len(targets))
+
+
+def test_prepare():
+    targets = _rand_coordinates(100)
+    prepared = targets.prepare()
+
+    assert isinstance(prepared, PreparedCoordinate)
+    assert len(prepared) == len(targets)
+    assert prepared.coordinate == targets
+
+
+def test_prepared_is_immutable():
+    targets = _rand_coordinates(100)
+    prepared = targets.prepare()
+
+    with pytest.raises(AttributeError):
+        prepared._lat = None
+    with pytest.raises(ValueError):
+        prepared.coordinate[0] = 0
+
+
+def test_prepared_geo_dist_and_bearing():
+    targets = _rand_coordinates(300)
+    query = _rand_coordinates(200)
+    prepared = targets.prepare()
+
+    dists, bearings = prepared.geo_dist_and_bearing(query)
+
+    assert dists.shape == bearings.shape == (len(query), len(targets))
+    assert np.allclose(dists, _pairwise(query, targets, Coordinate.geo_dist))
+    assert np.allclose(bearings, _pairwise(query, targets, Coordinate.bearing))
+
+
+def test_prepared_min_and_argmin_geo_dist():
+    targets = _rand_coordinates(2000)
+    query = _rand_coordinates(500)
+    prepared = targets.prepare()
+    dists = _pairwise(query, targets, Coordinate.geo_dist)
+
+    assert np.array_equal(prepared.argmin_geo_dist(query), np.argmin(dists, axis=1))
+    assert np.allclose(prepared.min_geo_dist(query), np.min(dists, axis=1))
+
+
+def test_prepared_within_radius():
+    targets = _rand_coordinates(2000)
+    query = _rand_coordinates(300)
+    radius = 5_000
+    prepared = targets.prepare()
+    dists = _pairwise(query, targets, Coordinate.geo_dist)
+
+    offsets, indices, within_dists = prepared.within_radius(query, radius)
+
+    assert len(offsets) == len(query) + 1
+    for i in range(len(query)):
+        expected = np.flatnonzero(dists[i] <= radius)
+        assert np.array_equal(indices[offsets[i]:offsets[i + 1]], expected)
+        assert np.allclose(within_dists[offsets[i]:offsets[i + 1]], dists[i, expected])
+
+
+def test_prepared_memo():
+    targets = _rand_coordinates(100)
+    query = _rand_coordinates(50)
+    prepared = targets.prepare(memo_size=1)
+
+    dists = prepared.geo_dist(query)
+    assert prepared.geo_dist(query.copy()) is dists
+    assert not dists.flags.writeable
+
+    prepared.bearing(query)  # evicts the memoized distances
+    assert prepared.geo_dist(query) is not dists
+    assert np.array_equal(prepared.geo_dist(query), dists)
+
+
+def test_prepared_memo_disabled():
+    targets = _rand_coordinates(100)
+    query = _rand_coordinates(50)
+    prepared = targets.prepare(memo_size=0)
+
+    assert prepared.geo_dist(query) is not prepared.geo_dist(query)
+
+
+def test_prepared_memo_threaded():
+    targets = _rand_coordinates(100)
+    queries = [_rand_coordinates(5) for _ in range(8)]
+    # a memo smaller than the number of distinct queries - so that the threads keep evicting each other's results
+    prepared = targets.prepare(memo_size=3)
+    expected = [prepared.geo_dist(query) for query in queries]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: prepared.geo_dist(queries[i % len(queries)]), range(4000)))
+
+    for i, dists in enumerate(results):
+        assert np.array_equal(dists, expected[i % len(queries)])
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+from numba import njit
+
+from vectorized2d import Coordinate, Point2D, ScalarCoordinate, ScalarPoint2D, ScalarVector2D, Vector2D
+
+
+def test_scalar_point_matches_array_path():
+    a, b = np.random.random(size=(2, 2))
+    p1, p2 = ScalarPoint2D(*a), ScalarPoint2D(*b)
+
+    assert np.isclose(p1.euclid_dist(p2), Point2D(a).euclid_dist(Point2D(b))[0, 0])
+    assert np.isclose(p1.euclid_dist_squared(p2), Point2D(a).euclid_dist_squared(Point2D(b))[0, 0])
+    assert np.isclose(p1.norm, Point2D(a).norm[0])
+    assert p1 - p2 == ScalarPoint2D(*(a - b))
+
+
+def test_scalar_vector_matches_array_path():
+    v1 = ScalarVector2D.from_polar(2, 30, direction_units=ScalarVector2D.Units.DEGREES)
+    v2 = ScalarVector2D(*np.random.uniform(-1, 1, size=2))
+    a1, a2 = v1.to_array(), v2.to_array()
+
+    assert isinstance(a1, Vector2D)
+    assert np.allclose(a1, Vector2D(magnitude=2, direction=30, direction_units=Vector2D.Units.DEGREES))
+    assert np.isclose(v1.direction, a1.direction[0])
+    assert np.isclose(v1.angle_to(v2), a1.angle_to(a2)[0])
+    assert np.allclose(v1.project_onto(v2).to_array(), a1.project_onto(a2))
+    assert np.allclose(v1.rotated(1).to_array(), a1.rotated(1))
+    assert np.isclose(v1.dot(v2), a1.dot(a2)[0])
+    assert np.isclose(v1.cross(v2), a1.cross(a2)[0])
+    assert np.isclose(v1.angle_between(v2), a1.angle_between(a2)[0])
+    zero = ScalarVector2D(-0., -0.)
+    assert math.copysign(1, (-v1).angle_to(zero)) == 1 and (-v1).angle_to(zero) == 0
+    assert math.copysign(1, (-v1).angle_between(zero)) == 1 and (-v1).angle_between(zero) == 0
+    assert np.allclose(v1.perp().to_array(), a1.perp())
+
+
+def test_scalar_coordinate_matches_array_path():
+    lat, lon = 33 + np.random.random(size=2), 34 + np.random.random(size=2)
+    c1 = ScalarCoordinate(lat=lat[0], lon=lon[0], units=ScalarCoordinate.Units.DEGREES)
+    c2 = ScalarCoordinate(lat=lat[1], lon=lon[1], units=ScalarCoordinate.Units.DEGREES)
+    a1, a2 = c1.to_array(), c2.to_array()
+
+    assert isinstance(a1, Coordinate)
+    assert a1 == Coordinate(lat=lat[0], lon=lon[0], units=Coordinate.Units.DEGREES)
+    assert ScalarCoordinate.from_array(a1) == c1
+    assert np.isclose(c1.geo_dist(c2), a1.geo_dist(a2)[0])
+    assert np.isclose(c1.geo_dist_squared(c2), a1.geo_dist_squared(a2)[0])
+    assert np.isclose(c1.bearing(c2), a1.bearing(a2)[0])
+    assert np.allclose(c1.geo_dist_and_bearing(c2), np.ravel(a1.geo_dist_and_bearing(a2)))
+    assert np.allclose(c1.shifted(geo_dist=1000, bearing=1).to_array(), a1.shifted(geo_dist=1000, bearing=1))
+
+
+def test_scalars_in_compiled_code():
+    @njit
+    def step(position, velocity, dt):
+        return position.shifted(velocity.norm * dt, math.pi / 2 - velocity.direction)
+
+    @njit
+    def vector_ops(v1, v2):
+        return (v1 + v2, v1 - v2, 2 * v1, v1 / 2, -v1, v1 == v2, v1.dot(v2), v1.cross(v2), v1.perp(),
+                v1.project_onto(v2), v1.rotated(0.3), v1.angle_to(v2), v1.angle_between(v2), v1.normalized())
+
+    @njit
+    def coordinate_ops(lat, lon, other):
+        c = ScalarCoordinate(lat=lat, lon=lon)
+        return c, c.lat, c.geo_dist(other), c.bearing(other), c.geo_dist_and_bearing(other), c.euclid_dist(other)
+
+    c = ScalarCoordinate(lat=0.5, lon=0.2)
+    v1, v2 = ScalarVector2D(3., 4.), ScalarVector2D(*np.random.uniform(-1, 1, size=2))
+
+    shifted = step(c, v1, 10.)
+    assert type(shifted) is ScalarCoordinate
+    assert shifted == c.shifted(v1.norm * 10., math.pi / 2 - v1.direction)
+    expected = (v1 + v2, v1 - v2, 2 * v1, v1 / 2, -v1, v1 == v2, v1.dot(v2), v1.cross(v2), v1.perp(),
+                v1.project_onto(v2), v1.rotated(0.3), v1.angle_to(v2), v1.angle_between(v2), v1.normalized())
+    for compiled, python in zip(vector_ops(v1, v2), expected):
+        assert type(compiled) is type(python)
+        assert np.allclose(tuple(compiled) if isinstance(python, ScalarVector2D) else compiled,
+                           tuple(python) if isinstance(python, ScalarVector2D) else python)
+    other = ScalarCoordinate(lat=0.51, lon=0.21)
+    compiled_c, lat, geo_dist, bearing, geo_dist_and_bearing, euclid_dist = coordinate_ops(0.5, 0.2, other)
+    assert compiled_c == c and lat == c.lat
+    assert np.isclose(geo_dist, c.geo_dist(other)) and np.isclose(bearing, c.bearing(other))
+    assert np.allclose(geo_dist_and_bearing, c.geo_dist_and_bearing(other))
+    assert np.isclose(euclid_dist, c.euclid_dist(other))
+    assert ScalarPoint2D(1., 2.).euclid_dist(ScalarPoint2D(4., 6.)) == 5.
@@ -1,6 +1,7 @@
 from random import random, randint
 
 import numpy as np
+import pytest
 
 from vectorized2d import Array2D, Vector2D
 
@@ -77,6 +78,18 @@ def test_create_multi_vector_with_multi_mag_single_dir():
                                       [m3 * np.cos(d), m3 * np.sin(d)]]))
 
 
+def test_from_polar():
+    magnitude = np.random.random(size=(1000,))
+    direction = np.random.uniform(0, 360, size=(1000,))
+
+    v = Vector2D.from_polar(magnitude, direction, direction_units=Vector2D.Units.DEGREES)
+
+    assert isinstance(v, Vector2D)
+    assert v.flags.c_contiguous
+    assert np.allclose(v, Vector2D(magnitude=magnitude, direction=direction, direction_units=Vector2D.Units.DEGREES))
+    assert np.allclose(Vector2D.from_polar(2, direction[:3]), Vector2D(magnitude=2, direction=direction[:3]))
+
+
 def test_project_v1_onto_v2():
     a = np.random.random(size=(5000, 2))
     b = np.random.random(size=(1, 2))
@@ -120,4 +133,60 @@ def test_angle_to():
     assert np.allclose(np.rad2deg(angle_diff), rotation)
 
     angle_diff = v_rotated.angle_to(v)
-    assert np.allclose(np.rad2deg(angle_diff), -rotation)
\ No newline at end of file
+    assert np.allclose(np.rad2deg(angle_diff), -rotation)
+
+
+def test_interpolate():
+    v = Vector2D(magnitude=np.array([2., 4.]), direction=np.deg2rad([350., 10.]))
+
+    interpolated = v.interpolate([0., 4.], [0., 1., 2., 4.])
+
+    expected = Vector2D(magnitude=np.array([2., 2.5, 3., 4.]), direction=np.deg2rad([350., 355., 0., 10.]))
+    assert np.allclose(interpolated, expected)
+
+
+def test_dot_cross_and_angles():
+    v1 = np.random.uniform(-1, 1, size=(1000, 2)).view(Vector2D)
+    v2 = np.random.uniform(-1, 1, size=(300, 2)).view(Vector2D)
+    a, b = v1.view(np.ndarray), v2.view(np.ndarray)
+
+    dots = v1.dot(v2, pairing=Vector2D.Pairing.ALL)
+    crosses = v1.cross(v2, pairing=Vector2D.Pairing.ALL)
+
+    assert np.allclose(dots, a @ b.T)
+    assert np.allclose(crosses, np.outer(a[:, 0], b[:, 1]) - np.outer(a[:, 1], b[:, 0]))
+    assert np.allclose(v1[:300].dot(v2), dots[np.arange(300), np.arange(300)])
+    assert np.allclose(v1.cross(v2[:1]), crosses[:, 0])
+    assert np.allclose(v1[:1].dot(v2, pairing=Vector2D.Pairing.ALL), dots[:1])
+    angles = v1.angle_between(v2, pairing=Vector2D.Pairing.ALL)
+    norms = np.outer(v1.norm, v2.norm)
+    assert np.allclose(np.cos(angles), dots / norms)
+    assert np.allclose(np.sin(angles), np.abs(crosses) / norms)
+    assert np.allclose(v1.perp(), v1.rotated(90, Vector2D.Units.DEGREES))
+    assert np.allclose(v1.perp().dot(v1), 0)
+    assert np.allclose(v1.angle_to(-v1), -np.pi)
+
+
+def test_zero_vector_angles():
+    v = np.array([[1., 0.], [-1., 0.], [0., -1.], [-1., -1.], [0., 0.]]).view(Vector2D)
+    zeros = np.array([[0., 0.], [-0., 0.], [0., -0.], [-0., -0.], [-0., -0.]]).view(Vector2D)
+
+    for angles in (v.angle_to(zeros), zeros.angle_to(v), v.angle_between(zeros), zeros.angle_between(v),
+                   v.angle_between(zeros, pairing=Vector2D.Pairing.ALL)):
+        # exactly 0 - neither -0. nor (-)pi
+        assert np.all(angles == 0) and not np.any(np.signbit(angles))
+
+
+def test_project_onto_broadcasting():
+    v1 = np.random.uniform(-1, 1, size=(1000, 2)).view(Vector2D)
+    v2 = np.random.uniform(-1, 1, size=(1000, 2)).view(Vector2D)
+    v2[0] = 0
+
+    projected = v1.project_onto(v2)
+
+    expected = v2 * (v1.dot(v2) / np.where(v2.norm_squared > 0, v2.norm_squared, 1))[:, np.newaxis]
+    assert np.allclose(projected, expected)
+    assert np.array_equal(projected[0], [[0., 0.]])
+    assert np.allclose(v1[:1].project_onto(v2[1:]), v2[1:] * (v2[1:].dot(v1[:1]) / v2[1:].norm_squared)[:, np.newaxis])
+    with pytest.raises(AssertionError):
+        v1.dot(v2[:10])
@@ -2,6 +2,11 @@ from .array2d import Array2D
 from .point2d import Point2D
 from .vector2d import Vector2D
 from .coordinate import Coordinate
+from .prepared_coordinate import PreparedCoordinate
+from .scalar import ScalarPoint2D, ScalarVector2D, ScalarCoordinate
+from .buffer import Array2DBuffer
+from . import kernels, numba_types  # noqa: F401 - numba_types registers the scalar types with numba
 
-__all__ = ['Array2D', 'Point2D', 'Vector2D', 'Coordinate']
+__all__ = ['Array2D', 'Point2D', 'Vector2D', 'Coordinate', 'PreparedCoordinate', 'ScalarPoint2D', 'ScalarVector2D',
+           'ScalarCoordinate', 'Array2DBuffer']
 __version__ = "0.0.6"
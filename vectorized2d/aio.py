@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vectorized2d.coordinate import Coordinate
+from vectorized2d.executor import (DistReduction, _REDUCE_BLOCK_KERNELS, _chunk_args, _chunk_kwargs, _concat_results,
+                                   _launch_threading_layer, _split_length)
+from vectorized2d.point2d import Point2D
+from vectorized2d.prepared_coordinate import PreparedCoordinate
+
+# A rough estimate of the memory [bytes] that a row-wise operation needs per row (a few float64 temporaries)
+_ROW_BYTES = 64
+
+
+class _MemoryBudget:
+    """
+    An asyncio semaphore that counts [bytes] rather than slots.
+    Releasing is synchronous, so that it can be scheduled from a worker thread once the work is actually done.
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._available = capacity
+        self._waiters = deque()
+
+    async def acquire(self, n_bytes: int) -> int:
+        n_bytes = min(n_bytes, self._capacity)  # an oversized request waits for the whole budget
+        while self._available < n_bytes:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._available -= n_bytes
+        return n_bytes
+
+    def release(self, n_bytes: int):
+        self._available += n_bytes
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+def _concat_csr(results: Sequence[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, ...]:
+    offsets = [results[0][0]]
+    for chunk_offsets, _, _ in results[1:]:
+        offsets.append(chunk_offsets[1:] + offsets[-1][-1])
+    return (np.concatenate(offsets), np.concatenate([indices for _, indices, _ in results]),
+            np.concatenate([dists for _, _, dists in results]))
+
+
+class AsyncExecutor:
+    """
+    An asyncio-native interface for offloading heavy vectorized2d operations to a managed thread pool.
+
+    Every operation is split into chunks of rows, that run on the worker threads (all the kernels release the GIL),
+    so that the event loop stays responsive. Cancelling an awaited operation cancels all its pending chunks.
+    The estimated memory of all the chunks in flight (across all the awaits) is limited by max_in_flight_bytes.
+
+    Examples:
+    ---------
+    >>> async with AsyncExecutor() as executor:  # doctest: +SKIP
+    ...     dists, bearings = await executor.geo_dist_and_bearing(positions, sites)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 250_000,
+                 max_in_flight_bytes: int = 1 << 30):
+        """
+
+        :param max_workers: the number of worker threads (defaults to the number of CPUs).
+        :param chunk_size: the number of rows per chunk.
+        :param max_in_flight_bytes: the maximal estimated memory of all the chunks in flight [bytes].
+        """
+        _launch_threading_layer()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+        self._chunk_size = chunk_size
+        self._budget = _MemoryBudget(max_in_flight_bytes)
+
+    async def __aenter__(self) -> AsyncExecutor:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # waits for the running chunks on a thread of the loop's default executor, so that the loop is not blocked
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the worker threads.
+        """
+        self._pool.shutdown(wait=wait)
+
+    async def _run_chunk(self, func: Callable, args: Tuple[Any, ...], kwargs: dict, n_bytes: int) -> Any:
+        n_bytes = await self._budget.acquire(n_bytes)
+        loop = asyncio.get_running_loop()
+        future = self._pool.submit(functools.partial(func, *args, **kwargs))
+        # the budget is released only once the chunk is done (or cancelled before it started) on the worker thread
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._budget.release, n_bytes))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    async def _gather(coroutines) -> list:
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            # on cancellation (or failure of a single chunk) none of the pending chunks should keep running
+            for task in tasks:
+                task.cancel()
+
+    async def _split(self, func: Callable, args: Tuple[Any, ...], kwargs: dict, chunk_size: Optional[int],
+                     row_bytes: int) -> list:
+        n = _split_length(args)
+        chunk_size = chunk_size or self._chunk_size
+        return await self._gather(
+            self._run_chunk(func, _chunk_args(args, n, start, start + chunk_size),
+                            _chunk_kwargs(kwargs, n, start, start + chunk_size), min(chunk_size, n - start) * row_bytes)
+            for start in range(0, max(n, 1), chunk_size)
+        )
+
+    async def run(self, func: Callable, *args, row_bytes: int = _ROW_BYTES, **kwargs) -> Any:
+        """
+        Offloads a single operation (as a whole) to a worker thread.
+
+        :param func: the operation to run
+        :param row_bytes: an estimate of the memory the operation needs per row of its largest array argument [bytes]
+        :return: the result of func(*args, **kwargs)
+        """
+        return await self._run_chunk(func, args, kwargs, _split_length(args) * row_bytes)
+
+    async def split(self, func: Callable, *args, chunk_size: Optional[int] = None, row_bytes: int = _ROW_BYTES,
+                    **kwargs) -> Any:
+        """
+        Splits a row-wise operation into chunks that run on the worker threads, and concatenates the results.
+
+        Every array argument (positional or keyword) of the length N of the largest positional array argument is
+        split into chunks of rows, while all other arguments are passed as-is to every chunk.
+        Note: pass unbound methods (e.g. Coordinate.geo_dist) so that `self` is split as well.
+        Note: the `other` of a pairwise (all pairs) operation must be passed as a keyword (other=...), which is never
+        split.
+
+        :param func: a row-wise operation, whose results (or tuple of results) are concatenated along axis 0
+        :param chunk_size: the number of rows per chunk (defaults to the executor chunk_size)
+        :param row_bytes: an estimate of the memory the operation needs per row [bytes]
+        :return: the concatenated result(s) of func over all the chunks
+        """
+        return _concat_results(await self._split(func, args, kwargs, chunk_size, row_bytes))
+
+    async def euclid_dist(self, points: Point2D, other: Point2D, *,
+                          pairing: Point2D.Pairing = Point2D.Pairing.ALL) -> np.ndarray:
+        """
+        An awaitable counterpart of Point2D.euclid_dist.
+        """
+        if pairing is Point2D.Pairing.ALIGNED or len(other) == 1:
+            return await self.split(Point2D.euclid_dist, points, other, pairing=pairing)
+        return await self.split(Point2D.euclid_dist, points, other=other, pairing=pairing,
+                                row_bytes=3 * 8 * len(other))
+
+    async def geo_dist(self, coordinates: Coordinate, other: Coordinate) -> np.ndarray:
+        """
+        An awaitable counterpart of Coordinate.geo_dist.
+        """
+        return await self.split(Coordinate.geo_dist, coordinates, other)
+
+    async def bearing(self, coordinates: Coordinate, other: Coordinate) -> np.ndarray:
+        """
+        An awaitable counterpart of Coordinate.bearing.
+        """
+        return await self.split(Coordinate.bearing, coordinates, other)
+
+    async def geo_dist_and_bearing(self, coordinates: Coordinate, other: Coordinate) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        An awaitable counterpart of Coordinate.geo_dist_and_bearing.
+        """
+        return await self.split(Coordinate.geo_dist_and_bearing, coordinates, other)
+
+    async def shifted(self, coordinates: Coordinate, geo_dist: Union[float, np.ndarray],
+                      bearing: Union[float, np.ndarray]) -> Coordinate:
+        """
+        An awaitable counterpart of Coordinate.shifted.
+        """
+        return await self.split(Coordinate.shifted, coordinates, geo_dist, bearing)
+
+    async def min_geo_dist(self, prepared: PreparedCoordinate, query: Coordinate) -> np.ndarray:
+        """
+        An awaitable counterpart of PreparedCoordinate.min_geo_dist (the chunks of the query are not memoized).
+        """
+        min_dists, _ = await self.split(prepared._compute_nearest, query)
+        return min_dists
+
+    async def argmin_geo_dist(self, prepared: PreparedCoordinate, query: Coordinate) -> np.ndarray:
+        """
+        An awaitable counterpart of PreparedCoordinate.argmin_geo_dist (the chunks of the query are not memoized).
+        """
+        _, argmins = await self.split(prepared._compute_nearest, query)
+        return argmins
+
+    async def within_radius(self, prepared: PreparedCoordinate, query: Coordinate,
+                            radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        An awaitable counterpart of PreparedCoordinate.within_radius (the chunks of the query are not memoized).
+        """
+        return _concat_csr(await self._split(prepared._compute_within_radius, (query,), {'radius': radius}, None,
+                                             _ROW_BYTES))
+
+    async def _reduce(self, metric: str, a: np.ndarray, b: np.ndarray, radius: Optional[float]) -> DistReduction:
+        assert len(b) > 0, 'distance reductions are undefined for an empty `other`'
+        a = np.ascontiguousarray(a, dtype=float)
+        b = np.ascontiguousarray(b, dtype=float)
+        n = len(a)
+        radius_squared = radius ** 2 if radius is not None else -1.0
+        min_dists = np.empty(n)
+        argmins = np.empty(n, dtype=np.int64)
+        counts = np.empty(n, dtype=np.int64)
+
+        # every block writes its reductions directly into the (preallocated) outputs
+        await self._gather(
+            self._run_chunk(_REDUCE_BLOCK_KERNELS[metric],
+                            (a, b, start, min(start + self._chunk_size, n), radius_squared, min_dists, argmins, counts),
+                            {}, 0)
+            for start in range(0, n, self._chunk_size)
+        )
+        return DistReduction(min_dist=min_dists, argmin=argmins, count_within=counts if radius is not None else None)
+
+    async def euclid_dist_reduce(self, points: Point2D, other: Point2D,
+                                 radius: Optional[float] = None) -> DistReduction:
+        """
+        An awaitable, streaming, per-row reduction of the euclidean distances between every point of `points` and
+        all the points of `other` (see SharedMemoryExecutor.euclid_dist_reduce).
+        """
+        return await self._reduce('euclid', points, other, radius)
+
+    async def geo_dist_reduce(self, coordinates: Coordinate, other: Coordinate,
+                              radius: Optional[float] = None) -> DistReduction:
+        """
+        An awaitable, streaming, per-row reduction of the geographical distances between every coordinate of
+        `coordinates` and all the coordinates of `other` (see SharedMemoryExecutor.geo_dist_reduce).
+        """
+        return await self._reduce('geo', coordinates, other, radius)
@@ -1,9 +1,132 @@
 from __future__ import annotations
 
-from typing import List, Sequence, Union, Iterable
+import pickle
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional, Sequence, Tuple, Union, Iterable
 
 import numpy as np
-from numba import njit
+import numba
+from numba import njit, prange
+
+if TYPE_CHECKING:
+    from vectorized2d.lazy import LazyArray2D
+
+# Rows per block of the parallel compaction (and the minimal rows per chunk of the parallel reductions)
+_BLOCK_SIZE = 1 << 16
+
+# Queries per parallel task of the interpolation
+_INTERPOLATION_BLOCK_SIZE = 1 << 12
+
+# The per group moments - count, weight, mean (x1, x2), co-moments (x1x1, x2x2, x1x2), min (x1, x2), max (x1, x2)
+_N_MOMENTS = 11
+
+
+class Statistics2D(NamedTuple):
+    """
+    Summary statistics of 2D elements (per group, for grouped statistics - along the first axis).
+    The centroid, covariance and dispersion are weighted (if weights are given), and undefined (nan) for a group
+    with no (positively weighted) elements. The bounding box covers all the elements.
+    """
+    count: Union[int, np.ndarray]  # the number of elements
+    weight: Union[float, np.ndarray]  # the sum of weights (the number of elements, if unweighted)
+    bbox_min: np.ndarray  # the minimal (x1, x2)
+    bbox_max: np.ndarray  # the maximal (x1, x2)
+    centroid: np.ndarray  # the (weighted) mean (x1, x2)
+    covariance: np.ndarray  # the (weighted, population) 2x2 covariance matrix
+    dispersion: Union[float, np.ndarray]  # the root (weighted) mean squared distance from the centroid
+
+
+def _n_chunks(n: int) -> int:
+    # the number of (thread-local) chunks of a parallel reduction - a single chunk for small inputs
+    return max(1, min(numba.get_num_threads(), n // _BLOCK_SIZE))
+
+
+def _n_group_chunks(n: int, n_groups: int) -> int:
+    # every chunk holds its own accumulators of all the groups - limit their total size to ~max(n, n_groups)
+    return max(1, min(_n_chunks(n), n // max(n_groups, 1)))
+
+
+def _from_columns_kernel(x1: np.ndarray, x2: np.ndarray, scale: float) -> np.ndarray:
+    out = np.empty((len(x1), 2))
+    for i in prange(len(x1)):
+        out[i, 0] = x1[i] * scale
+        out[i, 1] = x2[i] * scale
+    return out
+
+
+_from_columns_serial = njit(nogil=True)(_from_columns_kernel)
+_from_columns_parallel = njit(parallel=True, nogil=True)(_from_columns_kernel)
+
+
+def _group_labels(labels: Optional[Union[np.ndarray, Iterable[int]]], n: int,
+                  n_groups: Optional[int]) -> Tuple[np.ndarray, int]:
+    # no labels are passed to the kernels as an empty array (a single group)
+    if labels is None:
+        return np.empty(0, dtype=np.int64), 1
+    labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+    assert len(labels) == n, 'labels must be of the same length as the array'
+    if n_groups is None:
+        n_groups = int(labels.max()) + 1 if n > 0 else 0
+    return labels, n_groups
+
+
+def _group_weights(weights: Optional[Union[np.ndarray, Iterable[float]]], n: int) -> np.ndarray:
+    # no weights are passed to the kernels as an empty array (unit weights)
+    if weights is None:
+        return np.empty(0)
+    weights = np.asarray(weights, dtype=float).reshape(-1)
+    assert len(weights) == n, 'weights must be of the same length as the array'
+    return weights
+
+
+def _ragged_offsets(offsets: Optional[Union[np.ndarray, Iterable[int]]], n: int) -> np.ndarray:
+    # no offsets is a single group of all the rows
+    if offsets is None:
+        return np.array([0, n], dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64).reshape(-1)
+    assert len(offsets) >= 1 and offsets[0] >= 0 and offsets[-1] <= n and np.all(np.diff(offsets) >= 0), \
+        'offsets must be non-decreasing row offsets into the array'
+    return offsets
+
+
+@njit(nogil=True)
+def _merge_moments(s: np.ndarray, t: np.ndarray):
+    """
+    Merges the moments t into s (the pairwise update of Chan et al.).
+    """
+    s[0] += t[0]
+    s[7] = min(s[7], t[7])
+    s[8] = min(s[8], t[8])
+    s[9] = max(s[9], t[9])
+    s[10] = max(s[10], t[10])
+    if t[1] == 0:
+        return
+    if s[1] == 0:
+        s[1:7] = t[1:7]
+        return
+    weight = s[1] + t[1]
+    d1 = t[2] - s[2]
+    d2 = t[3] - s[3]
+    factor = s[1] * t[1] / weight
+    s[4] += t[4] + d1 * d1 * factor
+    s[5] += t[5] + d2 * d2 * factor
+    s[6] += t[6] + d1 * d2 * factor
+    s[2] += d1 * t[1] / weight
+    s[3] += d2 * t[1] / weight
+    s[1] = weight
+
+
+@njit(nogil=True)
+def _lerp(points: np.ndarray, i: int, j: int, weight: float, out: np.ndarray, row: int):
+    # linear interpolation between rows i and j (a weight of 0 for j == i, an exact row)
+    out[row, 0] = points[i, 0] + weight * (points[j, 0] - points[i, 0])
+    out[row, 1] = points[i, 1] + weight * (points[j, 1] - points[i, 1])
+
+
+def _from_pickle_buffer(cls: type, buffer, dtype: str, shape: tuple, order: str) -> Array2D:
+    # a view of the (possibly out-of-band) buffer - no copy is made
+    if isinstance(buffer, pickle.PickleBuffer):
+        buffer = buffer.raw()  # a flat view, also for Fortran-ordered arrays
+    return np.frombuffer(buffer, dtype=dtype).reshape(shape, order=order).view(cls)
 
 
 class Array2D(np.ndarray):
@@ -70,6 +193,41 @@ class Array2D(np.ndarray):
         """
         return np.concatenate(arrays).view(cls)
 
+    @staticmethod
+    def _from_columns(x1: np.ndarray, x2: np.ndarray, scale: float) -> np.ndarray:
+        # small inputs are filled serially - the parallel kernel's thread launch dominates below a block of rows
+        kernel = _from_columns_parallel if len(x1) >= _BLOCK_SIZE else _from_columns_serial
+        return kernel(x1, x2, scale)
+
+    @staticmethod
+    def _broadcast_columns(x1: Union[float, np.ndarray, Iterable[float]],
+                           x2: Union[float, np.ndarray, Iterable[float]]) -> List[np.ndarray]:
+        x1 = np.asarray(x1, dtype=float).reshape(-1)
+        x2 = np.asarray(x2, dtype=float).reshape(-1)
+        # broadcasting is zero-copy (a single value is read with a zero stride)
+        shape = np.broadcast_shapes(x1.shape, x2.shape)
+        return [x if x.shape == shape else np.broadcast_to(x, shape) for x in (x1, x2)]
+
+    @classmethod
+    def from_columns(cls, x1: Union[float, np.ndarray, Iterable[float]],
+                     x2: Union[float, np.ndarray, Iterable[float]]) -> Array2D:
+        """
+        Creates an Array2D object from two columns, in a single pass into a C-contiguous Nx2 buffer.
+        A scalar column is broadcast to the length of the other column.
+
+        Examples:
+        --------
+        >>> Array2D.from_columns([1, 3], [2, 4])
+        Array2D([[1., 2.],
+                 [3., 4.]])
+
+        :param x1: the first column
+        :param x2: the second column
+        :return: an Array2D object of shape Nx2
+        """
+        x1, x2 = cls._broadcast_columns(x1, x2)
+        return cls._from_columns(x1, x2, 1.0).view(cls)
+
     def repeat(self, repeats: Union[int, Iterable[int]], axis=None) -> Array2D:
         """
         Overrides repeat method to always repeat over axis 0.
@@ -117,11 +275,193 @@ class Array2D(np.ndarray):
         """
         return np.tile(self, (reps, 1)).view(type(self))
 
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _take(a: np.ndarray, indices: np.ndarray, out: np.ndarray):
+        n = len(a)
+        n_invalid = 0  # raising inside the loop would prevent its parallelization
+        for i in prange(len(indices)):
+            j = indices[i]
+            if j < 0:
+                j += n
+            if 0 <= j < n:
+                out[i, 0] = a[j, 0]
+                out[i, 1] = a[j, 1]
+            else:
+                n_invalid += 1
+        if n_invalid > 0:
+            raise IndexError('index is out of bounds')
+
+    @staticmethod
+    def _row_indices(indices: Union[int, np.ndarray, Iterable[int]], n: int, mode: str) -> np.ndarray:
+        # clip and wrap are resolved into valid row indices up front, so that the kernels only deal with 'raise'
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if mode not in ('raise', 'wrap', 'clip'):
+            raise ValueError(f"mode must be one of 'raise', 'wrap' or 'clip', got {mode!r}")
+        if mode == 'raise' or n == 0:  # no rows to clip or wrap into - the kernels raise
+            return indices
+        return indices % n if mode == 'wrap' else np.clip(indices, 0, n - 1)
+
+    @staticmethod
+    def _out_buffer(out: np.ndarray, n: int) -> np.ndarray:
+        if out is None:
+            return np.empty((n, 2))
+        assert out.shape == (n, 2) and out.dtype == np.float64, f'out must be a float64 array of shape ({n}, 2)'
+        return out
+
+    def take(self, indices: Union[int, np.ndarray, Iterable[int]], axis=None, out: np.ndarray = None,
+             mode='raise') -> Array2D:
+        """
+        Overrides take method to always take rows (over axis 0), in a single compiled pass.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[1., 2.], [3., 4.], [5., 6.]])
+
+        >>> a1.take([2, 0])
+        Array2D([[5., 6.],
+                 [1., 2.]])
+
+        :param indices: the indices of the rows to take (negative indices count from the end)
+        :param axis: to take along the 0 axis, unless specifically stated otherwise
+        :param out: an optional float64 buffer of shape (len(indices), 2) to write the rows into
+        :param mode: how out of bounds indices are treated - 'raise' an IndexError, 'wrap' around or 'clip' to the
+                     first or last row (as in numpy, 'clip' clips negative indices to the first row)
+        :return: an object of the same type as self, that holds the taken rows (a view of out, if given)
+        """
+        if axis not in (None, 0):
+            return super().take(indices, axis=axis, out=out, mode=mode)
+        indices = self._row_indices(indices, len(self), mode)
+        out = self._out_buffer(out, len(indices))
+        self._take(self.view(np.ndarray), indices, out)
+        return out.view(type(self))
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _compress(a: np.ndarray, condition: np.ndarray, out: np.ndarray):
+        # every block counts its selected rows, so that all the blocks can be compacted in parallel
+        n = min(len(a), len(condition))
+        n_blocks = (n + _BLOCK_SIZE - 1) // _BLOCK_SIZE
+        block_offsets = np.zeros(n_blocks + 1, dtype=np.int64)
+        for block in prange(n_blocks):
+            count = 0
+            for i in range(block * _BLOCK_SIZE, min((block + 1) * _BLOCK_SIZE, n)):
+                if condition[i]:
+                    count += 1
+            block_offsets[block + 1] = count
+        for block in range(n_blocks):
+            block_offsets[block + 1] += block_offsets[block]
+        for block in prange(n_blocks):
+            k = block_offsets[block]
+            for i in range(block * _BLOCK_SIZE, min((block + 1) * _BLOCK_SIZE, n)):
+                if condition[i]:
+                    out[k, 0] = a[i, 0]
+                    out[k, 1] = a[i, 1]
+                    k += 1
+
+    def compress(self, condition: Union[np.ndarray, Iterable[bool]], axis=None, out: np.ndarray = None) -> Array2D:
+        """
+        Overrides compress method to always select rows (over axis 0), in a single compiled pass.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[1., 2.], [3., 4.], [5., 6.]])
+
+        >>> a1.compress([True, False, True])
+        Array2D([[1., 2.],
+                 [5., 6.]])
+
+        :param condition: a boolean mask of the rows to select (a shorter mask is treated as False for the rest)
+        :param axis: to select along the 0 axis, unless specifically stated otherwise
+        :param out: an optional float64 buffer of shape (number of selected rows, 2) to write the rows into
+        :return: an object of the same type as self, that holds the selected rows (a view of out, if given)
+        """
+        if axis not in (None, 0):
+            return super().compress(condition, axis=axis, out=out)
+        condition = np.asarray(condition, dtype=bool).reshape(-1)
+        assert len(condition) <= len(self), 'condition is longer than the array'
+        out = self._out_buffer(out, np.count_nonzero(condition))
+        self._compress(self.view(np.ndarray), condition, out)
+        return out.view(type(self))
+
+    @staticmethod
+    @njit(nogil=True)
+    def _put(a: np.ndarray, indices: np.ndarray, values: np.ndarray):
+        # sequential, so that the last value is the one kept for repeated indices (as in numpy)
+        n = len(a)
+        for i in range(len(indices)):
+            j = indices[i]
+            if j < 0:
+                j += n
+            if j < 0 or j >= n:
+                raise IndexError('index is out of bounds')
+            row = i % len(values)
+            a[j, 0] = values[row, 0]
+            a[j, 1] = values[row, 1]
+
+    def put(self, indices: Union[int, np.ndarray, Iterable[int]], values, mode='raise'):
+        """
+        Overrides put method to always replace rows (over axis 0) in-place, in a single compiled pass.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[1., 2.], [3., 4.], [5., 6.]])
+        >>> a1.put([0, 2], [[0., 0.], [9., 9.]])
+
+        >>> a1
+        Array2D([[0., 0.],
+                 [3., 4.],
+                 [9., 9.]])
+
+        :param indices: the indices of the rows to replace (negative indices count from the end)
+        :param values: the replacing rows - an Nx2 array, repeated if shorter than indices
+        :param mode: how out of bounds indices are treated - 'raise' an IndexError, 'wrap' around or 'clip' to the
+                     first or last row (as in numpy, 'clip' clips negative indices to the first row)
+        """
+        indices = self._row_indices(indices, len(self), mode)
+        values = np.asarray(values, dtype=float).reshape(-1, 2)
+        assert len(values) > 0 or len(indices) == 0, 'values must not be empty'
+        self._put(self.view(np.ndarray), indices, values)
+
+    def argsort_by(self, key: Union[np.ndarray, Callable[[Array2D], np.ndarray]], kind: str = 'stable',
+                   out: np.ndarray = None) -> Tuple[Array2D, np.ndarray]:
+        """
+        Reorders the rows by a sort key.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[1., 2.], [3., 0.], [5., 1.]])
+
+        >>> a1.argsort_by(a1.x2)
+        (Array2D([[3., 0.],
+                 [5., 1.],
+                 [1., 2.]]), array([1, 2, 0]))
+
+        :param key: a 1D array of len(self) to sort by, or a callable that computes it from self (e.g. lambda a: a.x2)
+        :param kind: the sorting algorithm (see numpy.argsort), stable by default
+        :param out: an optional float64 buffer of shape (len(self), 2) to write the reordered rows into
+        :return: a Tuple of the reordered rows (an object of the same type as self), and the sorting permutation
+                 (so that other arrays aligned with self can be reordered alike)
+        """
+        if callable(key):
+            key = key(self)
+        key = np.asarray(key).reshape(-1)
+        assert len(key) == len(self), 'key must be of the same length as the array'
+        order = np.argsort(key, kind=kind)
+        return self.take(order, out=out), order
+
+    def __reduce_ex__(self, protocol):
+        # numpy supports out-of-band (zero-copy) buffers only for exact ndarrays - subclasses are always copied
+        if protocol >= 5 and (self.flags.c_contiguous or self.flags.f_contiguous):
+            order = 'C' if self.flags.c_contiguous else 'F'
+            return _from_pickle_buffer, (type(self), pickle.PickleBuffer(self), self.dtype.str, self.shape, order)
+        return super().__reduce_ex__(protocol)
+
     def __hash__(self):
         return hash(self.tobytes())
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _array_equal(a: np.ndarray, b: np.ndarray) -> bool:
         res = True
         for i in range(len(a)):
@@ -170,25 +510,236 @@ class Array2D(np.ndarray):
         return [self[i:(i + 1)] for i in range(len(self))]
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _norm(a: Array2D) -> np.ndarray:
         return np.sqrt(a[:, 0] ** 2 + a[:, 1] ** 2)
 
     @property
     def norm(self) -> np.ndarray:
         # TODO: add a conditional parallel jit for larger arrays (~len > 500_000)
-        return self._norm(self)
+        return self._norm(self.view(np.ndarray))
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _norm_squared(a: Array2D) -> np.ndarray:
         return a[:, 0] ** 2 + a[:, 1] ** 2
 
     @property
     def norm_squared(self) -> np.ndarray:
-        return self._norm_squared(self)
+        return self._norm_squared(self.view(np.ndarray))
 
     def normalized(self) -> Array2D:
         norm = self.norm[:, np.newaxis]
         norm[norm == 0] = 1
         return self / norm
+
+    def lazy(self) -> LazyArray2D:
+        """
+        Starts a lazy expression - the (element-wise and row-wise) operations on it are only recorded, and
+        evaluate() computes all of them in a single fused (compiled and cached) pass over the rows, with no
+        intermediate arrays.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[3., 4.], [6., 8.]])
+
+        >>> ((a1.lazy() - Array2D([0., 4.])).normalized() * 2).norm.evaluate()
+        array([2., 2.])
+
+        :return: a LazyArray2D of the array (of its type, once evaluated)
+        """
+        from vectorized2d.lazy import LazyArray2D
+
+        return LazyArray2D._operand(self)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _interpolate(lerp, points: np.ndarray, times: np.ndarray, offsets: np.ndarray, query_times: np.ndarray,
+                     query_offsets: np.ndarray) -> np.ndarray:
+        """
+        Interpolates blocks of the queries of every track in parallel. Within a block, the bracketing rows of a query
+        are found by walking forward from those of the previous query (for sorted queries), or by a binary search.
+        The lerp function is a compile-time argument, so that it's inlined.
+        No query offsets (an empty array) stand for every track queried at all the query times.
+        """
+        n_tracks = len(offsets) - 1
+        shared_queries = len(query_offsets) == 0
+        block_counts = np.empty(n_tracks, dtype=np.int64)
+        for track in range(n_tracks):
+            n_queries = len(query_times) if shared_queries else query_offsets[track + 1] - query_offsets[track]
+            block_counts[track] = (n_queries + _INTERPOLATION_BLOCK_SIZE - 1) // _INTERPOLATION_BLOCK_SIZE
+        block_offsets = np.zeros(n_tracks + 1, dtype=np.int64)
+        block_offsets[1:] = np.cumsum(block_counts)
+
+        out = np.empty((n_tracks * len(query_times) if shared_queries else len(query_times), 2))
+        for block in prange(block_offsets[-1]):
+            track = np.searchsorted(block_offsets, block, side='right') - 1
+            start, end = offsets[track], offsets[track + 1]
+            first_query = 0 if shared_queries else query_offsets[track]
+            last_query = len(query_times) if shared_queries else query_offsets[track + 1]
+            block_start = first_query + (block - block_offsets[track]) * _INTERPOLATION_BLOCK_SIZE
+            block_end = min(block_start + _INTERPOLATION_BLOCK_SIZE, last_query)
+            # the output row of a query - blocks of len(query_times) rows per track, for shared queries
+            row_offset = track * len(query_times) if shared_queries else 0
+            i = -1
+            for query in range(block_start, block_end):
+                query_time = query_times[query]
+                row = row_offset + query
+                if start == end or not times[start] <= query_time <= times[end - 1]:  # also for a nan query time
+                    out[row, 0] = np.nan
+                    out[row, 1] = np.nan
+                    continue
+                if i < 0 or query_time < times[i]:
+                    i = start + np.searchsorted(times[start:end], query_time, side='right') - 1
+                else:
+                    steps = 0
+                    while i + 1 < end and times[i + 1] <= query_time and steps < 8:
+                        i += 1
+                        steps += 1
+                    if i + 1 < end and times[i + 1] <= query_time:
+                        i += np.searchsorted(times[i:end], query_time, side='right') - 1
+                if i == end - 1 or times[i] == query_time:
+                    lerp(points, i, i, 0.0, out, row)
+                else:
+                    lerp(points, i, i + 1, (query_time - times[i]) / (times[i + 1] - times[i]), out, row)
+        return out
+
+    def _interpolate_with(self, lerp, times: Union[np.ndarray, Iterable[float]],
+                          query_times: Union[np.ndarray, Iterable[float]],
+                          offsets: Optional[Union[np.ndarray, Iterable[int]]],
+                          query_offsets: Optional[Union[np.ndarray, Iterable[int]]],
+                          points: Optional[np.ndarray] = None) -> Array2D:
+        # the lerp function may interpolate precomputed per-row terms (points) rather than the rows themselves
+        times = np.ascontiguousarray(times, dtype=float).reshape(-1)
+        assert len(times) == len(self), 'times must be of the same length as the array'
+        query_times = np.ascontiguousarray(query_times, dtype=float).reshape(-1)
+        offsets = _ragged_offsets(offsets, len(self))
+        if query_offsets is None:
+            query_offsets = np.empty(0, dtype=np.int64)
+        else:
+            query_offsets = _ragged_offsets(query_offsets, len(query_times))
+            assert len(query_offsets) == len(offsets), 'query_offsets must be of the same length as offsets'
+            query_times = query_times[query_offsets[0]:query_offsets[-1]]
+            query_offsets = query_offsets - query_offsets[0]
+        if points is None:
+            points = np.ascontiguousarray(self.view(np.ndarray))
+        return self._interpolate(lerp, points, times, offsets, query_times, query_offsets).view(type(self))
+
+    def interpolate(self, times: Union[np.ndarray, Iterable[float]], query_times: Union[np.ndarray, Iterable[float]],
+                    *, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None,
+                    query_offsets: Optional[Union[np.ndarray, Iterable[int]]] = None) -> Array2D:
+        """
+        Linearly interpolates a track (or a batch of tracks) of time-indexed rows at query times, in a single
+        parallel pass. Query times outside the time span of their track (or of an empty track) are interpolated
+        to nan.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[0., 0.], [2., 4.]])
+
+        >>> a1.interpolate([0., 10.], [5.])
+        Array2D([[1., 2.]])
+
+        :param times: the (non-decreasing, within every track) time of every row
+        :param query_times: the times to interpolate the tracks at
+        :param offsets: optional CSR offsets of a batch of tracks - track k is the rows offsets[k]:offsets[k + 1]
+        :param query_offsets: optional CSR offsets of the query times of every track - otherwise, every track is
+                              interpolated at all the query times
+        :return: the interpolated rows - the rows of the query times, or (for a batch of tracks with no query
+                 offsets) len(offsets) - 1 blocks of len(query_times) rows, block k of track k
+        """
+        return self._interpolate_with(_lerp, times, query_times, offsets, query_offsets)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _group_moments(a: np.ndarray, weights: np.ndarray, labels: np.ndarray, n_groups: int,
+                       n_chunks: int) -> np.ndarray:
+        """
+        A single pass over the rows - every chunk accumulates (numerically stable, weighted Welford) moments of its
+        groups, and the chunk moments are merged at the end.
+        """
+        n = len(a)
+        moments = np.zeros((n_chunks, n_groups, _N_MOMENTS))
+        moments[:, :, 7:9] = np.inf
+        moments[:, :, 9:11] = -np.inf
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        n_invalid = 0
+        for chunk in prange(n_chunks):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                group = labels[i] if len(labels) > 0 else 0
+                if group < 0 or group >= n_groups:
+                    n_invalid += 1
+                    continue
+                s = moments[chunk, group]
+                x1, x2 = a[i, 0], a[i, 1]
+                s[0] += 1
+                s[7] = min(s[7], x1)
+                s[8] = min(s[8], x2)
+                s[9] = max(s[9], x1)
+                s[10] = max(s[10], x2)
+                w = weights[i] if len(weights) > 0 else 1.0
+                if w != 0:
+                    s[1] += w
+                    d1 = x1 - s[2]
+                    d2 = x2 - s[3]
+                    s[2] += d1 * w / s[1]
+                    s[3] += d2 * w / s[1]
+                    s[4] += w * d1 * (x1 - s[2])
+                    s[5] += w * d2 * (x2 - s[3])
+                    s[6] += w * d1 * (x2 - s[3])
+        if n_invalid > 0:
+            raise IndexError('label is out of bounds')
+        for group in prange(n_groups):
+            for chunk in range(1, n_chunks):
+                _merge_moments(moments[0, group], moments[chunk, group])
+        return moments[0]
+
+    def group_statistics(self, labels: Union[np.ndarray, Iterable[int]], n_groups: Optional[int] = None,
+                         weights: Optional[Union[np.ndarray, Iterable[float]]] = None) -> Statistics2D:
+        """
+        Calculates the summary statistics of every group of rows, in a single (parallel, for large arrays) pass.
+
+        :param labels: the group label of every row (between 0 and n_groups - 1)
+        :param n_groups: the number of groups (defaults to the maximal label + 1)
+        :param weights: optional (non-negative) weights of the rows, for the centroid, covariance and dispersion
+        :return: a Statistics2D of arrays with a leading dimension of n_groups
+        """
+        assert labels is not None, 'labels must be given (see statistics() for the statistics of all the rows)'
+        return self._statistics(labels, n_groups, weights)
+
+    def _statistics(self, labels: Optional[Union[np.ndarray, Iterable[int]]], n_groups: Optional[int],
+                    weights: Optional[Union[np.ndarray, Iterable[float]]]) -> Statistics2D:
+        labels, n_groups = _group_labels(labels, len(self), n_groups)
+        weights = _group_weights(weights, len(self))
+        moments = self._group_moments(self.view(np.ndarray), weights, labels, n_groups,
+                                      _n_group_chunks(len(self), n_groups))
+
+        count = moments[:, 0].astype(np.int64)
+        weight = moments[:, 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            defined = weight > 0
+            centroid = np.where(defined[:, np.newaxis], moments[:, 2:4], np.nan)
+            covariance = (moments[:, [4, 6, 6, 5]] / np.where(defined, weight, np.nan)[:, np.newaxis]).reshape(-1, 2, 2)
+        bbox_min = np.where((count > 0)[:, np.newaxis], moments[:, 7:9], np.nan)
+        bbox_max = np.where((count > 0)[:, np.newaxis], moments[:, 9:11], np.nan)
+        dispersion = np.sqrt(covariance[:, 0, 0] + covariance[:, 1, 1])
+        return Statistics2D(count=count, weight=weight, bbox_min=bbox_min, bbox_max=bbox_max, centroid=centroid,
+                            covariance=covariance, dispersion=dispersion)
+
+    def statistics(self, weights: Optional[Union[np.ndarray, Iterable[float]]] = None) -> Statistics2D:
+        """
+        Calculates the summary statistics (bounding box, centroid, covariance and dispersion) of all the rows,
+        in a single (parallel, for large arrays) pass.
+
+        Examples:
+        --------
+        >>> a1 = Array2D([[0., 0.], [2., 0.], [2., 4.]])
+
+        >>> a1.statistics().centroid
+        array([1.33333333, 1.33333333])
+
+        :param weights: optional (non-negative) weights of the rows, for the centroid, covariance and dispersion
+        :return: a Statistics2D of the rows
+        """
+        statistics = self._statistics(None, None, weights)
+        return Statistics2D(*(value[0] for value in statistics))
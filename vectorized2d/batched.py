@@ -0,0 +1,171 @@
+"""
+Batched (stacked) operations - on arrays of shape=(..., N, 2), e.g. a batch of B scenes of N points each (of a
+Monte-Carlo ensemble), with no flattening and re-indexing by hand.
+
+The operations are parallel generalized ufuncs (numba.guvectorize) over the leading (batch) dimensions, which broadcast
+just as numpy ufuncs do - the row-wise operations are parallel across all the rows, and the pairwise ones (of the ALL
+pairing) are parallel across the batches, and pair the rows of every batch with the rows of the same batch of other.
+The formulas are those of vectorized2d.kernels, so that a batch agrees with the array types of every scene.
+The gufuncs are compiled on their first call - and with no jit (NUMBA_DISABLE_JIT), the operations are numpy
+broadcasts of the kernels instead.
+"""
+from typing import Union
+
+import numpy as np
+from numba import config, guvectorize
+
+from vectorized2d import kernels
+from vectorized2d.point2d import Point2D
+
+Pairing = Point2D.Pairing
+
+__all__ = ['norm', 'direction', 'euclid_dist', 'geo_dist', 'shifted']
+
+
+class _LazyGufunc:
+    """
+    A parallel gufunc of a kernel, which is compiled on its first call (rather than when the module is imported).
+    """
+
+    def __init__(self, kernel, signature: str, layout: str):
+        self._kernel = kernel
+        self._signature = signature
+        self._layout = layout
+        self._gufunc = None
+
+    def __call__(self, *args) -> np.ndarray:
+        if self._gufunc is None:
+            self._gufunc = guvectorize([self._signature], self._layout, target='parallel', nopython=True)(self._kernel)
+        return self._gufunc(*args)
+
+
+def _lazy_gufunc(signature: str, layout: str):
+    return lambda kernel: _LazyGufunc(kernel, signature, layout)
+
+
+@_lazy_gufunc('void(float64[:], float64[:])', '(k)->()')
+def _norm(row: np.ndarray, out: np.ndarray):
+    out[0] = kernels.norm(row[0], row[1])
+
+
+@_lazy_gufunc('void(float64[:], float64[:])', '(k)->()')
+def _direction(row: np.ndarray, out: np.ndarray):
+    out[0] = kernels.direction(row[0], row[1])
+
+
+@_lazy_gufunc('void(float64[:], float64[:], float64[:])', '(k),(k)->()')
+def _aligned_euclid_dist(row: np.ndarray, other_row: np.ndarray, out: np.ndarray):
+    out[0] = kernels.euclid_dist(row[0], row[1], other_row[0], other_row[1])
+
+
+@_lazy_gufunc('void(float64[:, :], float64[:, :], float64[:, :])', '(n,k),(m,k)->(n,m)')
+def _pairwise_euclid_dist(rows: np.ndarray, other_rows: np.ndarray, out: np.ndarray):
+    for i in range(len(rows)):
+        for j in range(len(other_rows)):
+            out[i, j] = kernels.euclid_dist(rows[i, 0], rows[i, 1], other_rows[j, 0], other_rows[j, 1])
+
+
+@_lazy_gufunc('void(float64[:], float64[:], float64[:])', '(k),(k)->()')
+def _aligned_geo_dist(row: np.ndarray, other_row: np.ndarray, out: np.ndarray):
+    out[0] = kernels.geo_dist(row[0], row[1], other_row[0], other_row[1])
+
+
+@_lazy_gufunc('void(float64[:, :], float64[:, :], float64[:, :])', '(n,k),(m,k)->(n,m)')
+def _pairwise_geo_dist(rows: np.ndarray, other_rows: np.ndarray, out: np.ndarray):
+    for i in range(len(rows)):
+        for j in range(len(other_rows)):
+            out[i, j] = kernels.geo_dist(rows[i, 0], rows[i, 1], other_rows[j, 0], other_rows[j, 1])
+
+
+@_lazy_gufunc('void(float64[:], float64, float64, float64[:])', '(k),(),()->(k)')
+def _shifted(row: np.ndarray, geo_dist: float, bearing: float, out: np.ndarray):
+    out[0], out[1] = kernels.shifted(row[0], row[1], geo_dist, bearing)
+
+
+def _stacked(a: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    assert a.ndim >= 1 and a.shape[-1] == 2, 'batched arrays must be of shape=(..., 2)'
+    return a
+
+
+def _paired(kernel, aligned_gufunc: _LazyGufunc, pairwise_gufunc: _LazyGufunc, a: np.ndarray, other: np.ndarray,
+            pairing: Pairing) -> np.ndarray:
+    a, other = _stacked(a), _stacked(other)
+    if config.DISABLE_JIT:
+        # the kernels are plain numpy functions - broadcast over the pairs instead
+        if pairing is Pairing.ALIGNED:
+            return kernel(a[..., 0], a[..., 1], other[..., 0], other[..., 1])
+        return kernel(a[..., :, np.newaxis, 0], a[..., :, np.newaxis, 1], other[..., np.newaxis, :, 0],
+                      other[..., np.newaxis, :, 1])
+    if pairing is Pairing.ALIGNED:
+        return aligned_gufunc(a, other)
+    return pairwise_gufunc(a, other)
+
+
+def norm(a: np.ndarray) -> np.ndarray:
+    """
+    :param a: an array of shape=(..., N, 2)
+    :return: the norm of every row - of shape=(..., N)
+    """
+    a = _stacked(a)
+    if config.DISABLE_JIT:
+        return kernels.norm(a[..., 0], a[..., 1])
+    return _norm(a)
+
+
+def direction(a: np.ndarray) -> np.ndarray:
+    """
+    :param a: an array of vectors of shape=(..., N, 2)
+    :return: the (positive - between 0 and 2*pi) direction of every vector in radians - of shape=(..., N)
+    """
+    a = _stacked(a)
+    if config.DISABLE_JIT:
+        return kernels.direction(a[..., 0], a[..., 1])
+    return _direction(a)
+
+
+def euclid_dist(a: np.ndarray, other: np.ndarray, pairing: Pairing = Pairing.ALL) -> np.ndarray:
+    """
+    Calculates the euclidean distances between the points of every batch of a and the points of the same batch of
+    other (the batch dimensions are broadcast).
+
+    Examples:
+    --------
+    >>> euclid_dist(np.zeros((3, 1, 2)), [[[3., 4.], [6., 8.]]]).shape
+    (3, 1, 2)
+
+    :param a: an array of points of shape=(..., N, 2)
+    :param other: an array of points of shape=(..., M, 2)
+    :param pairing: an enum, specifies whether to pair all the points of a batch (ALL), or the aligned ones (ALIGNED)
+    :return: the distances - of shape=(..., N, M) for ALL pairing, or (..., N) for ALIGNED pairing
+    """
+    return _paired(kernels.euclid_dist, _aligned_euclid_dist, _pairwise_euclid_dist, a, other, pairing)
+
+
+def geo_dist(a: np.ndarray, other: np.ndarray, pairing: Pairing = Pairing.ALL) -> np.ndarray:
+    """
+    Calculates an approximation of the geographical distances (see Coordinate.geo_dist) between the coordinates of
+    every batch of a and the coordinates of the same batch of other (the batch dimensions are broadcast).
+
+    :param a: an array of (lat, lon) coordinates [radians] of shape=(..., N, 2)
+    :param other: an array of (lat, lon) coordinates [radians] of shape=(..., M, 2)
+    :param pairing: an enum, specifies whether to pair all the coordinates of a batch (ALL), or the aligned ones
+                    (ALIGNED)
+    :return: the distances [meters] - of shape=(..., N, M) for ALL pairing, or (..., N) for ALIGNED pairing
+    """
+    return _paired(kernels.geo_dist, _aligned_geo_dist, _pairwise_geo_dist, a, other, pairing)
+
+
+def shifted(a: np.ndarray, geo_dist: Union[float, np.ndarray], bearing: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Calculates the coordinates shifted by given distances and bearings (see Coordinate.shifted).
+
+    :param a: an array of (lat, lon) coordinates [radians] of shape=(..., N, 2)
+    :param geo_dist: the distance(s) to the shifted coordinates [meters] - broadcast to shape=(..., N)
+    :param bearing: the bearing(s) to the shifted coordinates [radians] - broadcast to shape=(..., N)
+    :return: the shifted coordinates - of shape=(..., N, 2)
+    """
+    a, geo_dist, bearing = _stacked(a), np.asarray(geo_dist, dtype=float), np.asarray(bearing, dtype=float)
+    if config.DISABLE_JIT:
+        return np.stack(kernels.shifted(a[..., 0], a[..., 1], geo_dist, bearing), axis=-1)
+    return _shifted(a, geo_dist, bearing)
@@ -0,0 +1,120 @@
+"""
+A growable, append-optimized container of Array2D rows (e.g. of a live feed of positions).
+
+The rows are kept in a single contiguous storage with spare capacity, so that an append only copies the appended rows
+(the storage doubles when full - amortized O(1) per row). A bounded buffer (max_rows) keeps only the latest max_rows
+rows, in a storage of twice that size - the latest rows are moved to the front of a new storage once it fills up,
+which happens at most once every max_rows appended rows (amortized O(1) per row as well).
+
+The current rows are always a contiguous slice of the storage, so that view() is zero-copy. Appends never write over
+the rows of a view that was already taken (they are either written past its end, or into a new storage), thus a view
+is a consistent snapshot that stays valid (and unchanged) while the buffer keeps growing - it can be queried from
+other threads while a single thread appends.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Type, Union
+
+import numpy as np
+
+from vectorized2d.array2d import Array2D
+
+
+class Array2DBuffer:
+    """
+    A growable buffer of Nx2 rows, with zero-copy views of its contents.
+
+    Examples:
+    --------
+    >>> buffer = Array2DBuffer(max_rows=3)
+    >>> buffer.append([[1., 2.], [3., 4.]])
+    >>> buffer.append([[5., 6.], [7., 8.]])
+
+    >>> buffer.view()
+    Array2D([[3., 4.],
+             [5., 6.],
+             [7., 8.]])
+    """
+
+    def __init__(self, array_type: Type[Array2D] = Array2D, *, capacity: int = 1024, max_rows: Optional[int] = None):
+        """
+
+        :param array_type: the type of the views of the buffer (e.g. Point2D or Coordinate)
+        :param capacity: the initial number of rows to allocate
+        :param max_rows: optional maximal number of rows - once reached, every append evicts the oldest rows
+        """
+        assert issubclass(array_type, Array2D), 'array_type must be an Array2D type'
+        assert capacity > 0, 'capacity must be positive'
+        assert max_rows is None or max_rows > 0, 'max_rows must be positive'
+        if max_rows is not None:
+            capacity = min(capacity, 2 * max_rows)
+        self._array_type = array_type
+        self._max_rows = max_rows
+        # the storage and the current rows in it are replaced together, so that a concurrent view is consistent
+        self._state = (np.empty((capacity, 2)), 0, 0)
+        self._n_appended = 0
+
+    def __len__(self) -> int:
+        _, start, end = self._state
+        return end - start
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._array_type.__name__}, rows={len(self)}, capacity={self.capacity})'
+
+    @property
+    def capacity(self) -> int:
+        """
+        The number of rows of the current storage.
+        """
+        return len(self._state[0])
+
+    @property
+    def max_rows(self) -> Optional[int]:
+        return self._max_rows
+
+    @property
+    def n_appended(self) -> int:
+        """
+        The total number of rows ever appended (including the evicted rows).
+        """
+        return self._n_appended
+
+    def append(self, rows: Union[Array2D, np.ndarray, Iterable[Iterable[float]]]):
+        """
+        Appends rows to the end of the buffer (evicting the oldest rows beyond max_rows, if bounded).
+
+        :param rows: the rows to append - an Nx2 array (or a single row)
+        """
+        rows = np.asarray(rows, dtype=float).reshape(-1, 2)
+        storage, start, end = self._state
+        self._n_appended += len(rows)
+        if self._max_rows is not None:
+            rows = rows[len(rows) - min(len(rows), self._max_rows):]
+            start = max(start, end + len(rows) - self._max_rows)
+        if end + len(rows) > len(storage):
+            n_kept = end - start
+            capacity = max(len(storage), 2 * (n_kept + len(rows)))
+            if self._max_rows is not None:
+                capacity = min(capacity, 2 * self._max_rows)
+            # a new storage (rather than moving the rows within the storage) keeps the existing views intact
+            new_storage = np.empty((capacity, 2))
+            new_storage[:n_kept] = storage[start:end]
+            storage, start, end = new_storage, 0, n_kept
+        storage[end:end + len(rows)] = rows
+        self._state = (storage, start, end + len(rows))
+
+    def view(self) -> Array2D:
+        """
+        :return: a zero-copy (read-only) view of the current rows, of the array type of the buffer - later appends
+                 never change it
+        """
+        storage, start, end = self._state
+        view = storage[start:end].view(self._array_type)
+        view.setflags(write=False)
+        return view
+
+    def clear(self):
+        """
+        Removes all the rows (keeping the capacity).
+        """
+        self._state = (np.empty_like(self._state[0]), 0, 0)
@@ -0,0 +1,240 @@
+"""
+Grid-accelerated DBSCAN clustering of Point2D (euclidean distance) and Coordinate (geographical distance) rows.
+
+The rows are bucketed into a grid of square cells with a diagonal of eps, so that all the rows of a single cell are
+within eps of each other. Thus:
+    1. A cell with at least min_samples rows is made of core rows only (no distances are computed).
+    2. All the core rows of a cell belong to the same cluster, so clusters are formed by merging neighbouring cells
+       (that have a pair of core rows within eps) - rather than by merging rows.
+The core rows, the connectivity of neighbouring cells and the border rows are all computed in parallel (over cells,
+cell pairs and rows, respectively). Only the merging of cells (union-find) is sequential.
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.coordinate import _METERS_PER_RADIAN, _delta_east_and_north_terms
+from vectorized2d.utils.spatial_grid import Grid, build_grid, counts_to_offsets, grid_cell, grid_row_range
+
+
+@njit(nogil=True)
+def _dist_squared(geo: bool, x: np.ndarray, y: np.ndarray, cos_half_y: np.ndarray, sin_half_y: np.ndarray,
+                  i: int, j: int) -> float:
+    if geo:  # x is the longitude and y is the latitude
+        d_east, d_north = _delta_east_and_north_terms(y[i], x[i], cos_half_y[i], sin_half_y[i],
+                                                      y[j], x[j], cos_half_y[j], sin_half_y[j])
+        return d_east ** 2 + d_north ** 2
+    return (x[j] - x[i]) ** 2 + (y[j] - y[i]) ** 2
+
+
+@njit(nogil=True)
+def _col_span(geo: bool, y: float, radius: float, cell_size: float, n_cols: int) -> int:
+    """
+    Returns the number of grid columns (on either side) within the radius (in grid units) of a row at y.
+    """
+    if not geo:
+        return int(math.ceil(radius / cell_size))
+    # the east delta shrinks with cos of the mean latitude, which is bounded by the latitude furthest from the equator
+    min_cos_mean_lat = math.cos(min(abs(y) + radius / 2, math.pi / 2))
+    if min_cos_mean_lat * n_cols > radius / cell_size:
+        return int(math.ceil(radius / (min_cos_mean_lat * cell_size)))
+    return n_cols
+
+
+@njit(nogil=True)
+def _grid_cells(grid: Grid) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the offsets of the (non-empty) cells into the grid order, and the cell of every position of the order.
+    """
+    sorted_keys = grid[6]
+    n = len(sorted_keys)
+    position_cells = np.empty(n, dtype=np.int64)
+    n_cells = 0
+    for pos in range(n):
+        if pos > 0 and sorted_keys[pos] != sorted_keys[pos - 1]:
+            n_cells += 1
+        position_cells[pos] = n_cells
+    n_cells = n_cells + 1 if n > 0 else 0
+    counts = np.zeros(n_cells, dtype=np.int64)
+    for pos in range(n):
+        counts[position_cells[pos]] += 1
+    return counts_to_offsets(counts), position_cells
+
+
+@njit(nogil=True)
+def _neighbour_cells(geo: bool, x: np.ndarray, y: np.ndarray, grid: Grid, grid_eps: float, row_span: int, cell: int,
+                     cell_offsets: np.ndarray, position_cells: np.ndarray, cell_has_core: np.ndarray,
+                     out: np.ndarray, out_start: int) -> int:
+    """
+    Scans the following (higher) cells around a cell for cells with core rows, and counts them.
+    If out_start is non-negative, the found cells are also written into out from out_start on.
+    """
+    cell_size, n_cols, order = grid[2], grid[3], grid[5]
+    i = order[cell_offsets[cell]]
+    col, row = grid_cell(grid, x[i], y[i])
+    # the span must hold for every row of the cell (whose latitude is at most a cell away from row i)
+    col_span = _col_span(geo, abs(y[i]) + cell_size, grid_eps, cell_size, n_cols)
+    count = 0
+    for row_offset in range(0, row_span + 1):
+        lo, hi = grid_row_range(grid, row + row_offset, col - col_span, col + col_span)
+        pos = lo
+        while pos < hi:
+            other_cell = position_cells[pos]
+            if other_cell > cell and cell_has_core[other_cell]:
+                if out_start >= 0:
+                    out[out_start + count] = other_cell
+                count += 1
+            pos = cell_offsets[other_cell + 1]
+    return count
+
+
+@njit(nogil=True)
+def _find(parents: np.ndarray, cell: int) -> int:
+    while parents[cell] != cell:
+        parents[cell] = parents[parents[cell]]  # path halving
+        cell = parents[cell]
+    return cell
+
+
+@njit(parallel=True, nogil=True)
+def _dbscan(x: np.ndarray, y: np.ndarray, eps: float, grid_eps: float, min_samples: int,
+            geo: bool) -> np.ndarray:
+    """
+    :param x: the first grid axis of the rows (the longitude, for geo)
+    :param y: the second grid axis of the rows (the latitude, for geo)
+    :param eps: the neighbourhood radius (in the units of the metric)
+    :param grid_eps: the neighbourhood radius in the grid units (x/y)
+    :param min_samples: the minimal number of rows in the neighbourhood of a core row (including itself)
+    :param geo: whether to use the geographical distance (rather than the euclidean distance)
+    :return: the cluster label of every row (-1 for noise)
+    """
+    n = len(x)
+    cell_size = grid_eps / math.sqrt(2)
+    grid = build_grid(x, y, cell_size)
+    # the cells may have been coarsened (for a huge extent), in which case a cell's rows are not necessarily neighbours
+    cells_within_eps = grid[2] <= cell_size
+    cell_size, n_cols, order = grid[2], grid[3], grid[5]
+    row_span = int(math.ceil(grid_eps / cell_size))
+    eps_squared = eps ** 2
+    cos_half_y = np.cos(y / 2) if geo else np.empty(0)
+    sin_half_y = np.sin(y / 2) if geo else np.empty(0)
+    cell_offsets, position_cells = _grid_cells(grid)
+    n_cells = len(cell_offsets) - 1
+    row_cells = np.empty(n, dtype=np.int64)
+    for pos in prange(n):
+        row_cells[order[pos]] = position_cells[pos]
+
+    # 1. core rows - in parallel over cells
+    is_core = np.zeros(n, dtype=np.bool_)
+    for cell in prange(n_cells):
+        start, end = cell_offsets[cell], cell_offsets[cell + 1]
+        if cells_within_eps and end - start >= min_samples:
+            for pos in range(start, end):
+                is_core[order[pos]] = True
+            continue
+        for pos in range(start, end):
+            i = order[pos]
+            col, row = grid_cell(grid, x[i], y[i])
+            col_span = _col_span(geo, y[i], grid_eps, cell_size, n_cols)
+            count = 0
+            for row_offset in range(-row_span, row_span + 1):
+                lo, hi = grid_row_range(grid, row + row_offset, col - col_span, col + col_span)
+                for neighbour_pos in range(lo, hi):
+                    if _dist_squared(geo, x, y, cos_half_y, sin_half_y, i, order[neighbour_pos]) <= eps_squared:
+                        count += 1
+                        if count >= min_samples:
+                            break
+                if count >= min_samples:
+                    break
+            is_core[i] = count >= min_samples
+    cell_has_core = np.zeros(n_cells, dtype=np.bool_)
+    for cell in prange(n_cells):
+        for pos in range(cell_offsets[cell], cell_offsets[cell + 1]):
+            if is_core[order[pos]]:
+                cell_has_core[cell] = True
+                break
+
+    # 2. candidate pairs of neighbouring cells with core rows (every pair once - from its lower cell)
+    no_edges = np.empty(0, dtype=np.int64)
+    edge_counts = np.zeros(n_cells, dtype=np.int64)
+    for cell in prange(n_cells):
+        if cell_has_core[cell]:
+            edge_counts[cell] = _neighbour_cells(geo, x, y, grid, grid_eps, row_span, cell, cell_offsets,
+                                                 position_cells, cell_has_core, no_edges, -1)
+    edge_offsets = counts_to_offsets(edge_counts)
+    edges = np.empty(edge_offsets[-1], dtype=np.int64)
+    for cell in prange(n_cells):
+        if cell_has_core[cell]:
+            _neighbour_cells(geo, x, y, grid, grid_eps, row_span, cell, cell_offsets, position_cells,
+                             cell_has_core, edges, edge_offsets[cell])
+
+    # 3. the connectivity of every candidate pair - in parallel over pairs
+    edge_cells = np.empty(len(edges), dtype=np.int64)
+    for cell in prange(n_cells):
+        edge_cells[edge_offsets[cell]:edge_offsets[cell + 1]] = cell
+    is_connected = np.zeros(len(edges), dtype=np.bool_)
+    for edge in prange(len(edges)):
+        cell, other_cell = edge_cells[edge], edges[edge]
+        for pos in range(cell_offsets[cell], cell_offsets[cell + 1]):
+            i = order[pos]
+            if not is_core[i]:
+                continue
+            for other_pos in range(cell_offsets[other_cell], cell_offsets[other_cell + 1]):
+                j = order[other_pos]
+                if is_core[j] and _dist_squared(geo, x, y, cos_half_y, sin_half_y, i, j) <= eps_squared:
+                    is_connected[edge] = True
+                    break
+            if is_connected[edge]:
+                break
+
+    # 4. merging the connected cells, and labeling the clusters by their first row
+    parents = np.arange(n_cells)
+    for edge in range(len(edges)):
+        if is_connected[edge]:
+            root, other_root = _find(parents, edge_cells[edge]), _find(parents, edges[edge])
+            if root != other_root:
+                parents[max(root, other_root)] = min(root, other_root)
+    cell_labels = np.full(n_cells, -1, dtype=np.int64)
+    labels = np.full(n, -1, dtype=np.int64)
+    n_clusters = 0
+    for i in range(n):
+        if is_core[i]:
+            root = _find(parents, row_cells[i])
+            if cell_labels[root] < 0:
+                cell_labels[root] = n_clusters
+                n_clusters += 1
+            labels[i] = cell_labels[root]
+    for cell in range(n_cells):
+        cell_labels[cell] = cell_labels[_find(parents, cell)]
+
+    # 5. border rows join the cluster of their nearest core row - in parallel over rows
+    for i in prange(n):
+        if is_core[i]:
+            continue
+        col, row = grid_cell(grid, x[i], y[i])
+        col_span = _col_span(geo, y[i], grid_eps, cell_size, n_cols)
+        nearest_dist_squared = np.inf
+        for row_offset in range(-row_span, row_span + 1):
+            lo, hi = grid_row_range(grid, row + row_offset, col - col_span, col + col_span)
+            for neighbour_pos in range(lo, hi):
+                j = order[neighbour_pos]
+                if is_core[j]:
+                    dist_squared = _dist_squared(geo, x, y, cos_half_y, sin_half_y, i, j)
+                    if dist_squared <= eps_squared and dist_squared < nearest_dist_squared:
+                        nearest_dist_squared = dist_squared
+                        labels[i] = cell_labels[row_cells[j]]
+    return labels
+
+
+def dbscan(x: np.ndarray, y: np.ndarray, eps: float, min_samples: int, geo: bool) -> np.ndarray:
+    """
+    Clusters rows by density (DBSCAN) - see Point2D.dbscan and Coordinate.dbscan.
+    """
+    assert eps > 0, 'eps must be positive'
+    assert min_samples >= 1, 'min_samples must be positive'
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    grid_eps = eps / _METERS_PER_RADIAN if geo else eps
+    return _dbscan(x, y, float(eps), float(grid_eps), int(min_samples), geo)
@@ -0,0 +1,163 @@
+"""
+A compact fixed-point codec for Coordinate batches.
+
+Latitudes and longitudes are quantized to int32 fixed-point degrees (1e-7 degrees, ~1cm, by default), which halves
+the size of the float64 radians. Tracks may be delta encoded as well - the first coordinate is kept as-is, and every
+other coordinate is encoded as the difference from its predecessor. When all the differences fit, they are narrowed
+to int16, which quarters the size of the float64 radians.
+
+Encoded format (little-endian):
+    header - magic (4 bytes), flags (uint8), padding (3 bytes), number of coordinates (uint64), scale (float64)
+    payload - N x 2 values of int32 (absolute), or 2 x int32 followed by (N - 1) x 2 values of int16/int32 (delta)
+Delta encoding falls back to absolute encoding when some difference does not fit int32.
+"""
+import math
+import struct
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.coordinate import Coordinate
+
+_MAGIC = b'V2DC'
+_HEADER = struct.Struct('<4sB3xQd')
+_FLAG_DELTA = 0x1
+_FLAG_INT16 = 0x2
+
+# Fixed-point units per degree
+DEFAULT_SCALE = 1e7
+
+# Rows per block of the parallel prefix sum
+_SCAN_BLOCK_SIZE = 1 << 16
+
+
+@njit(nogil=True)
+def _quantize(radians: float, scale: float) -> int:
+    return int(round(math.degrees(radians) * scale))
+
+
+@njit(parallel=True, nogil=True)
+def _encode_absolute(lat: np.ndarray, lon: np.ndarray, scale: float) -> np.ndarray:
+    encoded = np.empty((len(lat), 2), dtype=np.int32)
+    for i in prange(len(lat)):
+        encoded[i, 0] = _quantize(lat[i], scale)
+        encoded[i, 1] = _quantize(lon[i], scale)
+    return encoded
+
+
+@njit(parallel=True, nogil=True)
+def _encode_delta(lat: np.ndarray, lon: np.ndarray, scale: float) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Returns the first (absolute) row, the deltas of all the following rows, and the largest absolute delta.
+    Every delta is computed from the quantized values, so that decoding is exact (with no accumulating error).
+    """
+    first = np.empty(2, dtype=np.int32)
+    first[0] = _quantize(lat[0], scale)
+    first[1] = _quantize(lon[0], scale)
+    deltas = np.empty((len(lat) - 1, 2), dtype=np.int64)
+    max_abs_delta = 0
+    for i in prange(1, len(lat)):
+        d_lat = _quantize(lat[i], scale) - _quantize(lat[i - 1], scale)
+        d_lon = _quantize(lon[i], scale) - _quantize(lon[i - 1], scale)
+        deltas[i - 1, 0] = d_lat
+        deltas[i - 1, 1] = d_lon
+        max_abs_delta = max(max_abs_delta, max(abs(d_lat), abs(d_lon)))
+    return first, deltas, max_abs_delta
+
+
+@njit(parallel=True, nogil=True)
+def _decode_absolute(encoded: np.ndarray, scale: float, out: np.ndarray):
+    for i in prange(len(encoded)):
+        out[i, 0] = math.radians(encoded[i, 0] / scale)
+        out[i, 1] = math.radians(encoded[i, 1] / scale)
+
+
+@njit(parallel=True, nogil=True)
+def _decode_delta(first: np.ndarray, deltas: np.ndarray, scale: float, out: np.ndarray):
+    """
+    Decodes with a blocked parallel prefix sum - block totals first, then every block is scanned from its offset.
+    """
+    n_blocks = (len(deltas) + _SCAN_BLOCK_SIZE - 1) // _SCAN_BLOCK_SIZE
+    block_offsets = np.zeros((n_blocks + 1, 2), dtype=np.int64)
+    block_offsets[0, 0] = first[0]
+    block_offsets[0, 1] = first[1]
+    for block in prange(n_blocks):
+        total_lat, total_lon = np.int64(0), np.int64(0)  # int64 with no jit as well (the int32 deltas would wrap)
+        for i in range(block * _SCAN_BLOCK_SIZE, min((block + 1) * _SCAN_BLOCK_SIZE, len(deltas))):
+            total_lat += deltas[i, 0]
+            total_lon += deltas[i, 1]
+        block_offsets[block + 1, 0] = total_lat
+        block_offsets[block + 1, 1] = total_lon
+    for block in range(n_blocks):
+        block_offsets[block + 1] += block_offsets[block]
+
+    out[0, 0] = math.radians(first[0] / scale)
+    out[0, 1] = math.radians(first[1] / scale)
+    for block in prange(n_blocks):
+        lat, lon = block_offsets[block, 0], block_offsets[block, 1]
+        for i in range(block * _SCAN_BLOCK_SIZE, min((block + 1) * _SCAN_BLOCK_SIZE, len(deltas))):
+            lat += deltas[i, 0]
+            lon += deltas[i, 1]
+            out[i + 1, 0] = math.radians(lat / scale)
+            out[i + 1, 1] = math.radians(lon / scale)
+
+
+def encode(coordinates: Coordinate, *, delta: bool = False, scale: float = DEFAULT_SCALE) -> bytes:
+    """
+    Encodes coordinates into the compact fixed-point format.
+
+    :param coordinates: the coordinates to encode
+    :param delta: whether to delta encode consecutive coordinates (suited for tracks)
+    :param scale: the number of fixed-point units per degree (1e7 - ~1cm resolution)
+    :return: the encoded bytes
+    """
+    max_abs_degrees = np.rad2deg(np.abs(coordinates).max()) if len(coordinates) > 0 else 0
+    assert max_abs_degrees * scale < 2 ** 31, 'coordinates are out of the fixed-point range'
+    lat = np.ascontiguousarray(coordinates.lat)
+    lon = np.ascontiguousarray(coordinates.lon)
+
+    if not delta or len(coordinates) == 0:
+        header = _HEADER.pack(_MAGIC, 0, len(coordinates), scale)
+        return header + _encode_absolute(lat, lon, scale).tobytes()
+
+    first, deltas, max_abs_delta = _encode_delta(lat, lon, scale)
+    if max_abs_delta > np.iinfo(np.int32).max:  # e.g. jumps across the antimeridian
+        return encode(coordinates, delta=False, scale=scale)
+    flags = _FLAG_DELTA
+    if max_abs_delta <= np.iinfo(np.int16).max:
+        flags |= _FLAG_INT16
+        deltas = deltas.astype(np.int16)
+    else:
+        deltas = deltas.astype(np.int32)
+    return _HEADER.pack(_MAGIC, flags, len(coordinates), scale) + first.tobytes() + deltas.tobytes()
+
+
+def decode(buffer: bytes) -> Coordinate:
+    """
+    Decodes coordinates from the compact fixed-point format.
+
+    Note: only the coordinates of the header are decoded - any trailing bytes of the buffer (e.g. of the following
+    records of a stream) are ignored.
+
+    :param buffer: the encoded bytes (or any bytes-like object)
+    :return: a Coordinate object of the decoded coordinates
+    """
+    magic, flags, n, scale = _HEADER.unpack_from(buffer)
+    assert magic == _MAGIC, 'not an encoded Coordinate buffer'
+    payload = memoryview(buffer).cast('B')[_HEADER.size:]
+    if not flags & _FLAG_DELTA:
+        payload_size = n * 2 * 4
+    else:
+        payload_size = 2 * 4 + (n - 1) * 2 * (2 if flags & _FLAG_INT16 else 4)
+    assert len(payload) >= payload_size, 'the buffer is truncated'
+    out = np.empty((n, 2)).view(Coordinate)
+
+    if not flags & _FLAG_DELTA:
+        _decode_absolute(np.frombuffer(payload, dtype='<i4', count=n * 2).reshape(n, 2), scale, out)
+    else:
+        first = np.frombuffer(payload, dtype='<i4', count=2)
+        deltas = np.frombuffer(payload[first.nbytes:], dtype='<i2' if flags & _FLAG_INT16 else '<i4',
+                               count=(n - 1) * 2).reshape(n - 1, 2)
+        _decode_delta(first, deltas, scale, out)
+    return out
@@ -1,14 +1,188 @@
 from __future__ import annotations
 
 import math
-from typing import Tuple, Iterable, Union
+from typing import TYPE_CHECKING, Optional, Tuple, Iterable, Union
 
 import numpy as np
 from fast_enum import FastEnum
-from numba import njit
+from numba import njit, prange
 
 from vectorized2d import Point2D
+from vectorized2d.array2d import _group_labels, _group_weights, _n_group_chunks, _ragged_offsets
+from vectorized2d.point2d import Binned, GridSpec, _ROW_BLOCK_SIZE, _TILE_SIZE, _heap_replace_top, _sort_heap
 from vectorized2d.utils import units as units
+from vectorized2d.utils.spatial_grid import Grid, build_grid, counts_to_offsets, grid_cell, grid_row_range, sort_csr_row
+
+if TYPE_CHECKING:
+    from vectorized2d.prepared_coordinate import PreparedCoordinate
+    from vectorized2d.vector2d import Vector2D
+
+# Coordinate's geo approximation converts a delta in radians to [meters] via degrees and nautical miles
+_METERS_PER_RADIAN = math.degrees(1.0) * 60 * units.NM_TO_METERS
+
+# The earth radius of Coordinate.shifted [meters]
+_EARTH_RADIUS = 6_378_100
+
+
+@njit(nogil=True)
+def _delta_east_and_north_terms(q_lat: float, q_lon: float, q_cos_half_lat: float, q_sin_half_lat: float,
+                                t_lat: float, t_lon: float, t_cos_half_lat: float,
+                                t_sin_half_lat: float) -> Tuple[float, float]:
+    # cos((q_lat + t_lat) / 2) expanded, so that every per-row term is computed only once
+    cos_mean_lat = q_cos_half_lat * t_cos_half_lat - q_sin_half_lat * t_sin_half_lat
+    d_east = (t_lon - q_lon) * _METERS_PER_RADIAN * cos_mean_lat
+    d_north = (t_lat - q_lat) * _METERS_PER_RADIAN
+    return d_east, d_north
+
+
+@njit(nogil=True)
+def _shifted_terms(lat: Union[float, np.ndarray], lon: Union[float, np.ndarray], geo_dist: Union[float, np.ndarray],
+                   bearing: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    # the spherical shift of Coordinate.shifted - for arrays (with broadcasting) as well as for scalars (in kernels)
+    angular_dist = geo_dist / _EARTH_RADIUS
+
+    sin_angular_dist = np.sin(angular_dist)
+    cos_angular_dist = np.cos(angular_dist)
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+
+    sin_shifted_lat = sin_lat * cos_angular_dist + cos_lat * sin_angular_dist * np.cos(bearing)
+
+    shifted_lat = np.arcsin(sin_shifted_lat)
+    shifted_lon = lon + np.arctan2(np.sin(bearing) * sin_angular_dist * cos_lat,
+                                   cos_angular_dist - sin_lat * sin_shifted_lat)
+
+    return shifted_lat, shifted_lon
+
+
+@njit(nogil=True)
+def _wrapped_angle(angle: float) -> float:
+    # the angle in [-pi, pi) - with no (slow) modulo for angles that are already in range
+    if -math.pi <= angle < math.pi:
+        return angle
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+@njit(nogil=True)
+def _lat_lon_lerp_terms(lat: float, lon: float, next_lat: float, next_lon: float, weight: float, out: np.ndarray,
+                        row: int):
+    # the longitude is interpolated along the shorter way (across the antimeridian, if shorter)
+    out[row, 0] = lat + weight * (next_lat - lat)
+    out[row, 1] = lon + weight * _wrapped_angle(next_lon - lon)
+
+
+@njit(nogil=True)
+def _lat_lon_lerp(lat_lon: np.ndarray, i: int, j: int, weight: float, out: np.ndarray, row: int):
+    _lat_lon_lerp_terms(lat_lon[i, 0], lat_lon[i, 1], lat_lon[j, 0], lat_lon[j, 1], weight, out, row)
+
+
+@njit(parallel=True, nogil=True)
+def _great_circle_terms(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Returns the per-row terms of the great circle interpolation - the earth-centered unit vector (x, y, z), the
+    latitude and longitude, and the angle (and its sine) to the unit vector of the next row.
+    """
+    n = len(lat)
+    terms = np.empty((n, 7))
+    for i in prange(n):
+        terms[i, 0] = math.cos(lat[i]) * math.cos(lon[i])
+        terms[i, 1] = math.cos(lat[i]) * math.sin(lon[i])
+        terms[i, 2] = math.sin(lat[i])
+        terms[i, 3] = lat[i]
+        terms[i, 4] = lon[i]
+    for i in prange(n):
+        if i == n - 1:
+            terms[i, 5] = terms[i, 6] = 0.0
+            continue
+        x, y, z = terms[i, 0], terms[i, 1], terms[i, 2]
+        next_x, next_y, next_z = terms[i + 1, 0], terms[i + 1, 1], terms[i + 1, 2]
+        cross = math.sqrt((y * next_z - z * next_y) ** 2 + (z * next_x - x * next_z) ** 2
+                          + (x * next_y - y * next_x) ** 2)
+        terms[i, 5] = math.atan2(cross, x * next_x + y * next_y + z * next_z)
+        terms[i, 6] = math.sin(terms[i, 5])
+    return terms
+
+
+@njit(nogil=True)
+def _great_circle_lerp(terms: np.ndarray, i: int, j: int, weight: float, out: np.ndarray, row: int):
+    # spherical linear interpolation of the unit vectors of rows i and j (see _great_circle_terms)
+    angle, sin_angle = terms[i, 5], terms[i, 6]
+    if j == i or angle < 1e-9:  # (nearly) coincident rows - the lat/lon interpolation is exact enough
+        _lat_lon_lerp_terms(terms[i, 3], terms[i, 4], terms[j, 3], terms[j, 4], weight, out, row)
+        return
+    factor = math.sin((1 - weight) * angle) / sin_angle
+    next_factor = math.sin(weight * angle) / sin_angle
+    x = factor * terms[i, 0] + next_factor * terms[j, 0]
+    y = factor * terms[i, 1] + next_factor * terms[j, 1]
+    z = factor * terms[i, 2] + next_factor * terms[j, 2]
+    lon = terms[i, 4]
+    out[row, 0] = math.atan2(z, math.sqrt(x ** 2 + y ** 2))
+    out[row, 1] = lon + _wrapped_angle(math.atan2(y, x) - lon)  # continuous with the track
+
+
+@njit(nogil=True)
+def _geo_within_distance_row(lat: float, lon: float, other_lat: np.ndarray, other_lon: np.ndarray,
+                             other_cos_half_lat: np.ndarray, other_sin_half_lat: np.ndarray, grid: Grid,
+                             radius: float, out_indices: np.ndarray, out_dists: np.ndarray, out_start: int) -> int:
+    """
+    Scans the (lon, lat) grid cells around a coordinate for the coordinates of other within the radius, and counts
+    them. If out_start is non-negative, the matches are also written into the outputs from out_start on.
+    """
+    order, cell_size, n_cols = grid[5], grid[2], grid[3]
+    lat_radius = radius / _METERS_PER_RADIAN
+    # the east delta shrinks with cos of the mean latitude, which is bounded by the latitude furthest from the equator
+    min_cos_mean_lat = math.cos(min(abs(lat) + lat_radius / 2, math.pi / 2))
+    row_span = int(math.ceil(lat_radius / cell_size))
+    col_span = n_cols
+    if min_cos_mean_lat * n_cols > lat_radius / cell_size:
+        col_span = int(math.ceil(lat_radius / (min_cos_mean_lat * cell_size)))
+
+    cos_half_lat = math.cos(lat / 2)
+    sin_half_lat = math.sin(lat / 2)
+    radius_squared = radius ** 2
+    col, row = grid_cell(grid, lon, lat)
+    count = 0
+    for row_offset in range(-row_span, row_span + 1):
+        lo, hi = grid_row_range(grid, row + row_offset, col - col_span, col + col_span)
+        for pos in range(lo, hi):
+            j = order[pos]
+            d_east, d_north = _delta_east_and_north_terms(lat, lon, cos_half_lat, sin_half_lat, other_lat[j],
+                                                          other_lon[j], other_cos_half_lat[j], other_sin_half_lat[j])
+            dist_squared = d_east ** 2 + d_north ** 2
+            if dist_squared <= radius_squared:
+                if out_start >= 0:
+                    out_indices[out_start + count] = j
+                    out_dists[out_start + count] = math.sqrt(dist_squared)
+                count += 1
+    return count
+
+
+@njit(nogil=True)
+def _local_east_and_north(lat_lon: np.ndarray, origin: int, j: int, cos_lat: float) -> Tuple[float, float]:
+    # coordinate j in a local (equirectangular) frame around the origin coordinate [meters], across the antimeridian
+    d_east = _wrapped_angle(lat_lon[j, 1] - lat_lon[origin, 1]) * _METERS_PER_RADIAN * cos_lat
+    d_north = (lat_lon[j, 0] - lat_lon[origin, 0]) * _METERS_PER_RADIAN
+    return d_east, d_north
+
+
+@njit(nogil=True)
+def _geo_segment_dist(lat_lon: np.ndarray, i: int, a: int, b: int) -> float:
+    # the distance of coordinate i from the segment between coordinates a and b [meters], in the frame of the segment
+    cos_lat = math.cos((lat_lon[a, 0] + lat_lon[b, 0]) / 2)
+    d1, d2 = _local_east_and_north(lat_lon, a, b, cos_lat)
+    p1, p2 = _local_east_and_north(lat_lon, a, i, cos_lat)
+    length_squared = d1 * d1 + d2 * d2
+    t = min(max((p1 * d1 + p2 * d2) / length_squared, 0.), 1.) if length_squared > 0 else 0.
+    return math.hypot(p1 - t * d1, p2 - t * d2)
+
+
+@njit(nogil=True)
+def _geo_triangle_area(lat_lon: np.ndarray, a: int, i: int, b: int) -> float:
+    # the area of the triangle of coordinates a, i and b [meters**2], in the frame of coordinate i
+    cos_lat = math.cos(lat_lon[i, 0])
+    a1, a2 = _local_east_and_north(lat_lon, i, a, cos_lat)
+    b1, b2 = _local_east_and_north(lat_lon, i, b, cos_lat)
+    return abs(a1 * b2 - a2 * b1) / 2
 
 
 class Coordinate(Point2D):
@@ -45,11 +219,36 @@ class Coordinate(Point2D):
                     [3, 6]])
 
         """
-        input_array = np.array([lat, lon]).T
-        if units is Coordinate.Units.DEGREES:
-            input_array = np.deg2rad(input_array)
+        return cls.from_columns(lat, lon, units)
+
+    @classmethod
+    def from_columns(cls, lat: Union[float, np.ndarray, Iterable[float]],
+                     lon: Union[float, np.ndarray, Iterable[float]], units: Units = Units.RADIANS) -> Coordinate:
+        """
+        Creates a Coordinate object from latitude and longitude columns, in a single pass into a C-contiguous
+        Nx2 buffer (the conversion from degrees is fused into that pass).
+        A scalar column is broadcast to the length of the other column.
 
-        return super().__new__(cls, input_array=input_array)
+        :param lat: latitude(s) of a coordinate(s).
+        :param lon: longitude(s) of a coordinate(s).
+        :param units: an enum, specifies whether the input lan/lon is given in radians or degrees.
+        :return: a Coordinate object
+        """
+        lat, lon = cls._broadcast_columns(lat, lon)
+        scale = np.pi / 180 if units is Coordinate.Units.DEGREES else 1.0
+        return cls._from_columns(lat, lon, scale).view(cls)
+
+    @classmethod
+    def from_radians_array(cls, array: np.ndarray) -> Coordinate:
+        """
+        Wraps an existing buffer of (lat, lon) rows in radians as a Coordinate object.
+        No copy is made when the buffer is a float64 Nx2 array (C or Fortran ordered), so that changes to either
+        one are reflected in the other.
+
+        :param array: an Nx2 array of (lat, lon) rows in radians
+        :return: a Coordinate object (a view of array, whenever possible)
+        """
+        return np.asarray(array, dtype=float).reshape(-1, 2).view(cls)
 
     @property
     def lat(self):
@@ -68,7 +267,7 @@ class Coordinate(Point2D):
         return self.x2
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _delta_east_and_north_jit(self_lat: np.ndarray, self_lon: np.ndarray, other_lat: np.ndarray,
                                   other_lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         d_lat = np.rad2deg(other_lat - self_lat)
@@ -91,7 +290,7 @@ class Coordinate(Point2D):
         return self._delta_east_and_north_jit(self.lat, self.lon, other.lat, other.lon)
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _dist(d_east: np.ndarray, d_north: np.ndarray) -> np.ndarray:
         return np.sqrt(d_east ** 2 + d_north ** 2)
 
@@ -109,7 +308,7 @@ class Coordinate(Point2D):
         return self._dist(d_north=d_north, d_east=d_east)
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _dist_squared(d_east: np.ndarray, d_north: np.ndarray) -> np.ndarray:
         return d_east ** 2 + d_north ** 2
 
@@ -127,7 +326,7 @@ class Coordinate(Point2D):
         return self._dist_squared(d_north=d_north, d_east=d_east)
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _bearing(d_east: np.ndarray, d_north: np.ndarray) -> np.ndarray:
         return np.arctan2(d_east, d_north) % (2 * math.pi)
 
@@ -161,24 +360,10 @@ class Coordinate(Point2D):
         return dist, bearing
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _shifted(self_lat: np.ndarray, self_lon: np.ndarray, geo_dist: Union[float, np.ndarray],
                  bearing: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
-        earth_radius = 6_378_100
-        angular_dist = geo_dist / earth_radius
-
-        sin_angular_dist = np.sin(angular_dist)
-        cos_angular_dist = np.cos(angular_dist)
-        sin_lat = np.sin(self_lat)
-        cos_lat = np.cos(self_lat)
-
-        sin_shifted_lat = sin_lat * cos_angular_dist + cos_lat * sin_angular_dist * np.cos(bearing)
-
-        shifted_lat = np.arcsin(sin_shifted_lat)
-        shifted_lon = self_lon + np.arctan2(np.sin(bearing) * sin_angular_dist * cos_lat,
-                                            cos_angular_dist - sin_lat * sin_shifted_lat)
-
-        return shifted_lat, shifted_lon
+        return _shifted_terms(self_lat, self_lon, geo_dist, bearing)
 
     def shifted(self, geo_dist: Union[float, np.ndarray], bearing: Union[float, np.ndarray]) -> Coordinate:
         """
@@ -191,6 +376,104 @@ class Coordinate(Point2D):
         shifted_lat, shifted_lon = self._shifted(self.lat, self.lon, geo_dist, bearing)
         return Coordinate(lat=shifted_lat, lon=shifted_lon)
 
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _propagate(lat: np.ndarray, lon: np.ndarray, velocities: np.ndarray, times: np.ndarray,
+                   turn_rates: np.ndarray) -> np.ndarray:
+        """
+        Propagates every track along its steps sequentially (in parallel over the tracks).
+        A straight leg (a constant velocity with no turn) is shifted from its first position in one shot - just as
+        shifted() does, with no accumulating error. A turning step is shifted along the chord of its circular arc.
+        """
+        n, n_steps = len(lat), len(times)
+        per_step_velocities = len(velocities) > n
+        out = np.empty((n_steps * n, 2))
+        for i in prange(n):
+            current_lat, current_lon = lat[i], lon[i]
+            leg_lat, leg_lon, leg_dist, in_leg = lat[i], lon[i], 0.0, False
+            north, east = velocities[i, 0], velocities[i, 1]
+            previous_time = 0.0
+            for t in range(n_steps):
+                row = t * n + i
+                if per_step_velocities and (velocities[row, 0] != north or velocities[row, 1] != east):
+                    north, east = velocities[row, 0], velocities[row, 1]
+                    in_leg = False
+                turn_rate = 0.0
+                if len(turn_rates) == n:
+                    turn_rate = turn_rates[i]
+                elif len(turn_rates) > n:
+                    turn_rate = turn_rates[row]
+                dt = times[t] - previous_time
+                previous_time = times[t]
+                speed = math.sqrt(north ** 2 + east ** 2)
+                course = math.atan2(east, north)
+                turn = turn_rate * dt
+
+                if turn == 0:
+                    if not in_leg:
+                        leg_lat, leg_lon, leg_dist, in_leg = current_lat, current_lon, 0.0, True
+                    leg_dist += speed * dt
+                    current_lat, current_lon = _shifted_terms(leg_lat, leg_lon, leg_dist, course)
+                else:
+                    chord = speed * dt * math.sin(turn / 2) / (turn / 2)
+                    current_lat, current_lon = _shifted_terms(current_lat, current_lon, chord, course + turn / 2)
+                    north, east = speed * math.cos(course + turn), speed * math.sin(course + turn)
+                    in_leg = False
+                out[row, 0] = current_lat
+                out[row, 1] = current_lon
+        return out
+
+    def propagate(self, velocities: Vector2D, times: Union[np.ndarray, Iterable[float]],
+                  turn_rates: Optional[Union[float, np.ndarray, Iterable[float]]] = None) -> Coordinate:
+        """
+        Predicts the positions of many tracks (dead-reckoning) at many times, in a single parallel pass.
+
+        The velocity of a track is a vector of its north and east speeds - i.e. a Vector2D whose magnitude is the
+        speed [meters/second] and whose direction is the course (bearing) [radians].
+        Per-step velocities (T*N rows, row t*N + i for track i during step t) replace the velocity of a track at the
+        start of every step. A turn rate rotates the course during a step, along a circular arc, and the turned
+        velocity carries over to the following step (unless replaced by a per-step velocity).
+
+        :param velocities: the velocity of every track (N rows), or of every track during every step (T*N rows)
+        :param times: the T times to predict the positions at, relative to the time of the positions [seconds]
+        :param turn_rates: the turn rate of every track (a float, N values or T*N values) [radians/second, clockwise]
+        :return: a Coordinate of T*N rows, where row t*N + i is the position of track i at times[t]
+        """
+        n = len(self)
+        times = np.asarray(times, dtype=float).reshape(-1)
+        velocities = np.ascontiguousarray(velocities, dtype=float).reshape(-1, 2)
+        assert len(velocities) in (n, len(times) * n), 'velocities must be of N or T*N rows'
+        if turn_rates is None:
+            turn_rates = np.empty(0)
+        else:
+            turn_rates = np.asarray(turn_rates, dtype=float).reshape(-1)
+            if len(turn_rates) == 1:
+                turn_rates = np.full(n, turn_rates[0])
+            assert len(turn_rates) in (n, len(times) * n), 'turn_rates must be a float, or of N or T*N values'
+        return self._propagate(self.lat, self.lon, velocities, times, turn_rates).view(Coordinate)
+
+    def interpolate(self, times: Union[np.ndarray, Iterable[float]], query_times: Union[np.ndarray, Iterable[float]],
+                    *, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None,
+                    query_offsets: Optional[Union[np.ndarray, Iterable[int]]] = None,
+                    great_circle: bool = True) -> Coordinate:
+        """
+        Interpolates a track (or a batch of tracks) of time-indexed coordinates at query times (see
+        Array2D.interpolate), along the great circle between the bracketing coordinates, or linearly in lat/lon.
+        Both ways interpolate across the antimeridian along the shorter way.
+
+        :param times: the (non-decreasing, within every track) time of every coordinate
+        :param query_times: the times to interpolate the tracks at
+        :param offsets: optional CSR offsets of a batch of tracks - track k is the rows offsets[k]:offsets[k + 1]
+        :param query_offsets: optional CSR offsets of the query times of every track - otherwise, every track is
+                              interpolated at all the query times
+        :param great_circle: whether to interpolate along great circles (otherwise, linearly in lat/lon)
+        :return: the interpolated coordinates (nan outside the time span of their track)
+        """
+        if great_circle:
+            terms = _great_circle_terms(self.lat, self.lon)
+            return self._interpolate_with(_great_circle_lerp, times, query_times, offsets, query_offsets, terms)
+        return self._interpolate_with(_lat_lon_lerp, times, query_times, offsets, query_offsets)
+
     def circle_around(self, radius: float, number_of_points: int) -> Coordinate:
         """
         Return a multi-coordinate with shape=(number_of_points, 2), representing a circle around the Coordinate (self).
@@ -206,7 +489,7 @@ class Coordinate(Point2D):
         return self.shifted(geo_dist=radius, bearing=np.arange(0, math.pi * 2, (math.pi * 2) / number_of_points))
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _ellipse_around(major_radius: float, minor_radius: float, major_axis_bearing: float,
                         number_of_points: int) -> Tuple[np.ndarray, float]:
         bearings = np.arange(0, math.pi * 2, (math.pi * 2) / number_of_points)
@@ -227,4 +510,426 @@ class Coordinate(Point2D):
         """
         assert len(self) == 1, 'ellipse_around() method is undefined for multi-coordinates'
         bearings, radii = Coordinate._ellipse_around(major_radius, minor_radius, major_axis_bearing, number_of_points)
-        return self.shifted(geo_dist=radii, bearing=bearings)
\ No newline at end of file
+        return self.shifted(geo_dist=radii, bearing=bearings)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _nearest(self_lat: np.ndarray, self_lon: np.ndarray, other_lat: np.ndarray, other_lon: np.ndarray,
+                 k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n, m = len(self_lat), len(other_lat)
+        other_cos_half_lat = np.cos(other_lat / 2)
+        other_sin_half_lat = np.sin(other_lat / 2)
+        dists = np.full((n, k), np.inf)
+        indices = np.full((n, k), -1, dtype=np.int64)
+        for block in prange((n + _ROW_BLOCK_SIZE - 1) // _ROW_BLOCK_SIZE):
+            start = block * _ROW_BLOCK_SIZE
+            end = min(start + _ROW_BLOCK_SIZE, n)
+            self_cos_half_lat = np.cos(self_lat[start:end] / 2)
+            self_sin_half_lat = np.sin(self_lat[start:end] / 2)
+            for tile_start in range(0, m, _TILE_SIZE):
+                tile_end = min(tile_start + _TILE_SIZE, m)
+                for i in range(start, end):
+                    for j in range(tile_start, tile_end):
+                        d_east, d_north = _delta_east_and_north_terms(
+                            self_lat[i], self_lon[i], self_cos_half_lat[i - start], self_sin_half_lat[i - start],
+                            other_lat[j], other_lon[j], other_cos_half_lat[j], other_sin_half_lat[j]
+                        )
+                        dist_squared = d_east ** 2 + d_north ** 2
+                        if dist_squared < dists[i, 0]:
+                            _heap_replace_top(dists[i], indices[i], dist_squared, j)
+
+            for i in range(start, end):
+                _sort_heap(dists[i], indices[i])
+                for r in range(k):
+                    dists[i, r] = math.sqrt(dists[i, r])
+
+        return indices, dists
+
+    def nearest(self, other: Coordinate, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest coordinates of other (by an approximation of the geographical distance)
+        for every coordinate of self.
+
+        Note: the len(self) x len(other) distance matrix is never materialized - other is streamed in tiles,
+        while only the k nearest candidates of every coordinate are kept.
+
+        :param other: the target coordinates
+        :param k: the number of nearest coordinates to find (1 <= k <= len(other))
+        :return: a Tuple of two 2D numpy arrays of shape=(len(self), k) - the indices of the nearest coordinates of
+                 other, and their geographical distances [meters], ordered by distance
+                 (ties are broken in favour of the lowest index)
+        """
+        assert 1 <= k <= len(other), 'k must be between 1 and len(other)'
+        return self._nearest(self.lat, self.lon, other.lat, other.lon, k)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _within_distance(self_lat: np.ndarray, self_lon: np.ndarray, other_lat: np.ndarray, other_lon: np.ndarray,
+                         radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        grid = build_grid(other_lon, other_lat, radius / _METERS_PER_RADIAN)
+        other_cos_half_lat = np.cos(other_lat / 2)
+        other_sin_half_lat = np.sin(other_lat / 2)
+        no_indices = np.empty(0, dtype=np.int64)
+        no_dists = np.empty(0)
+
+        counts = np.empty(len(self_lat), dtype=np.int64)
+        for i in prange(len(self_lat)):
+            counts[i] = _geo_within_distance_row(self_lat[i], self_lon[i], other_lat, other_lon, other_cos_half_lat,
+                                                 other_sin_half_lat, grid, radius, no_indices, no_dists, -1)
+
+        offsets = counts_to_offsets(counts)
+        indices = np.empty(offsets[-1], dtype=np.int64)
+        dists = np.empty(offsets[-1])
+        for i in prange(len(self_lat)):
+            _geo_within_distance_row(self_lat[i], self_lon[i], other_lat, other_lon, other_cos_half_lat,
+                                     other_sin_half_lat, grid, radius, indices, dists, offsets[i])
+            sort_csr_row(indices, dists, offsets[i], offsets[i + 1])
+
+        return offsets, indices, dists
+
+    def within_distance(self, other: Coordinate, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all the pairs of coordinates of self and other within a geographical distance of radius (inclusive).
+
+        Note: the coordinates of other are bucketed into a lat/lon grid of cells of ~radius, so that only neighbouring
+        cells are examined, and no dense len(self) x len(other) matrix is ever materialized.
+
+        The result is given in CSR form - the coordinates of other matched to coordinate i of self are
+        indices[offsets[i]:offsets[i + 1]] (in ascending order), and their distances are
+        dists[offsets[i]:offsets[i + 1]].
+
+        :param other: the target coordinates
+        :param radius: the maximal geographical distance of a matched pair [meters]
+        :return: a Tuple of three 1D numpy arrays - offsets (len(self) + 1), indices and distances [meters]
+        """
+        assert radius >= 0, 'radius must be non-negative'
+        return self._within_distance(self.lat, self.lon, other.lat, other.lon, float(radius))
+
+    def cpa(self, velocities: Vector2D, other: Coordinate, other_velocities: Vector2D, *,
+            pairing: Point2D.Pairing = Point2D.Pairing.ALL) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the closest point of approach of pairs of moving coordinates of self and other, on the local plane
+        of every pair (by the approximation of geo_dist) - see Point2D.cpa.
+
+        Note: the velocity of a coordinate is a vector of its north and east speeds [meters/second] - i.e. a Vector2D
+        whose magnitude is the speed and whose direction is the course (bearing).
+
+        :param velocities: the velocity of every coordinate of self
+        :param other: the target coordinates
+        :param other_velocities: the velocity of every coordinate of other
+        :param pairing: An enum, specifies whether to calculate the CPA of
+                        ALL (pairwise) or ALIGNED (corresponding coordinates) pairs.
+        :return: a Tuple of TCPA [seconds] and DCPA [meters] - 1D numpy arrays for ALIGNED pairing, or 2D numpy
+                 arrays of shape=(len(self), len(other)) for ALL pairing
+        """
+        from vectorized2d import cpa
+        return cpa.cpa(self, velocities, other, other_velocities, pairing is self.Pairing.ALIGNED, geo=True)
+
+    def cpa_within(self, velocities: Vector2D, max_dcpa: float, other: Optional[Coordinate] = None,
+                   other_velocities: Optional[Vector2D] = None, *, max_tcpa: float = np.inf,
+                   candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Screens pairs of moving coordinates of self and other for the pairs whose closest approach is within max_dcpa
+        (inclusive), within max_tcpa - see Point2D.cpa_within and Coordinate.cpa.
+
+        :param velocities: the velocity of every coordinate of self [meters/second]
+        :param max_dcpa: the maximal distance at the closest approach of a found pair [meters]
+        :param other: the target coordinates (self, if None)
+        :param other_velocities: the velocity of every coordinate of other [meters/second]
+        :param max_tcpa: the maximal time to the closest approach of a found pair [seconds]
+        :param candidates: optional CSR offsets (len(self) + 1) and indices of the candidate pairs, e.g. of
+                           within_distance()
+        :return: a Tuple of four 1D numpy arrays - offsets (len(self) + 1), indices, TCPA [seconds] and DCPA [meters]
+        """
+        from vectorized2d import cpa
+        return cpa.cpa_within(self, velocities, other, other_velocities, max_dcpa, max_tcpa, candidates, geo=True)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _group_unit_vector_sums(lat: np.ndarray, lon: np.ndarray, weights: np.ndarray, labels: np.ndarray,
+                                n_groups: int, n_chunks: int) -> np.ndarray:
+        n = len(lat)
+        sums = np.zeros((n_chunks, n_groups, 4))  # weight, and the (weighted) sum of the earth-centered unit vectors
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        n_invalid = 0
+        for chunk in prange(n_chunks):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                group = labels[i] if len(labels) > 0 else 0
+                if group < 0 or group >= n_groups:
+                    n_invalid += 1
+                    continue
+                w = weights[i] if len(weights) > 0 else 1.0
+                cos_lat = math.cos(lat[i])
+                sums[chunk, group, 0] += w
+                sums[chunk, group, 1] += w * cos_lat * math.cos(lon[i])
+                sums[chunk, group, 2] += w * cos_lat * math.sin(lon[i])
+                sums[chunk, group, 3] += w * math.sin(lat[i])
+        if n_invalid > 0:
+            raise IndexError('label is out of bounds')
+        for group in prange(n_groups):
+            for chunk in range(1, n_chunks):
+                for k in range(4):
+                    sums[0, group, k] += sums[chunk, group, k]
+        return sums[0]
+
+    def geo_centroid(self, weights: Optional[Union[np.ndarray, Iterable[float]]] = None,
+                     labels: Optional[Union[np.ndarray, Iterable[int]]] = None,
+                     n_groups: Optional[int] = None) -> Coordinate:
+        """
+        Calculates the geographical centroid of the coordinates (or of every group of coordinates), in a single
+        (parallel, for large arrays) pass.
+        The centroid is the direction of the (weighted) mean of the earth-centered unit vectors of the coordinates,
+        which is well-defined across the antimeridian and near the poles (unlike the mean of the lat/lon values).
+        Note: the centroid is undefined (nan) for a group with no (positively weighted) coordinates.
+
+        :param weights: optional (non-negative) weights of the coordinates
+        :param labels: optional group labels of the coordinates (between 0 and n_groups - 1)
+        :param n_groups: the number of groups (defaults to the maximal label + 1)
+        :return: a Coordinate object of the centroid (or of the centroid of every group - of len n_groups)
+        """
+        labels, n_groups = _group_labels(labels, len(self), n_groups)
+        weights = _group_weights(weights, len(self))
+        sums = self._group_unit_vector_sums(self.lat, self.lon, weights, labels, n_groups,
+                                            _n_group_chunks(len(self), n_groups))
+        undefined = sums[:, 0] <= 0
+        lat = np.arctan2(sums[:, 3], np.hypot(sums[:, 1], sums[:, 2]))
+        lon = np.arctan2(sums[:, 2], sums[:, 1])
+        lat[undefined] = np.nan
+        lon[undefined] = np.nan
+        return Coordinate.from_columns(lat, lon)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _project_local(lat: np.ndarray, lon: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Projects every group onto a local (equirectangular) plane around its first coordinate [meters].
+        Returns the projected points, and the (lat, lon) origin of every group.
+        """
+        projected = np.empty((len(lat), 2))
+        origins = np.full((len(offsets) - 1, 2), np.nan)
+        for group in prange(len(offsets) - 1):
+            start, end = offsets[group], offsets[group + 1]
+            if start == end:
+                continue
+            origin_lat, origin_lon = lat[start], lon[start]
+            origins[group, 0], origins[group, 1] = origin_lat, origin_lon
+            east_scale = _METERS_PER_RADIAN * math.cos(origin_lat)
+            for i in range(start, end):
+                d_lon = (lon[i] - origin_lon + math.pi) % (2 * math.pi) - math.pi  # across the antimeridian
+                projected[i, 0] = d_lon * east_scale
+                projected[i, 1] = (lat[i] - origin_lat) * _METERS_PER_RADIAN
+        return projected, origins
+
+    @staticmethod
+    @njit(nogil=True)
+    def _unproject_local(points: np.ndarray, origins: np.ndarray) -> np.ndarray:
+        # the (lat, lon) of a point on the local plane around every origin (the inverse of _project_local)
+        unprojected = np.empty((len(points), 2))
+        for i in range(len(points)):
+            unprojected[i, 0] = origins[i, 0] + points[i, 1] / _METERS_PER_RADIAN
+            unprojected[i, 1] = _wrapped_angle(origins[i, 1] +
+                                               points[i, 0] / (_METERS_PER_RADIAN * math.cos(origins[i, 0])))
+        return unprojected
+
+    def _hull_indices(self, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        projected, _ = self._project_local(self.lat, self.lon, offsets)
+        return self._convex_hull(projected, offsets)
+
+    def convex_hull(self, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None
+                    ) -> Union[Coordinate, Tuple[np.ndarray, Coordinate]]:
+        """
+        Calculates the convex hull of the coordinates, or of every group of coordinates.
+        Every group is projected onto a local plane around its first coordinate (so that groups across the
+        antimeridian are supported), and the hull vertices are the original coordinates.
+
+        :param offsets: optional CSR offsets of a batch of groups - group i is the rows offsets[i]:offsets[i + 1]
+        :return: if offsets is None - the hull vertices (counter-clockwise, when viewed with north up),
+                 otherwise - a Tuple of the CSR offsets of the hulls (len(offsets)) and their vertices
+        """
+        return super().convex_hull(offsets)
+
+    def min_enclosing_circle(self, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None
+                             ) -> Tuple[Coordinate, Union[float, np.ndarray]]:
+        """
+        Calculates an approximation of the minimum enclosing circle of the coordinates, or of every group of
+        coordinates. Every group is projected onto a local plane around its first coordinate, so that the
+        approximation is best for groups that span up to several hundreds of kilometers.
+
+        :param offsets: optional CSR offsets of a batch of groups - group i is the rows offsets[i]:offsets[i + 1]
+        :return: a Tuple of the center(s) (a Coordinate object - of len 1, or one per group) and the radius
+                 (or a 1D numpy array of the radius of every group) [meters]
+        """
+        ragged_offsets = _ragged_offsets(offsets, len(self))
+        projected, origins = self._project_local(self.lat, self.lon, ragged_offsets)
+        centers, radii = self._min_enclosing_circle(projected, ragged_offsets)
+        return self._unproject_local(centers, origins).view(Coordinate), (radii[0] if offsets is None else radii)
+
+    def bin(self, grid_spec: GridSpec, values: Optional[np.ndarray] = None, *, sparse: bool = False,
+            units: Units = Units.RADIANS) -> Binned:
+        """
+        Bins the coordinates into the cells of a regular lat/lon grid (x1 is the latitude, and x2 is the longitude),
+        and aggregates the counts (and the sums and means of the attached values) of every cell.
+
+        :param grid_spec: the lat/lon grid (coordinates outside of it are ignored)
+        :param values: optional values attached to the coordinates - a 1D array of len(self), or of shape (len(self), V)
+        :param sparse: whether to aggregate only the non-empty cells
+        :param units: an enum, specifies whether the grid is given in radians or degrees.
+        :return: a Binned of the per cell aggregations (see Point2D.bin)
+        """
+        if units is Coordinate.Units.DEGREES:
+            grid_spec = GridSpec(math.radians(grid_spec.x1_min), math.radians(grid_spec.x2_min),
+                                 math.radians(grid_spec.x1_cell_size), math.radians(grid_spec.x2_cell_size),
+                                 grid_spec.x1_bins, grid_spec.x2_bins)
+        return super().bin(grid_spec, values, sparse=sparse)
+
+    def _default_curve_bounds(self) -> Tuple[float, float, float, float]:
+        # the whole globe - so that the spatial keys of all the coordinates are comparable
+        return -math.pi / 2, math.pi / 2, -math.pi, math.pi
+
+    def _simplification_metrics(self):
+        # distances [meters] and areas [meters**2] by the geo approximation (see Coordinate.geo_dist)
+        return _geo_segment_dist, _geo_triangle_area
+
+    def simplify_mask(self, tolerance: float, method: Point2D.Simplification = Point2D.Simplification.DOUGLAS_PEUCKER,
+                      *, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None) -> np.ndarray:
+        """
+        Simplifies a track (or a batch of tracks) of coordinates (see Point2D.simplify_mask), by an approximation of
+        the geographical distance (see Coordinate.geo_dist).
+
+        :param tolerance: the maximal distance of a removed coordinate from the simplified track [meters]
+                          (Douglas-Peucker), or the minimal effective (triangle) area of a kept coordinate
+                          [meters**2] (Visvalingam-Whyatt)
+        :param method: an enum, specifies the simplification algorithm
+        :param offsets: optional CSR offsets of a batch of tracks - track k is the rows offsets[k]:offsets[k + 1]
+        :return: a 1D boolean numpy array - whether every coordinate is kept (rows outside of the tracks are not)
+        """
+        return super().simplify_mask(tolerance, method, offsets=offsets)
+
+    def dbscan(self, eps: float, min_samples: int = 5) -> np.ndarray:
+        """
+        Clusters the coordinates by density (DBSCAN), by an approximation of the geographical distance
+        (see Point2D.dbscan).
+
+        :param eps: the neighbourhood radius [meters]
+        :param min_samples: the minimal number of coordinates in the neighbourhood of a core coordinate
+                            (including itself)
+        :return: a 1D numpy array of the cluster label of every coordinate (-1 for noise)
+        """
+        from vectorized2d import clustering
+        return clustering.dbscan(self.lon, self.lat, eps, min_samples, geo=True)
+
+    def to_mercator(self, *, out: Optional[np.ndarray] = None) -> Point2D:
+        """
+        Projects the coordinate(s) to Web Mercator (EPSG:3857), in a single parallel pass.
+
+        :param out: an optional float64 buffer of shape (N, 2) to write the projected points into
+        :return: a Point2D object of the (x, y) projected points [meters] (a view of out, if given)
+        """
+        from vectorized2d import projection
+        return projection.to_mercator(self.view(np.ndarray), out).view(Point2D)
+
+    @classmethod
+    def from_mercator(cls, points: Point2D, *, out: Optional[np.ndarray] = None) -> Coordinate:
+        """
+        Unprojects Web Mercator (EPSG:3857) points to coordinate(s) - the inverse of Coordinate.to_mercator.
+
+        :param points: the (x, y) projected points [meters]
+        :param out: an optional float64 buffer of shape (N, 2) to write the coordinates into
+        :return: a Coordinate object (a view of out, if given)
+        """
+        from vectorized2d import projection
+        return projection.from_mercator(points, out).view(cls)
+
+    def to_equirectangular(self, standard_lat: float = 0., *, out: Optional[np.ndarray] = None) -> Point2D:
+        """
+        Projects the coordinate(s) to the equirectangular projection, in a single parallel pass.
+
+        :param standard_lat: the latitude of true scale [radians] (0 - EPSG:4087)
+        :param out: an optional float64 buffer of shape (N, 2) to write the projected points into
+        :return: a Point2D object of the (x, y) projected points [meters] (a view of out, if given)
+        """
+        from vectorized2d import projection
+        return projection.to_equirectangular(self.view(np.ndarray), standard_lat, out).view(Point2D)
+
+    @classmethod
+    def from_equirectangular(cls, points: Point2D, standard_lat: float = 0., *,
+                             out: Optional[np.ndarray] = None) -> Coordinate:
+        """
+        Unprojects equirectangular points to coordinate(s) - the inverse of Coordinate.to_equirectangular.
+
+        :param points: the (x, y) projected points [meters]
+        :param standard_lat: the latitude of true scale [radians]
+        :param out: an optional float64 buffer of shape (N, 2) to write the coordinates into
+        :return: a Coordinate object (a view of out, if given)
+        """
+        from vectorized2d import projection
+        return projection.from_equirectangular(points, standard_lat, out).view(cls)
+
+    def to_utm(self, zone: Optional[Union[int, np.ndarray, Iterable[int]]] = None, *,
+               out: Optional[np.ndarray] = None) -> Tuple[Point2D, np.ndarray]:
+        """
+        Projects the coordinate(s) to UTM (WGS84), in a single parallel pass.
+
+        Examples:
+        --------
+        >>> c1 = Coordinate(lat=[45, -34], lon=[3, 18], units=Coordinate.Units.DEGREES)
+
+        >>> points, zones = c1.to_utm()
+        >>> zones
+        array([ 31, -34])
+
+        :param zone: the (signed - negative in the southern hemisphere) UTM zone of all the coordinates, or of every
+                     coordinate - otherwise, the zone of every coordinate is detected
+        :param out: an optional float64 buffer of shape (N, 2) to write the projected points into
+        :return: a Tuple of a Point2D object of the (easting, northing) projected points [meters] (a view of out, if
+                 given), and a 1D numpy array of the UTM zone of every point
+        """
+        from vectorized2d import projection
+        points, zones = projection.to_utm(self.view(np.ndarray), zone, out)
+        return points.view(Point2D), zones
+
+    @classmethod
+    def from_utm(cls, points: Point2D, zone: Union[int, np.ndarray, Iterable[int]], *,
+                 out: Optional[np.ndarray] = None) -> Coordinate:
+        """
+        Unprojects UTM (WGS84) points to coordinate(s) - the inverse of Coordinate.to_utm.
+
+        :param points: the (easting, northing) projected points [meters]
+        :param zone: the (signed - negative in the southern hemisphere) UTM zone of all the points, or of every point
+        :param out: an optional float64 buffer of shape (N, 2) to write the coordinates into
+        :return: a Coordinate object (a view of out, if given)
+        """
+        from vectorized2d import projection
+        return projection.from_utm(points, zone, out).view(cls)
+
+    def prepare(self, memo_size: int = 128) -> PreparedCoordinate:
+        """
+        Prepares the coordinate(s) as an immutable target set, for repeated one-to-many geo queries.
+
+        :param memo_size: the maximal number of memoized query results (0 disables memoization)
+        :return: a PreparedCoordinate object that holds the precomputed per-row terms of the coordinate(s)
+        """
+        from vectorized2d.prepared_coordinate import PreparedCoordinate
+        return PreparedCoordinate(self, memo_size=memo_size)
+
+    def encode(self, *, delta: bool = False) -> bytes:
+        """
+        Encodes the coordinate(s) into a compact fixed-point format (int32 degrees, optionally delta encoded).
+
+        :param delta: whether to delta encode consecutive coordinates (suited for tracks)
+        :return: the encoded bytes (see vectorized2d.codec)
+        """
+        from vectorized2d import codec
+        return codec.encode(self, delta=delta)
+
+    @classmethod
+    def decode(cls, buffer: bytes) -> Coordinate:
+        """
+        Decodes coordinate(s) from the compact fixed-point format of Coordinate.encode.
+
+        :param buffer: the encoded bytes (or any bytes-like object)
+        :return: a Coordinate object of the decoded coordinate(s)
+        """
+        from vectorized2d import codec
+        return codec.decode(buffer).view(cls)
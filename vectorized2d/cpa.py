@@ -0,0 +1,287 @@
+"""
+Closest point of approach (CPA) of pairs of moving objects - Point2D positions, or Coordinate positions (by the local
+projection of Coordinate's geo approximation), with Vector2D velocities.
+
+For a pair with a relative position d and a relative velocity w (of the second object, relative to the first one),
+the time to the closest approach is TCPA = -(d . w) / |w|^2, and the distance at the closest approach is
+DCPA = |d + w * TCPA|. Only future approaches are considered - the TCPA of a diverging pair (or of a pair with no
+relative motion) is 0, and its DCPA is the current distance.
+
+All the kernels are fused - no pairwise temporaries are allocated. Dense (all pairs) results are computed in blocks
+of rows and tiles of columns, and screening results (only the pairs below a CPA threshold) are streamed into CSR
+form, with no dense len(self) x len(other) matrix.
+"""
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.coordinate import _delta_east_and_north_terms
+from vectorized2d.point2d import _ROW_BLOCK_SIZE, _TILE_SIZE
+from vectorized2d.utils.spatial_grid import counts_to_offsets
+
+# Columns per hit tile - the screening granularity of the rows whose found pairs are written (a divisor of _TILE_SIZE)
+_HIT_TILE_SIZE = 256
+
+
+@njit(nogil=True)
+def _euclid_delta(a: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray, b: np.ndarray,
+                  b_cos_half: np.ndarray, b_sin_half: np.ndarray, i: int, j: int) -> Tuple[float, float]:
+    return b[j, 0] - a[i, 0], b[j, 1] - a[i, 1]
+
+
+@njit(nogil=True)
+def _geo_delta(a: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray, b: np.ndarray,
+               b_cos_half: np.ndarray, b_sin_half: np.ndarray, i: int, j: int) -> Tuple[float, float]:
+    # the rows are (lat, lon), and the velocities are (north, east)
+    d_east, d_north = _delta_east_and_north_terms(a[i, 0], a[i, 1], a_cos_half[i], a_sin_half[i],
+                                                  b[j, 0], b[j, 1], b_cos_half[j], b_sin_half[j])
+    return d_north, d_east
+
+
+@njit(nogil=True)
+def _pair_cpa(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+              b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray, b_sin_half: np.ndarray,
+              i: int, j: int) -> Tuple[float, float]:
+    # the delta function is a (compile-time) argument rather than a flag, so that it's inlined into the pair loops
+    d1, d2 = delta(a, a_cos_half, a_sin_half, b, b_cos_half, b_sin_half, i, j)
+    w1 = b_velocities[j, 0] - a_velocities[i, 0]
+    w2 = b_velocities[j, 1] - a_velocities[i, 1]
+    w_squared = w1 ** 2 + w2 ** 2
+    tcpa = 0.0
+    if w_squared > 0:
+        tcpa = max(0.0, -(d1 * w1 + d2 * w2) / w_squared)
+    return tcpa, math.sqrt((d1 + w1 * tcpa) ** 2 + (d2 + w2 * tcpa) ** 2)
+
+
+@njit(nogil=True)
+def _pair_may_approach(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray,
+                       a_sin_half: np.ndarray, b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray,
+                       b_sin_half: np.ndarray, i: int, j: int, max_dcpa_squared: float, max_tcpa: float) -> bool:
+    """
+    A division-free (and sqrt-free) screen of a pair - DCPA^2 * |w|^2 = |d|^2 * |w|^2 - (d . w)^2 for an approaching
+    pair, and a diverging pair is closest now.
+    """
+    d1, d2 = delta(a, a_cos_half, a_sin_half, b, b_cos_half, b_sin_half, i, j)
+    w1 = b_velocities[j, 0] - a_velocities[i, 0]
+    w2 = b_velocities[j, 1] - a_velocities[i, 1]
+    w_squared = w1 ** 2 + w2 ** 2
+    dot = d1 * w1 + d2 * w2
+    d_squared = d1 ** 2 + d2 ** 2
+    if dot >= 0 or w_squared == 0:
+        return d_squared <= max_dcpa_squared
+    return d_squared * w_squared - dot ** 2 <= max_dcpa_squared * w_squared and -dot <= max_tcpa * w_squared
+
+
+@njit(parallel=True, nogil=True)
+def _cpa_aligned(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+                 b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray,
+                 b_sin_half: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    tcpa = np.empty(len(a))
+    dcpa = np.empty(len(a))
+    for i in prange(len(a)):
+        tcpa[i], dcpa[i] = _pair_cpa(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                     b_sin_half, i, i)
+    return tcpa, dcpa
+
+
+@njit(parallel=True, nogil=True)
+def _cpa_all(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+             b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray,
+             b_sin_half: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n, m = len(a), len(b)
+    tcpa = np.empty((n, m))
+    dcpa = np.empty((n, m))
+    for block in prange((n + _ROW_BLOCK_SIZE - 1) // _ROW_BLOCK_SIZE):
+        start = block * _ROW_BLOCK_SIZE
+        end = min(start + _ROW_BLOCK_SIZE, n)
+        for tile_start in range(0, m, _TILE_SIZE):
+            tile_end = min(tile_start + _TILE_SIZE, m)
+            for i in range(start, end):
+                for j in range(tile_start, tile_end):
+                    tcpa[i, j], dcpa[i, j] = _pair_cpa(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities,
+                                                       b_cos_half, b_sin_half, i, j)
+    return tcpa, dcpa
+
+
+@njit(nogil=True)
+def _pair_within(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+                 b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray, b_sin_half: np.ndarray, i: int,
+                 j: int, max_dcpa_squared: float, max_dcpa: float, max_tcpa: float) -> bool:
+    # the (rarely passed) screen is followed by an exact check, so that the result agrees with _pair_cpa
+    if not _pair_may_approach(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                              b_sin_half, i, j, max_dcpa_squared, max_tcpa):
+        return False
+    tcpa, dcpa = _pair_cpa(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half, b_sin_half,
+                           i, j)
+    return dcpa <= max_dcpa and tcpa <= max_tcpa
+
+
+@njit(nogil=True)
+def _count_row(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+               b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray, b_sin_half: np.ndarray, i: int,
+               candidates: np.ndarray, start: int, end: int, min_j: int, max_dcpa: float,
+               max_tcpa: float) -> int:
+    """
+    Screens the pairs of row i of a with the rows start:end of b (or with the candidates[start:end] rows of b, if
+    candidates are given), skipping the rows of b below min_j, and counts the pairs below the CPA threshold.
+    """
+    max_dcpa_squared = max_dcpa ** 2
+    count = 0
+    if len(candidates) == 0:  # a tight loop over a range of b, for all pairs
+        for j in range(max(start, min_j), end):
+            count += _pair_within(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                  b_sin_half, i, j, max_dcpa_squared, max_dcpa, max_tcpa)
+        return count
+    for pos in range(start, end):
+        j = candidates[pos]
+        count += j >= min_j and _pair_within(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities,
+                                             b_cos_half, b_sin_half, i, j, max_dcpa_squared, max_dcpa, max_tcpa)
+    return count
+
+
+@njit(nogil=True)
+def _write_row(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+               b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray, b_sin_half: np.ndarray, i: int,
+               candidates: np.ndarray, start: int, end: int, min_j: int, max_dcpa: float, max_tcpa: float,
+               out_indices: np.ndarray, out_tcpa: np.ndarray, out_dcpa: np.ndarray, out_start: int) -> int:
+    """
+    Writes the pairs found by _count_row (within the same positions) into the outputs from out_start on.
+    Returns the output position following the written pairs.
+    """
+    max_dcpa_squared = max_dcpa ** 2
+    out_pos = out_start
+    for pos in range(start, end):
+        j = candidates[pos] if len(candidates) > 0 else pos
+        if j >= min_j and _pair_within(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                       b_sin_half, i, j, max_dcpa_squared, max_dcpa, max_tcpa):
+            out_indices[out_pos] = j
+            out_tcpa[out_pos], out_dcpa[out_pos] = _pair_cpa(delta, a, a_velocities, a_cos_half, a_sin_half, b,
+                                                             b_velocities, b_cos_half, b_sin_half, i, j)
+            out_pos += 1
+    return out_pos
+
+
+@njit(parallel=True, nogil=True)
+def _cpa_within(delta, a: np.ndarray, a_velocities: np.ndarray, a_cos_half: np.ndarray, a_sin_half: np.ndarray,
+                b: np.ndarray, b_velocities: np.ndarray, b_cos_half: np.ndarray, b_sin_half: np.ndarray,
+                candidate_offsets: np.ndarray, candidates: np.ndarray, self_pairs: bool, max_dcpa: float,
+                max_tcpa: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts the found pairs of every row first (in blocks of rows and tiles of columns), and then writes them - only
+    the hit tiles (of _HIT_TILE_SIZE columns, with found pairs) of a row are screened again.
+    Candidates are given in CSR form (candidate_offsets) as a single hit tile per row, and no candidates (an empty
+    array) stand for all pairs. Self pairs are screened only once (j > i).
+    """
+    n, m = len(a), len(b)
+    has_candidates = len(candidate_offsets) > 0
+    n_hit_tiles = 1 if has_candidates else (m + _HIT_TILE_SIZE - 1) // _HIT_TILE_SIZE
+    counts = np.zeros(n, dtype=np.int64)
+    hit_tiles = np.zeros((n, n_hit_tiles), dtype=np.bool_)
+    for block in prange((n + _ROW_BLOCK_SIZE - 1) // _ROW_BLOCK_SIZE):
+        start = block * _ROW_BLOCK_SIZE
+        end = min(start + _ROW_BLOCK_SIZE, n)
+        if has_candidates:
+            for i in range(start, end):
+                counts[i] = _count_row(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                       b_sin_half, i, candidates, candidate_offsets[i], candidate_offsets[i + 1],
+                                       i + 1 if self_pairs else 0, max_dcpa, max_tcpa)
+                hit_tiles[i, 0] = counts[i] > 0
+            continue
+        first_tile_start = (start + 1) // _TILE_SIZE * _TILE_SIZE if self_pairs else 0
+        for tile_start in range(first_tile_start, m, _TILE_SIZE):
+            tile_end = min(tile_start + _TILE_SIZE, m)
+            for i in range(start, end):
+                for hit_tile_start in range(tile_start, tile_end, _HIT_TILE_SIZE):
+                    count = _count_row(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                       b_sin_half, i, candidates, hit_tile_start,
+                                       min(hit_tile_start + _HIT_TILE_SIZE, m), i + 1 if self_pairs else 0,
+                                       max_dcpa, max_tcpa)
+                    if count > 0:
+                        counts[i] += count
+                        hit_tiles[i, hit_tile_start // _HIT_TILE_SIZE] = True
+
+    offsets = counts_to_offsets(counts)
+    indices = np.empty(offsets[-1], dtype=np.int64)
+    tcpa = np.empty(offsets[-1])
+    dcpa = np.empty(offsets[-1])
+    for i in prange(n):
+        out_start = offsets[i]
+        for hit_tile in range(n_hit_tiles):
+            if not hit_tiles[i, hit_tile]:
+                continue
+            if has_candidates:
+                hit_tile_start, hit_tile_end = candidate_offsets[i], candidate_offsets[i + 1]
+            else:
+                hit_tile_start = hit_tile * _HIT_TILE_SIZE
+                hit_tile_end = min(hit_tile_start + _HIT_TILE_SIZE, m)
+            out_start = _write_row(delta, a, a_velocities, a_cos_half, a_sin_half, b, b_velocities, b_cos_half,
+                                   b_sin_half, i, candidates, hit_tile_start, hit_tile_end,
+                                   i + 1 if self_pairs else 0, max_dcpa, max_tcpa, indices, tcpa, dcpa, out_start)
+    return offsets, indices, tcpa, dcpa
+
+
+def _delta(geo: bool):
+    return _geo_delta if geo else _euclid_delta
+
+
+def _half_lat_terms(points: np.ndarray, geo: bool) -> Tuple[np.ndarray, np.ndarray]:
+    # the per-row terms of the geo approximation (see _delta_east_and_north_terms)
+    if not geo:
+        return np.empty(0), np.empty(0)
+    return np.cos(points[:, 0] / 2), np.sin(points[:, 0] / 2)
+
+
+def _positions(points: np.ndarray) -> np.ndarray:
+    # the kernels take plain numpy arrays (rather than the array types, whose indexing differs with no jit)
+    return np.asarray(points, dtype=float)
+
+
+def _velocities(velocities: np.ndarray, n: int) -> np.ndarray:
+    velocities = np.ascontiguousarray(velocities, dtype=float).reshape(-1, 2)
+    assert len(velocities) == n, 'velocities must be of the same length as the positions'
+    return velocities
+
+
+def cpa(a: np.ndarray, a_velocities: np.ndarray, b: np.ndarray, b_velocities: np.ndarray, aligned: bool,
+        geo: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the TCPA and DCPA of all (or aligned) pairs - see Point2D.cpa and Coordinate.cpa.
+    """
+    a, b = _positions(a), _positions(b)
+    a_velocities = _velocities(a_velocities, len(a))
+    b_velocities = _velocities(b_velocities, len(b))
+    if aligned:
+        assert len(a) == len(b), 'ALIGNED pairing is supported only for positions of the same length'
+        return _cpa_aligned(_delta(geo), a, a_velocities, *_half_lat_terms(a, geo), b, b_velocities,
+                            *_half_lat_terms(b, geo))
+    return _cpa_all(_delta(geo), a, a_velocities, *_half_lat_terms(a, geo), b, b_velocities, *_half_lat_terms(b, geo))
+
+
+def cpa_within(a: np.ndarray, a_velocities: np.ndarray, b: Optional[np.ndarray], b_velocities: Optional[np.ndarray],
+               max_dcpa: float, max_tcpa: float, candidates: Optional[Tuple[np.ndarray, np.ndarray]],
+               geo: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Screens all (or candidate) pairs for the pairs below a CPA threshold - see Point2D.cpa_within and
+    Coordinate.cpa_within.
+    """
+    assert max_dcpa >= 0 and max_tcpa >= 0, 'max_dcpa and max_tcpa must be non-negative'
+    self_pairs = b is None
+    if self_pairs:
+        b, b_velocities = a, a_velocities
+    a, b = _positions(a), _positions(b)
+    a_velocities = _velocities(a_velocities, len(a))
+    b_velocities = _velocities(b_velocities, len(b))
+    if candidates is None:
+        candidate_offsets, candidate_indices = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    else:
+        candidate_offsets = np.asarray(candidates[0], dtype=np.int64).reshape(-1)
+        candidate_indices = np.asarray(candidates[1], dtype=np.int64).reshape(-1)
+        assert len(candidate_offsets) == len(a) + 1, 'candidate offsets must be of length len(self) + 1'
+        assert candidate_offsets[-1] == len(candidate_indices), 'candidate offsets must end with len(indices)'
+        if len(candidate_indices) == 0:  # no candidates at all
+            return candidate_offsets.copy(), candidate_indices, np.empty(0), np.empty(0)
+    return _cpa_within(_delta(geo), a, a_velocities, *_half_lat_terms(a, geo), b, b_velocities,
+                       *_half_lat_terms(b, geo), candidate_offsets, candidate_indices, self_pairs, float(max_dcpa),
+                       float(max_tcpa))
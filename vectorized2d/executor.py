@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.array2d import Array2D
+from vectorized2d.coordinate import Coordinate, _delta_east_and_north_terms
+from vectorized2d.point2d import Point2D
+
+# A shared array is described to the worker processes by (shared memory name, shape, dtype) - never by its data
+_SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class DistReduction(NamedTuple):
+    """
+    Per-row reductions of the distances between every point of `self` and all the points of `other`.
+    """
+    min_dist: np.ndarray
+    argmin: np.ndarray
+    count_within: Optional[np.ndarray]
+
+
+@njit(nogil=True)
+def _euclid_reduce_block(a: np.ndarray, b: np.ndarray, start: int, end: int, radius_squared: float,
+                         min_dists: np.ndarray, argmins: np.ndarray, counts: np.ndarray):
+    for i in range(start, end):
+        best_dist_squared = np.inf
+        best_j = -1
+        count = 0
+        for j in range(len(b)):
+            dist_squared = (b[j, 0] - a[i, 0]) ** 2 + (b[j, 1] - a[i, 1]) ** 2
+            if dist_squared < best_dist_squared:
+                best_dist_squared = dist_squared
+                best_j = j
+            if dist_squared <= radius_squared:
+                count += 1
+        min_dists[i] = math.sqrt(best_dist_squared)
+        argmins[i] = best_j
+        counts[i] = count
+
+
+@njit(nogil=True)
+def _geo_reduce_block(a: np.ndarray, b: np.ndarray, start: int, end: int, radius_squared: float,
+                      min_dists: np.ndarray, argmins: np.ndarray, counts: np.ndarray):
+    b_cos_half_lat = np.cos(b[:, 0] / 2)
+    b_sin_half_lat = np.sin(b[:, 0] / 2)
+    for i in range(start, end):
+        a_cos_half_lat = math.cos(a[i, 0] / 2)
+        a_sin_half_lat = math.sin(a[i, 0] / 2)
+        best_dist_squared = np.inf
+        best_j = -1
+        count = 0
+        for j in range(len(b)):
+            d_east, d_north = _delta_east_and_north_terms(a[i, 0], a[i, 1], a_cos_half_lat, a_sin_half_lat,
+                                                          b[j, 0], b[j, 1], b_cos_half_lat[j], b_sin_half_lat[j])
+            dist_squared = d_east ** 2 + d_north ** 2
+            if dist_squared < best_dist_squared:
+                best_dist_squared = dist_squared
+                best_j = j
+            if dist_squared <= radius_squared:
+                count += 1
+        min_dists[i] = math.sqrt(best_dist_squared)
+        argmins[i] = best_j
+        counts[i] = count
+
+
+_REDUCE_BLOCK_KERNELS = {
+    'euclid': _euclid_reduce_block,
+    'geo': _geo_reduce_block,
+}
+
+
+def _create_shared(stack: ExitStack, shape: Tuple[int, ...], dtype) -> Tuple[np.ndarray, _SharedArraySpec]:
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    stack.callback(shm.unlink)
+    stack.callback(shm.close)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf), (shm.name, shape, dtype.str)
+
+
+def _attach_shared(stack: ExitStack, spec: _SharedArraySpec) -> np.ndarray:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    stack.callback(shm.close)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _reduce_block(metric: str, a_spec: _SharedArraySpec, b_spec: _SharedArraySpec,
+                  out_specs: Tuple[_SharedArraySpec, _SharedArraySpec, _SharedArraySpec],
+                  start: int, end: int, radius_squared: float):
+    """
+    Runs in a worker process - attaches to the shared buffers and writes the reductions of rows [start, end).
+    """
+    with ExitStack() as stack:
+        a = _attach_shared(stack, a_spec)
+        b = _attach_shared(stack, b_spec)
+        min_dists, argmins, counts = (_attach_shared(stack, spec) for spec in out_specs)
+        _REDUCE_BLOCK_KERNELS[metric](a, b, start, end, radius_squared, min_dists, argmins, counts)
+        # the views must be released before the shared memory can be closed
+        del a, b, min_dists, argmins, counts
+
+
+class SharedMemoryExecutor:
+    """
+    A multi-process executor for very large pairwise reductions.
+
+    The Array2D buffers are placed in shared memory (multiprocessing.shared_memory), the rows of `self` are split
+    into blocks across a process pool, and every worker writes its reductions directly into shared output buffers.
+    Only buffer names and row ranges are sent to the workers - the data itself is never pickled.
+
+    Examples:
+    ---------
+    >>> with SharedMemoryExecutor(max_workers=4) as executor:  # doctest: +SKIP
+    ...     reduction = executor.euclid_dist_reduce(p1, p2, radius=10.0)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, block_size: Optional[int] = None, mp_context=None):
+        """
+
+        :param max_workers: the number of worker processes (defaults to the number of CPUs).
+        :param block_size: the number of `self` rows per task (defaults to ~4 blocks per worker).
+        :param mp_context: a multiprocessing context for the worker processes (defaults to 'spawn' - forking a process
+                           whose numba threading pool is live may hang the workers, or the interpreter on exit).
+        """
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._block_size = block_size
+        if mp_context is None:
+            mp_context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(max_workers=self._max_workers, mp_context=mp_context)
+
+    def __enter__(self) -> SharedMemoryExecutor:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the worker processes.
+        """
+        self._pool.shutdown(wait=wait)
+
+    def _reduce(self, metric: str, a: np.ndarray, b: np.ndarray, radius: Optional[float]) -> DistReduction:
+        assert len(b) > 0, 'distance reductions are undefined for an empty `other`'
+        n = len(a)
+        block_size = self._block_size or max(1, math.ceil(n / (self._max_workers * 4)))
+        radius_squared = radius ** 2 if radius is not None else -1.0
+
+        with ExitStack() as stack:
+            shared_a, a_spec = _create_shared(stack, a.shape, np.float64)
+            shared_b, b_spec = _create_shared(stack, b.shape, np.float64)
+            shared_a[...] = a
+            shared_b[...] = b
+            min_dists, min_dists_spec = _create_shared(stack, (n,), np.float64)
+            argmins, argmins_spec = _create_shared(stack, (n,), np.int64)
+            counts, counts_spec = _create_shared(stack, (n,), np.int64)
+
+            futures = [
+                self._pool.submit(_reduce_block, metric, a_spec, b_spec, (min_dists_spec, argmins_spec, counts_spec),
+                                  start, min(start + block_size, n), radius_squared)
+                for start in range(0, n, block_size)
+            ]
+            wait(futures)
+            for future in futures:
+                future.result()  # re-raise worker errors
+
+            reduction = DistReduction(min_dist=min_dists.copy(), argmin=argmins.copy(),
+                                      count_within=counts.copy() if radius is not None else None)
+            # the views must be released before the shared memory can be closed
+            del shared_a, shared_b, min_dists, argmins, counts
+
+        return reduction
+
+    def euclid_dist_reduce(self, points: Point2D, other: Point2D, radius: Optional[float] = None) -> DistReduction:
+        """
+        Calculates per-row reductions of the euclidean distances between every point of `points` and all the points
+        of `other`, without materializing the len(points) x len(other) distance matrix.
+
+        :param points: the source point(s), split into row blocks across the worker processes
+        :param other: the target point(s)
+        :param radius: if given, the number of points of `other` within this distance is counted as well
+        :return: a DistReduction of 1D numpy arrays of shape=(len(points),) -
+                 minimal distances, argmin indices (into `other`) and counts within radius (or None)
+        """
+        return self._reduce('euclid', points, other, radius)
+
+    def geo_dist_reduce(self, coordinates: Coordinate, other: Coordinate,
+                        radius: Optional[float] = None) -> DistReduction:
+        """
+        Calculates per-row reductions of the geographical distances between every coordinate of `coordinates` and
+        all the coordinates of `other`, without materializing the len(coordinates) x len(other) distance matrix.
+
+        :param coordinates: the source coordinate(s), split into row blocks across the worker processes
+        :param other: the target coordinate(s)
+        :param radius: if given, the number of coordinates of `other` within this distance is counted as well [meters]
+        :return: a DistReduction of 1D numpy arrays of shape=(len(coordinates),) -
+                 minimal distances [meters], argmin indices (into `other`) and counts within radius (or None)
+        """
+        return self._reduce('geo', coordinates, other, radius)
+
+
+@njit(parallel=True, nogil=True)
+def _parallel_sum(a: np.ndarray) -> float:
+    total = 0.0
+    for i in prange(len(a)):
+        total += a[i]
+    return total
+
+
+def _launch_threading_layer():
+    """
+    Launches the numba threading layer on the calling thread, by running a trivial parallel kernel.
+    The first parallel kernels must not be launched from worker threads - under the TBB layer, the interpreter then
+    hangs on exit.
+    """
+    _parallel_sum(np.zeros(1))
+
+
+# keyword arguments that are never chunked - the `other` of pairwise (all pairs) operations is needed as a whole
+_UNSPLIT_KWARGS = frozenset({'other'})
+
+
+def _split_length(args: Sequence[Any]) -> int:
+    # the split length is determined by the positional arguments only (a pairwise `other` may be longer)
+    return max((len(arg) for arg in args if isinstance(arg, np.ndarray) and arg.ndim > 0), default=0)
+
+
+def _chunk(arg: Any, n: int, start: int, end: int) -> Any:
+    # only the arrays of the split length are chunked, all other arguments are passed as-is to every chunk
+    return arg[start:end] if isinstance(arg, np.ndarray) and arg.ndim > 0 and len(arg) == n else arg
+
+
+def _chunk_args(args: Sequence[Any], n: int, start: int, end: int) -> Tuple[Any, ...]:
+    return tuple(_chunk(arg, n, start, end) for arg in args)
+
+
+def _chunk_kwargs(kwargs: dict, n: int, start: int, end: int) -> dict:
+    return {key: value if key in _UNSPLIT_KWARGS else _chunk(value, n, start, end) for key, value in kwargs.items()}
+
+
+def _concat_results(results: Sequence[Any]) -> Any:
+    first = results[0]
+    if isinstance(first, tuple):
+        return tuple(_concat_results([result[i] for result in results]) for i in range(len(first)))
+    if isinstance(first, Array2D):
+        return type(first).concat(results)
+    if isinstance(first, np.ndarray):
+        return np.concatenate(results)
+    return list(results)
+
+
+class ThreadedExecutor:
+    """
+    A thread-pool executor for vectorized2d operations.
+
+    All the vectorized2d kernels release the GIL, so that concurrent operations (either chunks of one large operation,
+    or many small independent ones) actually run in parallel on multiple cores.
+
+    Examples:
+    ---------
+    >>> with ThreadedExecutor(max_workers=4) as executor:  # doctest: +SKIP
+    ...     dists = executor.split(Coordinate.geo_dist, c1, c2)
+    ...     dists_per_track = executor.map(Coordinate.geo_dist, tracks, targets)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_chunk_size: int = 50_000):
+        """
+
+        :param max_workers: the number of worker threads (defaults to the number of CPUs).
+        :param min_chunk_size: the minimal number of rows per chunk, when splitting a single operation.
+        """
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._min_chunk_size = min_chunk_size
+        _launch_threading_layer()
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
+
+    def __enter__(self) -> ThreadedExecutor:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the worker threads.
+        """
+        self._pool.shutdown(wait=wait)
+
+    def submit(self, func: Callable, *args, **kwargs):
+        """
+        Schedules a single operation on the thread pool.
+
+        :return: a concurrent.futures.Future of the operation result
+        """
+        return self._pool.submit(func, *args, **kwargs)
+
+    def map(self, func: Callable, *iterables: Iterable) -> List[Any]:
+        """
+        Runs many small independent operations concurrently, that is, func(*args) for every args in zip(*iterables).
+
+        :return: a list of the operation results, in order
+        """
+        return list(self._pool.map(func, *iterables))
+
+    def split(self, func: Callable, *args, chunk_size: Optional[int] = None, **kwargs) -> Any:
+        """
+        Splits one large row-wise operation across the worker threads, and concatenates the results.
+
+        Every array argument (positional or keyword) of the length N of the largest positional array argument is
+        split into chunks of rows, while all other arguments (e.g. a single coordinate for one-to-many operations, or
+        scalars) are passed as-is to every chunk.
+        Note: pass unbound methods (e.g. Coordinate.geo_dist) so that `self` is split as well.
+        Note: the `other` of a pairwise (all pairs) operation must be passed as a keyword (other=...), which is never
+        split - a positional `other` of length N is split as an element-wise one.
+
+        :param func: a row-wise operation, whose results (or tuple of results) are concatenated along axis 0
+        :param chunk_size: the number of rows per chunk (defaults to an even split across the worker threads)
+        :return: the concatenated result(s) of func over all the chunks
+        """
+        n = _split_length(args)
+        if chunk_size is None:
+            chunk_size = max(self._min_chunk_size, math.ceil(n / self._max_workers))
+        if n <= chunk_size:
+            return func(*args, **kwargs)
+
+        def chunk(start: int):
+            end = start + chunk_size
+            return func(*_chunk_args(args, n, start, end), **_chunk_kwargs(kwargs, n, start, end))
+
+        return _concat_results(list(self._pool.map(chunk, range(0, n, chunk_size))))
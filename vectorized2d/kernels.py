@@ -0,0 +1,158 @@
+"""
+The compiled kernels of the library, as a public (and stable) set of numba functions - to be called from user @njit
+code (e.g. simulation loops) with no Python round-trip.
+
+The kernels take plain values rather than the array types - the x1 and x2 (e.g. lat and lon) of the elements, either
+as floats or as 1D numpy arrays (with standard broadcasting, just as the methods of the array types), e.g.
+
+    @njit
+    def track_length(track: np.ndarray) -> float:
+        return kernels.geo_dist(track[:-1, 0], track[:-1, 1], track[1:, 0], track[1:, 1]).sum()
+
+The kernels are the very same compiled functions the array types use (or share their formulas), so both agree - and
+angles are in radians and distances in meters, as in the array types. The array types themselves are passed to (and
+returned from) @njit code as plain numpy arrays, while the scalar types (ScalarPoint2D, ScalarVector2D and
+ScalarCoordinate) are native numba types (see vectorized2d.numba_types).
+"""
+from typing import Tuple, Union
+
+import numpy as np
+from numba import njit
+
+from vectorized2d.coordinate import Coordinate, _shifted_terms
+
+Value = Union[float, np.ndarray]
+
+# the dispatchers of the (static) kernels of the array types, as globals - which @njit code can call
+_delta_east_and_north_jit = Coordinate._delta_east_and_north_jit
+_dist = Coordinate._dist
+_dist_squared = Coordinate._dist_squared
+_bearing = Coordinate._bearing
+
+__all__ = ['norm', 'norm_squared', 'euclid_dist', 'euclid_dist_squared', 'from_polar', 'direction', 'dot', 'cross',
+           'angle_to', 'angle_between', 'rotated', 'delta_east_and_north', 'geo_dist', 'geo_dist_squared', 'bearing',
+           'geo_dist_and_bearing', 'shifted']
+
+
+@njit(nogil=True)
+def norm(x1: Value, x2: Value) -> Value:
+    return np.sqrt(x1 ** 2 + x2 ** 2)
+
+
+@njit(nogil=True)
+def norm_squared(x1: Value, x2: Value) -> Value:
+    return x1 ** 2 + x2 ** 2
+
+
+@njit(nogil=True)
+def euclid_dist(x1: Value, x2: Value, other_x1: Value, other_x2: Value) -> Value:
+    return np.sqrt((x1 - other_x1) ** 2 + (x2 - other_x2) ** 2)
+
+
+@njit(nogil=True)
+def euclid_dist_squared(x1: Value, x2: Value, other_x1: Value, other_x2: Value) -> Value:
+    return (x1 - other_x1) ** 2 + (x2 - other_x2) ** 2
+
+
+@njit(nogil=True)
+def from_polar(magnitude: Value, direction: Value) -> Tuple[Value, Value]:
+    """
+    Returns the (x1, x2) of vector(s) of given magnitude(s) and direction(s) [radians].
+    """
+    return magnitude * np.cos(direction), magnitude * np.sin(direction)
+
+
+@njit(nogil=True)
+def direction(x1: Value, x2: Value) -> Value:
+    """
+    Returns the (positive - between 0 and 2*pi) direction of vector(s) in radians.
+    """
+    return np.arctan2(x2, x1) % (2 * np.pi)
+
+
+@njit(nogil=True)
+def dot(x1: Value, x2: Value, other_x1: Value, other_x2: Value) -> Value:
+    return x1 * other_x1 + x2 * other_x2
+
+
+@njit(nogil=True)
+def cross(x1: Value, x2: Value, other_x1: Value, other_x2: Value) -> Value:
+    return x1 * other_x2 - x2 * other_x1
+
+
+@njit(nogil=True)
+def _nonzero_angle(angle: Value, dot: Value, cross: Value) -> Value:
+    # the angle of a zero vector is 0 (atan2 of signed zeros is either 0 or pi) - for floats as well as for arrays
+    # (adding 0. turns the -0. of a masked negative angle into 0.)
+    return angle * ((dot != 0) | (cross != 0)) + 0.
+
+
+@njit(nogil=True)
+def angle_to(x1: Value, x2: Value, towards_x1: Value, towards_x2: Value) -> Value:
+    """
+    Returns the angle(s) between vector(s) and vector(s) towards - in [-pi, pi), such that
+    [(direction + angle) % 2*pi = towards direction].
+    """
+    dot_ = dot(x1, x2, towards_x1, towards_x2)
+    cross_ = cross(x1, x2, towards_x1, towards_x2)
+    angle = np.arctan2(cross_, dot_)
+    return _nonzero_angle(angle - 2 * np.pi * (angle == np.pi), dot_, cross_)
+
+
+@njit(nogil=True)
+def angle_between(x1: Value, x2: Value, other_x1: Value, other_x2: Value) -> Value:
+    """
+    Returns the (unsigned - between 0 and pi) angle(s) between vector(s) and other vector(s).
+    """
+    dot_ = dot(x1, x2, other_x1, other_x2)
+    cross_ = cross(x1, x2, other_x1, other_x2)
+    return _nonzero_angle(np.arctan2(np.abs(cross_), dot_), dot_, cross_)
+
+
+@njit(nogil=True)
+def rotated(x1: Value, x2: Value, rotation_angle: Value) -> Tuple[Value, Value]:
+    """
+    Returns the (x1, x2) of vector(s) rotated by given angle(s) [radians].
+    """
+    return from_polar(norm(x1, x2), direction(x1, x2) + rotation_angle)
+
+
+@njit(nogil=True)
+def delta_east_and_north(lat: Value, lon: Value, other_lat: Value, other_lon: Value) -> Tuple[Value, Value]:
+    """
+    Returns an approximation of the delta(s) between coordinate(s) and other coordinate(s) on the east and north axes
+    [meters] (see Coordinate.geo_dist).
+    """
+    return _delta_east_and_north_jit(lat, lon, other_lat, other_lon)
+
+
+@njit(nogil=True)
+def geo_dist(lat: Value, lon: Value, other_lat: Value, other_lon: Value) -> Value:
+    d_east, d_north = _delta_east_and_north_jit(lat, lon, other_lat, other_lon)
+    return _dist(d_east, d_north)
+
+
+@njit(nogil=True)
+def geo_dist_squared(lat: Value, lon: Value, other_lat: Value, other_lon: Value) -> Value:
+    d_east, d_north = _delta_east_and_north_jit(lat, lon, other_lat, other_lon)
+    return _dist_squared(d_east, d_north)
+
+
+@njit(nogil=True)
+def bearing(lat: Value, lon: Value, other_lat: Value, other_lon: Value) -> Value:
+    d_east, d_north = _delta_east_and_north_jit(lat, lon, other_lat, other_lon)
+    return _bearing(d_east, d_north)
+
+
+@njit(nogil=True)
+def geo_dist_and_bearing(lat: Value, lon: Value, other_lat: Value, other_lon: Value) -> Tuple[Value, Value]:
+    d_east, d_north = _delta_east_and_north_jit(lat, lon, other_lat, other_lon)
+    return _dist(d_east, d_north), _bearing(d_east, d_north)
+
+
+@njit(nogil=True)
+def shifted(lat: Value, lon: Value, geo_dist: Value, bearing: Value) -> Tuple[Value, Value]:
+    """
+    Returns the (lat, lon) of coordinate(s) shifted by given distance(s) [meters] and bearing(s) [radians].
+    """
+    return _shifted_terms(lat, lon, geo_dist, bearing)
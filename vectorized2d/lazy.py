@@ -0,0 +1,336 @@
+"""
+Lazy (deferred) evaluation of chained row-wise Array2D expressions.
+
+An expression such as `((a - b).normalized() * 3 + c).norm` allocates (and passes over) an intermediate Nx2 array at
+every step when it is evaluated eagerly. Its lazy counterpart `((a.lazy() - b).normalized() * 3 + c).norm` only
+records the operations, and evaluate() runs all of them in a single compiled loop over the rows - every row is read
+once, every intermediate value lives in registers, and only the result is written.
+
+The loop is generated from the structure of the expression (every sub-expression is computed once, even when it is
+used more than once) and compiled with numba. The compiled kernels are cached by the generated source, so that an
+expression of the same structure (e.g. the same physics update at every time step) is compiled only once - the
+arrays and the scalars of the expression are arguments of the kernel, rather than part of it.
+"""
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.array2d import Array2D
+
+# Rows from which the fused kernels run in parallel
+_PARALLEL_MIN_ROWS = 1 << 16
+
+# The compiled fused kernels, by (generated source, parallel)
+_kernels: Dict[Tuple[str, bool], Callable] = {}
+
+_BINARY_OPERATORS = {'add': '+', 'sub': '-', 'mul': '*', 'truediv': '/'}
+
+
+@njit(nogil=True)
+def _nonzero(norm: float) -> float:
+    # normalizing a zero vector keeps it a zero vector (as Array2D.normalized does)
+    return norm if norm != 0 else 1.0
+
+
+def _same_memory(a: np.ndarray, b: np.ndarray) -> bool:
+    return (a.__array_interface__['data'][0] == b.__array_interface__['data'][0] and a.shape == b.shape
+            and a.strides == b.strides)
+
+
+def _compiled_kernel(source: str, parallel: bool) -> Callable:
+    key = (source, parallel)
+    if key not in _kernels:
+        namespace = {'math': math, 'prange': prange, '_nonzero': _nonzero}
+        exec(source, namespace)
+        _kernels[key] = njit(parallel=parallel, nogil=True)(namespace['_fused'])
+    return _kernels[key]
+
+
+class _LazyExpression:
+    """
+    A node of a lazy expression - an operation (op) over its arguments (args), which are either nodes or leaves.
+    A leaf is a float, a column (a per-row value, of shape N) or an Nx2 array (of shape 1x2 - broadcast to all rows).
+    As in numpy broadcasting, a 1D array operand of an Nx2 expression is a single row (broadcast to all rows) - a
+    per-row column must be given explicitly, either of shape Nx1 or as a LazyColumn (e.g. the norm of an expression).
+    """
+    __array_ufunc__ = None  # numpy operators defer to the reflected operators of the expression
+
+    def __init__(self, op: str, args: tuple):
+        self._op = op
+        self._args = args
+
+    @staticmethod
+    def _operand(value, per_row: bool = False) -> Union[_LazyExpression, float, np.ndarray]:
+        # per_row - whether a 1D array is a per-row column (e.g. of a LazyColumn), rather than a single row
+        if isinstance(value, _LazyExpression):
+            return value
+        if np.ndim(value) == 0 or np.shape(value) == (1,):
+            return float(np.reshape(value, -1)[0])
+        type_ = type(value) if isinstance(value, Array2D) else Array2D
+        value = np.ascontiguousarray(value, dtype=float)
+        if value.ndim == 1 and not per_row:
+            assert value.shape == (2,), 'a 1D operand of an Nx2 expression is a single row (broadcast to all rows) - ' \
+                                        'a per-row column must be of shape Nx1'
+            value = value.reshape(1, 2)
+        if value.ndim == 2 and value.shape[1] == 2:
+            return LazyArray2D('leaf', (value,), type_)
+        assert value.ndim == 1 or value.shape[1:] == (1,), 'a lazy operand must be a scalar, a column or Nx2'
+        return LazyColumn('leaf', (value.reshape(-1),))
+
+    def _binary(self, op: str, other, reflected: bool = False) -> _LazyExpression:
+        other = self._operand(other, per_row=isinstance(self, LazyColumn))
+        args = (other, self) if reflected else (self, other)
+        arrays = [arg for arg in args if isinstance(arg, LazyArray2D)]
+        if not arrays:
+            return LazyColumn(op, args)
+        # the result is of the type of the first Nx2 operand (as the numpy operators of Array2D)
+        return LazyArray2D(op, args, arrays[0]._type)
+
+    def __add__(self, other):
+        return self._binary('add', other)
+
+    def __radd__(self, other):
+        return self._binary('add', other, reflected=True)
+
+    def __sub__(self, other):
+        return self._binary('sub', other)
+
+    def __rsub__(self, other):
+        return self._binary('sub', other, reflected=True)
+
+    def __mul__(self, other):
+        return self._binary('mul', other)
+
+    def __rmul__(self, other):
+        return self._binary('mul', other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._binary('truediv', other)
+
+    def __rtruediv__(self, other):
+        return self._binary('truediv', other, reflected=True)
+
+    def __neg__(self):
+        return self._binary('mul', -1.0)
+
+    def _evaluate(self, out: Optional[np.ndarray],
+                  out_buffer: Callable[[Optional[np.ndarray], int], np.ndarray]) -> np.ndarray:
+        builder = _KernelBuilder()
+        source = builder.source(builder.emit(self))
+        n = builder.n_rows()
+        out = out_buffer(out, n)
+        for arg in builder.args:
+            # a row may overwrite only its own row of an array of the expression (which it has already read)
+            assert not isinstance(arg, np.ndarray) or _same_memory(arg, out) or not np.shares_memory(arg, out), \
+                'out must either be an array of the expression, or not overlap any of them'
+        _compiled_kernel(source, parallel=n >= _PARALLEL_MIN_ROWS)(n, np.asarray(out), *builder.args)
+        return out
+
+
+class LazyArray2D(_LazyExpression):
+    """
+    A lazy Nx2 expression - see Array2D.lazy.
+
+    Examples:
+    --------
+    >>> a1 = Array2D([[3., 4.], [0., 0.]])
+
+    >>> (a1.lazy().normalized() * 2 + 1).evaluate()
+    Array2D([[2.2, 2.6],
+             [1. , 1. ]])
+    """
+
+    def __init__(self, op: str, args: tuple, type_: type):
+        super().__init__(op, args)
+        self._type = type_
+
+    def __repr__(self) -> str:
+        return f'LazyArray2D(type={self._type.__name__}, op={self._op!r})'
+
+    @property
+    def x1(self) -> LazyColumn:
+        return LazyColumn('x1', (self,))
+
+    @property
+    def x2(self) -> LazyColumn:
+        return LazyColumn('x2', (self,))
+
+    @property
+    def norm(self) -> LazyColumn:
+        return LazyColumn('norm', (self,))
+
+    @property
+    def norm_squared(self) -> LazyColumn:
+        return LazyColumn('norm_squared', (self,))
+
+    @property
+    def direction(self) -> LazyColumn:
+        """
+        The (positive - between 0 and 2*pi) direction of the vector(s) in radians (see Vector2D.direction).
+        """
+        return LazyColumn('direction', (self,))
+
+    def normalized(self) -> LazyArray2D:
+        return LazyArray2D('normalized', (self,), self._type)
+
+    def project_onto(self, onto) -> LazyArray2D:
+        """
+        The projection onto other vector(s) (see Vector2D.project_onto).
+        """
+        onto = self._operand(onto)
+        assert isinstance(onto, LazyArray2D), 'can only project onto Nx2 vectors'
+        return LazyArray2D('project_onto', (self, onto), self._type)
+
+    def rotated(self, rotation_angle, rotation_units=None) -> LazyArray2D:
+        """
+        The vector(s) rotated by given rotation angle(s) (see Vector2D.rotated).
+        """
+        from vectorized2d.vector2d import Vector2D
+
+        rotation_angle = self._operand(rotation_angle, per_row=True)
+        assert not isinstance(rotation_angle, LazyArray2D), 'the rotation angle must be a scalar or a column'
+        if rotation_units is Vector2D.Units.DEGREES:
+            rotation_angle = rotation_angle * (math.pi / 180)
+        return LazyArray2D('rotated', (self, rotation_angle), self._type)
+
+    def evaluate(self, out: Optional[np.ndarray] = None) -> Array2D:
+        """
+        Evaluates the expression in a single compiled pass over the rows.
+
+        :param out: an optional float64 buffer of shape (N, 2) to write the result into (which may be one of the
+                    arrays of the expression - every row is read before it is written - but must not partially
+                    overlap any of them)
+        :return: the result, of the type of the first Nx2 operand of the expression (a view of out, if given)
+        """
+        return self._evaluate(out, Array2D._out_buffer).view(self._type)
+
+
+class LazyColumn(_LazyExpression):
+    """
+    A lazy expression of a single value per row (e.g. the norm of a LazyArray2D).
+    """
+
+    def __repr__(self) -> str:
+        return f'LazyColumn(op={self._op!r})'
+
+    @staticmethod
+    def _out_buffer(out: Optional[np.ndarray], n: int) -> np.ndarray:
+        if out is None:
+            return np.empty(n)
+        assert out.shape == (n,) and out.dtype == np.float64, f'out must be a float64 array of shape ({n},)'
+        return out
+
+    def evaluate(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Evaluates the expression in a single compiled pass over the rows.
+
+        :param out: an optional float64 buffer of shape (N,) to write the result into (which may be one of the
+                    columns of the expression, but must not partially overlap any of the arrays of the expression)
+        :return: the result - an ndarray of shape (N,) (out, if given)
+        """
+        return self._evaluate(out, self._out_buffer)
+
+
+class _KernelBuilder:
+    """
+    Generates the source of a fused kernel - a single loop over the rows, which computes every node of the
+    expression (once) into local variables.
+    """
+
+    def __init__(self):
+        self.args: List[Union[float, np.ndarray]] = []
+        self._arg_names: Dict[int, str] = {}
+        self._lengths: List[int] = []
+        self._lines: List[str] = []
+        self._values: Dict[int, Tuple[str, ...]] = {}
+
+    def n_rows(self) -> int:
+        lengths = set(self._lengths) - {1}
+        assert len(lengths) <= 1, f'the arrays of the expression are of different lengths: {sorted(lengths)}'
+        return lengths.pop() if lengths else 1
+
+    def _arg(self, value: Union[float, np.ndarray]) -> str:
+        # the same array is passed (and loaded) once, however many times it is used
+        key = id(value) if isinstance(value, np.ndarray) else -len(self.args) - 1
+        if key not in self._arg_names:
+            self._arg_names[key] = f'p{len(self.args)}'
+            self.args.append(value)
+            if isinstance(value, np.ndarray):
+                self._lengths.append(len(value))
+        return self._arg_names[key]
+
+    def _var(self, *values: str) -> Tuple[str, ...]:
+        names = tuple(f'v{len(self._lines)}_{k}' for k in range(len(values)))
+        self._lines.append(', '.join(names) + ' = ' + ', '.join(values))
+        return names
+
+    def emit(self, node: Union[_LazyExpression, float]) -> Tuple[str, ...]:
+        """
+        Emits the computation of a node (after the nodes of its arguments), and returns the names of its values -
+        two for an Nx2 node, and one for a column (or a float).
+        """
+        if not isinstance(node, _LazyExpression):
+            return self._arg(node),
+        if id(node) in self._values:
+            return self._values[id(node)]
+        if node._op == 'leaf':
+            values = self._emit_leaf(node._args[0])
+        else:
+            values = self._emit_op(node._op, [self.emit(arg) for arg in node._args])
+        self._values[id(node)] = values
+        return values
+
+    def _emit_leaf(self, value: np.ndarray) -> Tuple[str, ...]:
+        name = self._arg(value)
+        row = 'i' if len(value) != 1 else '0'
+        if value.ndim == 1:
+            return self._var(f'{name}[{row}]')
+        return self._var(f'{name}[{row}, 0]', f'{name}[{row}, 1]')
+
+    def _emit_op(self, op: str, args: List[Tuple[str, ...]]) -> Tuple[str, ...]:
+        if op in _BINARY_OPERATORS:
+            left, right = args
+            operator = _BINARY_OPERATORS[op]
+            if len(left) == len(right):
+                return self._var(*(f'{a} {operator} {b}' for a, b in zip(left, right)))
+            if len(left) == 1:
+                return self._var(*(f'{left[0]} {operator} {b}' for b in right))
+            return self._var(*(f'{a} {operator} {right[0]}' for a in left))
+
+        (x, y), other = args[0], args[1:]
+        if op == 'x1':
+            return self._var(x)
+        if op == 'x2':
+            return self._var(y)
+        if op == 'norm':
+            return self._var(f'math.sqrt({x} * {x} + {y} * {y})')
+        if op == 'norm_squared':
+            return self._var(f'{x} * {x} + {y} * {y}')
+        if op == 'direction':
+            return self._var(f'math.atan2({y}, {x}) % (2 * math.pi)')
+        if op == 'normalized':
+            norm, = self._var(f'_nonzero(math.sqrt({x} * {x} + {y} * {y}))')
+            return self._var(f'{x} / {norm}', f'{y} / {norm}')
+        if op == 'project_onto':
+            onto_x, onto_y = other[0]
+            norm, = self._var(f'_nonzero(math.sqrt({onto_x} * {onto_x} + {onto_y} * {onto_y}))')
+            unit_x, unit_y = self._var(f'{onto_x} / {norm}', f'{onto_y} / {norm}')
+            dot, = self._var(f'{x} * {unit_x} + {y} * {unit_y}')
+            return self._var(f'{dot} * {unit_x}', f'{dot} * {unit_y}')
+        if op == 'rotated':
+            cos, sin = self._var(f'math.cos({other[0][0]})', f'math.sin({other[0][0]})')
+            return self._var(f'{x} * {cos} - {y} * {sin}', f'{x} * {sin} + {y} * {cos}')
+        raise ValueError(f'unknown lazy operation {op!r}')
+
+    def source(self, result: Tuple[str, ...]) -> str:
+        params = ', '.join(f'p{k}' for k in range(len(self.args)))
+        if len(result) == 1:
+            stores = [f'out[i] = {result[0]}']
+        else:
+            stores = [f'out[i, 0] = {result[0]}', f'out[i, 1] = {result[1]}']
+        body = '\n'.join(f'        {line}' for line in self._lines + stores)
+        return f'def _fused(n, out, {params}):\n    for i in prange(n):\n{body}\n'
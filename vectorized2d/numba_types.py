@@ -0,0 +1,313 @@
+"""
+Numba type extensions of the scalar types (ScalarPoint2D, ScalarVector2D and ScalarCoordinate) - so that scalars can be
+passed to, created in and returned from user @njit code, with their attributes, methods and operators compiled (by
+the kernels of vectorized2d.kernels), e.g.
+
+    @njit
+    def step(position: ScalarCoordinate, velocity: ScalarVector2D, dt: float) -> ScalarCoordinate:
+        return position.shifted(velocity.norm * dt, math.pi / 2 - velocity.direction)
+
+A scalar is a native struct of two floats in compiled code (no Python objects), and is (un)boxed to/from its Python
+type at the boundaries. Angles are in radians only (compiled code takes no Units enums). The array types need no
+extension - they are passed to @njit code as plain numpy arrays.
+"""
+import operator
+
+from numba import types
+from numba.core import cgutils
+from numba.extending import (NativeValue, box, intrinsic, make_attribute_wrapper, models, overload,
+                             overload_attribute, overload_method, register_model, typeof_impl, unbox)
+
+from vectorized2d import kernels
+from vectorized2d.scalar import Scalar2D, ScalarCoordinate, ScalarPoint2D, ScalarVector2D
+
+__all__ = ['Scalar2DType', 'scalar_point2d_type', 'scalar_vector2d_type', 'scalar_coordinate_type']
+
+
+class Scalar2DType(types.Type):
+    """
+    The numba type of a scalar type (of scalar_class).
+    """
+
+    def __init__(self, scalar_class: type):
+        self.scalar_class = scalar_class
+        super().__init__(name=scalar_class.__name__)
+
+
+scalar_point2d_type = Scalar2DType(ScalarPoint2D)
+scalar_vector2d_type = Scalar2DType(ScalarVector2D)
+scalar_coordinate_type = Scalar2DType(ScalarCoordinate)
+_scalar_types = {scalar_type.scalar_class: scalar_type
+                 for scalar_type in (scalar_point2d_type, scalar_vector2d_type, scalar_coordinate_type)}
+
+
+@typeof_impl.register(Scalar2D)
+def _typeof_scalar(value: Scalar2D, c) -> Scalar2DType:
+    return _scalar_types.get(type(value))
+
+
+@register_model(Scalar2DType)
+class _Scalar2DModel(models.StructModel):
+    def __init__(self, dmm, fe_type):
+        super().__init__(dmm, fe_type, [('x1', types.float64), ('x2', types.float64)])
+
+
+make_attribute_wrapper(Scalar2DType, 'x1', 'x1')
+make_attribute_wrapper(Scalar2DType, 'x2', 'x2')
+
+
+@unbox(Scalar2DType)
+def _unbox_scalar(typ, obj, c):
+    x1_obj = c.pyapi.object_getattr_string(obj, 'x1')
+    x2_obj = c.pyapi.object_getattr_string(obj, 'x2')
+    scalar = cgutils.create_struct_proxy(typ)(c.context, c.builder)
+    scalar.x1 = c.pyapi.float_as_double(x1_obj)
+    scalar.x2 = c.pyapi.float_as_double(x2_obj)
+    c.pyapi.decref(x1_obj)
+    c.pyapi.decref(x2_obj)
+    is_error = cgutils.is_not_null(c.builder, c.pyapi.err_occurred())
+    return NativeValue(scalar._getvalue(), is_error=is_error)
+
+
+@box(Scalar2DType)
+def _box_scalar(typ, val, c):
+    scalar = cgutils.create_struct_proxy(typ)(c.context, c.builder, value=val)
+    x1_obj = c.pyapi.float_from_double(scalar.x1)
+    x2_obj = c.pyapi.float_from_double(scalar.x2)
+    # Scalar2D._from_values bypasses the (possibly keyword-only) constructors of the subclasses
+    class_obj = c.pyapi.unserialize(c.pyapi.serialize_object(typ.scalar_class))
+    from_values = c.pyapi.object_getattr_string(class_obj, '_from_values')
+    obj = c.pyapi.call_function_objargs(from_values, (x1_obj, x2_obj))
+    c.pyapi.decref(x1_obj)
+    c.pyapi.decref(x2_obj)
+    c.pyapi.decref(from_values)
+    c.pyapi.decref(class_obj)
+    return obj
+
+
+def _scalar_constructor(scalar_type: Scalar2DType):
+    # a compiled function that creates a scalar of scalar_type from its (x1, x2)
+    @intrinsic
+    def new_scalar(typingctx, x1, x2):
+        if not isinstance(x1, types.Number) or not isinstance(x2, types.Number):
+            return None
+
+        def codegen(context, builder, signature, args):
+            scalar = cgutils.create_struct_proxy(scalar_type)(context, builder)
+            scalar.x1 = context.cast(builder, args[0], signature.args[0], types.float64)
+            scalar.x2 = context.cast(builder, args[1], signature.args[1], types.float64)
+            return scalar._getvalue()
+
+        return scalar_type(x1, x2), codegen
+
+    return new_scalar
+
+
+_constructors = {scalar_class: _scalar_constructor(scalar_type) for scalar_class, scalar_type in _scalar_types.items()}
+_new_point2d = _constructors[ScalarPoint2D]
+_new_vector2d = _constructors[ScalarVector2D]
+_new_coordinate = _constructors[ScalarCoordinate]
+
+
+def _is_scalar(value, scalar_class: type = Scalar2D) -> bool:
+    return isinstance(value, Scalar2DType) and issubclass(value.scalar_class, scalar_class)
+
+
+# constructors
+
+@overload(ScalarPoint2D)
+def _point2d(x1, x2):
+    return lambda x1, x2: _new_point2d(x1, x2)
+
+
+@overload(ScalarVector2D)
+def _vector2d(x1, x2):
+    return lambda x1, x2: _new_vector2d(x1, x2)
+
+
+@overload(ScalarCoordinate)
+def _coordinate(lat, lon):
+    return lambda lat, lon: _new_coordinate(lat, lon)
+
+
+# operators - of scalars of the same type (and of a scalar and a number, for * and /)
+
+@overload(operator.add)
+def _add(a, b):
+    if _is_scalar(a) and a == b:
+        new = _constructors[a.scalar_class]
+        return lambda a, b: new(a.x1 + b.x1, a.x2 + b.x2)
+
+
+@overload(operator.sub)
+def _sub(a, b):
+    if _is_scalar(a) and a == b:
+        new = _constructors[a.scalar_class]
+        return lambda a, b: new(a.x1 - b.x1, a.x2 - b.x2)
+
+
+@overload(operator.mul)
+def _mul(a, b):
+    if _is_scalar(a) and isinstance(b, types.Number):
+        new = _constructors[a.scalar_class]
+        return lambda a, b: new(a.x1 * b, a.x2 * b)
+    if isinstance(a, types.Number) and _is_scalar(b):
+        new = _constructors[b.scalar_class]
+        return lambda a, b: new(a * b.x1, a * b.x2)
+
+
+@overload(operator.truediv)
+def _truediv(a, b):
+    if _is_scalar(a) and isinstance(b, types.Number):
+        new = _constructors[a.scalar_class]
+        return lambda a, b: new(a.x1 / b, a.x2 / b)
+
+
+@overload(operator.neg)
+def _neg(a):
+    if _is_scalar(a):
+        new = _constructors[a.scalar_class]
+        return lambda a: new(-a.x1, -a.x2)
+
+
+@overload(operator.eq)
+def _eq(a, b):
+    if _is_scalar(a) and _is_scalar(b):
+        return lambda a, b: a.x1 == b.x1 and a.x2 == b.x2
+
+
+# Scalar2D
+
+@overload_attribute(Scalar2DType, 'norm')
+def _norm(scalar):
+    return lambda scalar: kernels.norm(scalar.x1, scalar.x2)
+
+
+@overload_attribute(Scalar2DType, 'norm_squared')
+def _norm_squared(scalar):
+    return lambda scalar: kernels.norm_squared(scalar.x1, scalar.x2)
+
+
+@overload_method(Scalar2DType, 'normalized')
+def _normalized(scalar):
+    new = _constructors[scalar.scalar_class]
+
+    def impl(scalar):
+        norm = kernels.norm(scalar.x1, scalar.x2)
+        return new(scalar.x1 / norm, scalar.x2 / norm) if norm != 0 else new(scalar.x1, scalar.x2)
+
+    return impl
+
+
+# ScalarPoint2D
+
+@overload_method(Scalar2DType, 'euclid_dist')
+def _euclid_dist(scalar, other):
+    if _is_scalar(scalar, ScalarPoint2D) and _is_scalar(other, ScalarPoint2D):
+        return lambda scalar, other: kernels.euclid_dist(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'euclid_dist_squared')
+def _euclid_dist_squared(scalar, other):
+    if _is_scalar(scalar, ScalarPoint2D) and _is_scalar(other, ScalarPoint2D):
+        return lambda scalar, other: kernels.euclid_dist_squared(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+# ScalarVector2D
+
+@overload_attribute(Scalar2DType, 'direction')
+def _direction(scalar):
+    if _is_scalar(scalar, ScalarVector2D):
+        return lambda scalar: kernels.direction(scalar.x1, scalar.x2)
+
+
+@overload_method(Scalar2DType, 'dot')
+def _dot(scalar, other):
+    if _is_scalar(scalar, ScalarVector2D) and _is_scalar(other, ScalarVector2D):
+        return lambda scalar, other: kernels.dot(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'cross')
+def _cross(scalar, other):
+    if _is_scalar(scalar, ScalarVector2D) and _is_scalar(other, ScalarVector2D):
+        return lambda scalar, other: kernels.cross(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'perp')
+def _perp(scalar):
+    if _is_scalar(scalar, ScalarVector2D):
+        return lambda scalar: _new_vector2d(-scalar.x2, scalar.x1)
+
+
+@overload_method(Scalar2DType, 'project_onto')
+def _project_onto(scalar, onto):
+    if _is_scalar(scalar, ScalarVector2D) and _is_scalar(onto, ScalarVector2D):
+        def impl(scalar, onto):
+            onto_norm_squared = kernels.norm_squared(onto.x1, onto.x2)
+            factor = kernels.dot(scalar.x1, scalar.x2, onto.x1, onto.x2) / onto_norm_squared \
+                if onto_norm_squared else 0.
+            return _new_vector2d(onto.x1 * factor, onto.x2 * factor)
+        return impl
+
+
+@overload_method(Scalar2DType, 'rotated')
+def _rotated(scalar, rotation_angle):
+    if _is_scalar(scalar, ScalarVector2D):
+        return lambda scalar, rotation_angle: _new_vector2d(*kernels.rotated(scalar.x1, scalar.x2, rotation_angle))
+
+
+@overload_method(Scalar2DType, 'angle_to')
+def _angle_to(scalar, v_towards):
+    if _is_scalar(scalar, ScalarVector2D) and _is_scalar(v_towards, ScalarVector2D):
+        return lambda scalar, v_towards: kernels.angle_to(scalar.x1, scalar.x2, v_towards.x1, v_towards.x2)
+
+
+@overload_method(Scalar2DType, 'angle_between')
+def _angle_between(scalar, other):
+    if _is_scalar(scalar, ScalarVector2D) and _is_scalar(other, ScalarVector2D):
+        return lambda scalar, other: kernels.angle_between(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+# ScalarCoordinate
+
+@overload_attribute(Scalar2DType, 'lat')
+def _lat(scalar):
+    if _is_scalar(scalar, ScalarCoordinate):
+        return lambda scalar: scalar.x1
+
+
+@overload_attribute(Scalar2DType, 'lon')
+def _lon(scalar):
+    if _is_scalar(scalar, ScalarCoordinate):
+        return lambda scalar: scalar.x2
+
+
+@overload_method(Scalar2DType, 'geo_dist')
+def _geo_dist(scalar, other):
+    if _is_scalar(scalar, ScalarCoordinate) and _is_scalar(other, ScalarCoordinate):
+        return lambda scalar, other: kernels.geo_dist(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'geo_dist_squared')
+def _geo_dist_squared(scalar, other):
+    if _is_scalar(scalar, ScalarCoordinate) and _is_scalar(other, ScalarCoordinate):
+        return lambda scalar, other: kernels.geo_dist_squared(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'bearing')
+def _bearing(scalar, other):
+    if _is_scalar(scalar, ScalarCoordinate) and _is_scalar(other, ScalarCoordinate):
+        return lambda scalar, other: kernels.bearing(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'geo_dist_and_bearing')
+def _geo_dist_and_bearing(scalar, other):
+    if _is_scalar(scalar, ScalarCoordinate) and _is_scalar(other, ScalarCoordinate):
+        return lambda scalar, other: kernels.geo_dist_and_bearing(scalar.x1, scalar.x2, other.x1, other.x2)
+
+
+@overload_method(Scalar2DType, 'shifted')
+def _shifted(scalar, geo_dist, bearing):
+    if _is_scalar(scalar, ScalarCoordinate):
+        return lambda scalar, geo_dist, bearing: _new_coordinate(*kernels.shifted(scalar.x1, scalar.x2, geo_dist,
+                                                                                  bearing))
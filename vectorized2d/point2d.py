@@ -1,10 +1,366 @@
 from __future__ import annotations
 
+import math
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional, Tuple, Union
+
 import numpy as np
 from fast_enum import FastEnum
-from numba import njit
+from numba import njit, prange
 
 from vectorized2d import Array2D
+from vectorized2d.array2d import _n_chunks, _n_group_chunks, _ragged_offsets
+from vectorized2d.utils.spatial_grid import (Grid, build_grid, counts_to_offsets, grid_cell, grid_row_range,
+                                             radix_argsort, sort_csr_row)
+
+if TYPE_CHECKING:
+    from vectorized2d.vector2d import Vector2D
+
+# Rows of `self` per parallel task, and rows of `other` per tile, for streaming pairwise reductions
+_ROW_BLOCK_SIZE = 64
+_TILE_SIZE = 2048
+
+
+@njit(nogil=True)
+def _heap_replace_top(heap_dists: np.ndarray, heap_indices: np.ndarray, dist: float, index: int):
+    """
+    Replaces the top (largest distance) of a bounded max-heap, and sifts the new item down to its place.
+    """
+    k = len(heap_dists)
+    pos = 0
+    while True:
+        child = 2 * pos + 1
+        if child >= k:
+            break
+        if child + 1 < k and heap_dists[child + 1] > heap_dists[child]:
+            child += 1
+        if heap_dists[child] <= dist:
+            break
+        heap_dists[pos] = heap_dists[child]
+        heap_indices[pos] = heap_indices[child]
+        pos = child
+    heap_dists[pos] = dist
+    heap_indices[pos] = index
+
+
+@njit(nogil=True)
+def _sort_heap(heap_dists: np.ndarray, heap_indices: np.ndarray):
+    """
+    Sorts a heap in place, by distance and then by index.
+    """
+    order = np.argsort(heap_indices)
+    heap_dists[:] = heap_dists[order]
+    heap_indices[:] = heap_indices[order]
+    order = np.argsort(heap_dists, kind='mergesort')
+    heap_dists[:] = heap_dists[order]
+    heap_indices[:] = heap_indices[order]
+
+
+class GridSpec(NamedTuple):
+    """
+    A regular grid of x1_bins x x2_bins cells, each of x1_cell_size x x2_cell_size, from (x1_min, x2_min).
+    The cells are half-open - cell (i, j) holds [x1_min + i * x1_cell_size, x1_min + (i + 1) * x1_cell_size) x
+    [x2_min + j * x2_cell_size, x2_min + (j + 1) * x2_cell_size), and its flat (row-major) key is i * x2_bins + j.
+    """
+    x1_min: float
+    x2_min: float
+    x1_cell_size: float
+    x2_cell_size: float
+    x1_bins: int
+    x2_bins: int
+
+    @classmethod
+    def from_bounds(cls, x1_min: float, x1_max: float, x2_min: float, x2_max: float, x1_bins: int,
+                    x2_bins: int) -> GridSpec:
+        """
+        Creates a grid of x1_bins x x2_bins equal cells over [x1_min, x1_max) x [x2_min, x2_max).
+        """
+        return cls(x1_min, x2_min, (x1_max - x1_min) / x1_bins, (x2_max - x2_min) / x2_bins, x1_bins, x2_bins)
+
+
+class Binned(NamedTuple):
+    """
+    Per cell aggregations of rows binned into a grid.
+    Dense - counts is of shape (x1_bins, x2_bins) (and sums/means of shape (x1_bins, x2_bins, n_values)).
+    Sparse - only the non-empty cells, by their (ascending) flat keys - cells, counts, sums and means are aligned
+    along the first axis.
+    The sums and means are None when no values are given, and the means of empty (dense) cells are nan.
+    """
+    cells: Optional[np.ndarray]  # the flat keys of the non-empty cells (None, if dense)
+    counts: np.ndarray
+    sums: Optional[np.ndarray]
+    means: Optional[np.ndarray]
+
+
+@njit(nogil=True)
+def _bin_cell_key(x1: float, x2: float, x1_min: float, x2_min: float, x1_cell_size: float, x2_cell_size: float,
+                  x1_bins: int, x2_bins: int) -> int:
+    """
+    Returns the flat key of the grid cell of (x1, x2), or -1 if it's outside the grid (or nan).
+    """
+    i = math.floor((x1 - x1_min) / x1_cell_size)
+    j = math.floor((x2 - x2_min) / x2_cell_size)
+    if 0 <= i < x1_bins and 0 <= j < x2_bins:
+        return int(i) * x2_bins + int(j)
+    return -1
+
+
+@njit(nogil=True)
+def _cross(o_x: float, o_y: float, a_x: float, a_y: float, b_x: float, b_y: float) -> float:
+    return (a_x - o_x) * (b_y - o_y) - (a_y - o_y) * (b_x - o_x)
+
+
+@njit(nogil=True)
+def _group_convex_hull(points: np.ndarray, start: int, end: int, out: np.ndarray) -> int:
+    """
+    Andrew's monotone chain over the rows [start, end) of points.
+    Writes the row indices of the hull vertices (counter-clockwise, from the lowest x, without collinear vertices)
+    into out[start:end], and returns their count.
+    """
+    n = end - start
+    if n == 0:
+        return 0
+    x = points[start:end, 0]
+    y = points[start:end, 1]
+    by_y = np.argsort(y, kind='mergesort')
+    order = by_y[np.argsort(x[by_y], kind='mergesort')] + start  # lexicographic - by x, then by y
+    n_unique = 1
+    for i in range(1, n):  # duplicates are adjacent in the lexicographic order
+        if points[order[i], 0] != points[order[n_unique - 1], 0] or \
+                points[order[i], 1] != points[order[n_unique - 1], 1]:
+            order[n_unique] = order[i]
+            n_unique += 1
+
+    if n_unique <= 2:
+        out[start:start + n_unique] = order[:n_unique]
+        return n_unique
+    hull = np.empty(n_unique + 1, dtype=np.int64)  # the last vertex closes the hull (it is the first one)
+    k = 0
+    for i in range(n_unique):  # lower hull
+        p = order[i]
+        while k >= 2 and _cross(points[hull[k - 2], 0], points[hull[k - 2], 1], points[hull[k - 1], 0],
+                                points[hull[k - 1], 1], points[p, 0], points[p, 1]) <= 0:
+            k -= 1
+        hull[k] = p
+        k += 1
+    lower_size = k + 1
+    for i in range(n_unique - 2, -1, -1):  # upper hull
+        p = order[i]
+        while k >= lower_size and _cross(points[hull[k - 2], 0], points[hull[k - 2], 1], points[hull[k - 1], 0],
+                                         points[hull[k - 1], 1], points[p, 0], points[p, 1]) <= 0:
+            k -= 1
+        hull[k] = p
+        k += 1
+    out[start:start + k - 1] = hull[:k - 1]
+    return k - 1
+
+
+@njit(nogil=True)
+def _circle_contains(center_x: float, center_y: float, radius: float, x: float, y: float) -> bool:
+    return math.hypot(x - center_x, y - center_y) <= radius * (1 + 1e-12)
+
+
+@njit(nogil=True)
+def _circle_from_two(a_x: float, a_y: float, b_x: float, b_y: float) -> Tuple[float, float, float]:
+    return (a_x + b_x) / 2, (a_y + b_y) / 2, math.hypot(a_x - b_x, a_y - b_y) / 2
+
+
+@njit(nogil=True)
+def _circle_from_three(a_x: float, a_y: float, b_x: float, b_y: float, c_x: float,
+                       c_y: float) -> Tuple[float, float, float]:
+    # the circumcircle, relative to a (for precision)
+    b_x, b_y, c_x, c_y = b_x - a_x, b_y - a_y, c_x - a_x, c_y - a_y
+    d = 2 * (b_x * c_y - b_y * c_x)
+    if d == 0:  # collinear - the circle of the farthest pair
+        best_x, best_y, best_r = _circle_from_two(0.0, 0.0, b_x, b_y)
+        for p_x, p_y, q_x, q_y in ((0.0, 0.0, c_x, c_y), (b_x, b_y, c_x, c_y)):
+            center_x, center_y, r = _circle_from_two(p_x, p_y, q_x, q_y)
+            if r > best_r:
+                best_x, best_y, best_r = center_x, center_y, r
+        return best_x + a_x, best_y + a_y, best_r
+    b_norm = b_x ** 2 + b_y ** 2
+    c_norm = c_x ** 2 + c_y ** 2
+    center_x = (c_y * b_norm - b_y * c_norm) / d
+    center_y = (b_x * c_norm - c_x * b_norm) / d
+    return center_x + a_x, center_y + a_y, math.hypot(center_x, center_y)
+
+
+@njit(nogil=True)
+def _group_min_enclosing_circle(points: np.ndarray, start: int, end: int) -> Tuple[float, float, float]:
+    """
+    Welzl's algorithm (in its iterative, randomized incremental form - expected linear time) over the rows
+    [start, end) of points. The points are taken relative to the first one (for precision).
+    """
+    n = end - start
+    if n == 0:
+        return np.nan, np.nan, np.nan
+    origin_x, origin_y = points[start, 0], points[start, 1]
+    x = points[start:end, 0] - origin_x
+    y = points[start:end, 1] - origin_y
+    order = np.random.permutation(n)
+    x, y = x[order], y[order]
+
+    center_x, center_y, radius = x[0], y[0], 0.0
+    for i in range(1, n):
+        if _circle_contains(center_x, center_y, radius, x[i], y[i]):
+            continue
+        center_x, center_y, radius = x[i], y[i], 0.0
+        for j in range(i):
+            if _circle_contains(center_x, center_y, radius, x[j], y[j]):
+                continue
+            center_x, center_y, radius = _circle_from_two(x[i], y[i], x[j], y[j])
+            for k in range(j):
+                if not _circle_contains(center_x, center_y, radius, x[k], y[k]):
+                    center_x, center_y, radius = _circle_from_three(x[i], y[i], x[j], y[j], x[k], y[k])
+    return center_x + origin_x, center_y + origin_y, radius
+
+
+@njit(nogil=True)
+def _within_distance_row(x: float, y: float, other: np.ndarray, grid: Grid, span: int, radius_squared: float,
+                         out_indices: np.ndarray, out_dists: np.ndarray, out_start: int) -> int:
+    """
+    Scans the grid cells around (x, y) for the points of other within the radius, and counts them.
+    If out_start is non-negative, the matches are also written into the outputs from out_start on.
+    """
+    order = grid[5]
+    col, row = grid_cell(grid, x, y)
+    count = 0
+    for row_offset in range(-span, span + 1):
+        lo, hi = grid_row_range(grid, row + row_offset, col - span, col + span)
+        for pos in range(lo, hi):
+            j = order[pos]
+            dist_squared = (other[j, 0] - x) ** 2 + (other[j, 1] - y) ** 2
+            if dist_squared <= radius_squared:
+                if out_start >= 0:
+                    out_indices[out_start + count] = j
+                    out_dists[out_start + count] = math.sqrt(dist_squared)
+                count += 1
+    return count
+
+
+@njit(nogil=True)
+def _curve_cell(x: float, x_min: float, scale: float, max_cell: int) -> int:
+    # the (clamped) cell of x along an axis of max_cell + 1 cells - nan falls into the first cell
+    cell = (x - x_min) * scale
+    if not cell >= 0:
+        return 0
+    return min(int(cell), max_cell)
+
+
+@njit(nogil=True)
+def _spread_bits(x: int) -> int:
+    # spreads the (up to 32) low bits of x to the even bits
+    x &= 0xFFFFFFFF
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    return (x | (x << 1)) & 0x5555555555555555
+
+
+@njit(nogil=True)
+def _morton_key(x1: int, x2: int, bits: int) -> int:
+    return (_spread_bits(x1) << 1) | _spread_bits(x2)
+
+
+@njit(nogil=True)
+def _hilbert_key(x1: int, x2: int, bits: int) -> int:
+    """
+    A branch-free Hilbert key - the quadrant rotations of all the levels are resolved by a parallel prefix scan over
+    the bits of the (32 bit) cells (in log2(32) rounds), rather than by a loop over the levels.
+    """
+    if bits % 2:
+        # the keys of the lower cells of a 32 bit curve are transposed for an odd number of bits
+        x1, x2 = x2, x1
+    mask = 0xFFFFFFFF
+    a = x1 ^ x2
+    b = mask ^ a
+    c = mask ^ (x1 | x2)
+    d = x1 & (x2 ^ mask)
+    pa = a | (b >> 1)
+    pb = (a >> 1) ^ a
+    pc = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    pd = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+    for shift in (2, 4, 8):
+        a, b, c, d = pa, pb, pc, pd
+        pa = (a & (a >> shift)) ^ (b & (b >> shift))
+        pb = (a & (b >> shift)) ^ (b & ((a ^ b) >> shift))
+        pc ^= (a & (c >> shift)) ^ (b & (d >> shift))
+        pd ^= (b & (c >> shift)) ^ ((a ^ b) & (d >> shift))
+    a, b, c, d = pa, pb, pc, pd
+    pc ^= (a & (c >> 16)) ^ (b & (d >> 16))
+    pd ^= (b & (c >> 16)) ^ ((a ^ b) & (d >> 16))
+    a = pc ^ (pc >> 1)
+    b = pd ^ (pd >> 1)
+    i0 = x1 ^ x2
+    i1 = b | (mask ^ (i0 | a))
+    return (_spread_bits(i1) << 1) | _spread_bits(i0)
+
+
+@njit(nogil=True)
+def _segment_dist(points: np.ndarray, i: int, a: int, b: int) -> float:
+    # the distance of point i from the segment between points a and b
+    d1, d2 = points[b, 0] - points[a, 0], points[b, 1] - points[a, 1]
+    p1, p2 = points[i, 0] - points[a, 0], points[i, 1] - points[a, 1]
+    length_squared = d1 * d1 + d2 * d2
+    t = min(max((p1 * d1 + p2 * d2) / length_squared, 0.), 1.) if length_squared > 0 else 0.
+    return math.hypot(p1 - t * d1, p2 - t * d2)
+
+
+@njit(nogil=True)
+def _triangle_area(points: np.ndarray, a: int, i: int, b: int) -> float:
+    # the area of the triangle of points a, i and b
+    a1, a2 = points[a, 0] - points[i, 0], points[a, 1] - points[i, 1]
+    b1, b2 = points[b, 0] - points[i, 0], points[b, 1] - points[i, 1]
+    return abs(a1 * b2 - a2 * b1) / 2
+
+
+@njit(nogil=True)
+def _heap_item_less(key: float, index: int, other_key: float, other_index: int) -> bool:
+    return key < other_key or (key == other_key and index < other_index)
+
+
+@njit(nogil=True)
+def _min_heap_push(heap_keys: np.ndarray, heap_indices: np.ndarray, size: int, key: float, index: int) -> int:
+    """
+    Pushes an item into a min-heap of size items, and returns the new size. Equal keys are ordered by index.
+    """
+    pos = size
+    while pos > 0:
+        parent = (pos - 1) // 2
+        if not _heap_item_less(key, index, heap_keys[parent], heap_indices[parent]):
+            break
+        heap_keys[pos] = heap_keys[parent]
+        heap_indices[pos] = heap_indices[parent]
+        pos = parent
+    heap_keys[pos] = key
+    heap_indices[pos] = index
+    return size + 1
+
+
+@njit(nogil=True)
+def _min_heap_pop(heap_keys: np.ndarray, heap_indices: np.ndarray, size: int) -> int:
+    """
+    Removes the top (smallest key) of a min-heap of size items, and returns the new size. Equal keys are ordered by
+    index.
+    """
+    size -= 1
+    key, index = heap_keys[size], heap_indices[size]
+    pos = 0
+    while True:
+        child = 2 * pos + 1
+        if child >= size:
+            break
+        if child + 1 < size and _heap_item_less(heap_keys[child + 1], heap_indices[child + 1], heap_keys[child],
+                                                heap_indices[child]):
+            child += 1
+        if not _heap_item_less(heap_keys[child], heap_indices[child], key, index):
+            break
+        heap_keys[pos] = heap_keys[child]
+        heap_indices[pos] = heap_indices[child]
+        pos = child
+    heap_keys[pos] = key
+    heap_indices[pos] = index
+    return size
 
 
 class Point2D(Array2D):
@@ -12,8 +368,16 @@ class Point2D(Array2D):
         ALL = 0
         ALIGNED = 1
 
+    class Curve(metaclass=FastEnum):
+        MORTON = 0
+        HILBERT = 1
+
+    class Simplification(metaclass=FastEnum):
+        DOUGLAS_PEUCKER = 0
+        VISVALINGAM = 1
+
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _pairwise_diff(self: Point2D, other: Point2D) -> np.ndarray:
         """
         This function returns the pairwise difference(s) between all the pairs of points from self and other.
@@ -82,3 +446,530 @@ class Point2D(Array2D):
             dists = dists.reshape(len(self), len(other))
 
         return dists
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _nearest(a: np.ndarray, b: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n, m = len(a), len(b)
+        dists = np.full((n, k), np.inf)
+        indices = np.full((n, k), -1, dtype=np.int64)
+        for block in prange((n + _ROW_BLOCK_SIZE - 1) // _ROW_BLOCK_SIZE):
+            start = block * _ROW_BLOCK_SIZE
+            end = min(start + _ROW_BLOCK_SIZE, n)
+            for tile_start in range(0, m, _TILE_SIZE):
+                tile_end = min(tile_start + _TILE_SIZE, m)
+                for i in range(start, end):
+                    for j in range(tile_start, tile_end):
+                        dist_squared = (b[j, 0] - a[i, 0]) ** 2 + (b[j, 1] - a[i, 1]) ** 2
+                        if dist_squared < dists[i, 0]:
+                            _heap_replace_top(dists[i], indices[i], dist_squared, j)
+
+            for i in range(start, end):
+                _sort_heap(dists[i], indices[i])
+                for r in range(k):
+                    dists[i, r] = math.sqrt(dists[i, r])
+
+        return indices, dists
+
+    def nearest(self, other: Point2D, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest points of other (by euclidean distance) for every point of self.
+
+        Note: the len(self) x len(other) distance matrix is never materialized - other is streamed in tiles,
+        while only the k nearest candidates of every point are kept.
+
+        :param other: the target points
+        :param k: the number of nearest points to find (1 <= k <= len(other))
+        :return: a Tuple of two 2D numpy arrays of shape=(len(self), k) - the indices of the nearest points of other,
+                 and their euclidean distances, ordered by distance (ties are broken in favour of the lowest index)
+        """
+        assert 1 <= k <= len(other), 'k must be between 1 and len(other)'
+        return self._nearest(self, other, k)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _within_distance(a: np.ndarray, b: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        grid = build_grid(b[:, 0], b[:, 1], radius)
+        span = int(math.ceil(radius / grid[2]))
+        radius_squared = radius ** 2
+        no_indices = np.empty(0, dtype=np.int64)
+        no_dists = np.empty(0)
+
+        counts = np.empty(len(a), dtype=np.int64)
+        for i in prange(len(a)):
+            counts[i] = _within_distance_row(a[i, 0], a[i, 1], b, grid, span, radius_squared, no_indices, no_dists, -1)
+
+        offsets = counts_to_offsets(counts)
+        indices = np.empty(offsets[-1], dtype=np.int64)
+        dists = np.empty(offsets[-1])
+        for i in prange(len(a)):
+            _within_distance_row(a[i, 0], a[i, 1], b, grid, span, radius_squared, indices, dists, offsets[i])
+            sort_csr_row(indices, dists, offsets[i], offsets[i + 1])
+
+        return offsets, indices, dists
+
+    def within_distance(self, other: Point2D, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all the pairs of points of self and other within a euclidean distance of radius (inclusive).
+
+        Note: the points of other are bucketed into a grid of cells of size ~radius, so that only neighbouring cells
+        are examined, and no dense len(self) x len(other) matrix is ever materialized.
+
+        The result is given in CSR form - the points of other matched to point i of self are
+        indices[offsets[i]:offsets[i + 1]] (in ascending order), and their distances are
+        dists[offsets[i]:offsets[i + 1]].
+
+        :param other: the target points
+        :param radius: the maximal euclidean distance of a matched pair
+        :return: a Tuple of three 1D numpy arrays - offsets (len(self) + 1), indices and distances
+        """
+        assert radius >= 0, 'radius must be non-negative'
+        return self._within_distance(self.view(np.ndarray), other.view(np.ndarray), float(radius))
+
+    def cpa(self, velocities: Vector2D, other: Point2D, other_velocities: Vector2D, *,
+            pairing: Pairing = Pairing.ALL) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the closest point of approach of pairs of moving points of self and other (see vectorized2d.cpa).
+
+        Note: only future approaches are considered - a diverging pair is closest now (with a TCPA of 0).
+
+        :param velocities: the velocity of every point of self
+        :param other: the target points
+        :param other_velocities: the velocity of every point of other
+        :param pairing: An enum, specifies whether to calculate the CPA of
+                        ALL (pairwise) or ALIGNED (corresponding points) pairs.
+        :return: a Tuple of the time to the closest approach (TCPA, in the time units of the velocities) and the
+                 distance at the closest approach (DCPA) - 1D numpy arrays for ALIGNED pairing, or 2D numpy arrays
+                 of shape=(len(self), len(other)) for ALL pairing
+        """
+        from vectorized2d import cpa
+        return cpa.cpa(self, velocities, other, other_velocities, pairing is self.Pairing.ALIGNED, geo=False)
+
+    def cpa_within(self, velocities: Vector2D, max_dcpa: float, other: Optional[Point2D] = None,
+                   other_velocities: Optional[Vector2D] = None, *, max_tcpa: float = np.inf,
+                   candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Screens pairs of moving points of self and other for the pairs whose closest approach is within max_dcpa
+        (inclusive), within max_tcpa - with no dense len(self) x len(other) matrix.
+
+        If other is None, the pairs of self are screened, and every pair is found once (i < j).
+        Candidates restrict the screening to the pairs of a threshold join, e.g. the offsets and indices of
+        within_distance() - otherwise, all the pairs are screened.
+
+        The result is given in CSR form - the points of other found for point i of self are
+        indices[offsets[i]:offsets[i + 1]], and their TCPA and DCPA are tcpa[offsets[i]:offsets[i + 1]] and
+        dcpa[offsets[i]:offsets[i + 1]].
+
+        :param velocities: the velocity of every point of self
+        :param max_dcpa: the maximal distance at the closest approach of a found pair
+        :param other: the target points (self, if None)
+        :param other_velocities: the velocity of every point of other
+        :param max_tcpa: the maximal time to the closest approach of a found pair
+        :param candidates: optional CSR offsets (len(self) + 1) and indices of the candidate pairs
+        :return: a Tuple of four 1D numpy arrays - offsets (len(self) + 1), indices, TCPA and DCPA
+        """
+        from vectorized2d import cpa
+        return cpa.cpa_within(self, velocities, other, other_velocities, max_dcpa, max_tcpa, candidates, geo=False)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _convex_hull(points: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n_groups = len(offsets) - 1
+        vertices = np.empty(len(points), dtype=np.int64)
+        counts = np.empty(n_groups, dtype=np.int64)
+        for group in prange(n_groups):
+            counts[group] = _group_convex_hull(points, offsets[group], offsets[group + 1], vertices)
+        hull_offsets = counts_to_offsets(counts)
+        hull_indices = np.empty(hull_offsets[-1], dtype=np.int64)
+        for group in prange(n_groups):
+            hull_indices[hull_offsets[group]:hull_offsets[group + 1]] = \
+                vertices[offsets[group]:offsets[group] + counts[group]]
+        return hull_offsets, hull_indices
+
+    def convex_hull(self, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None
+                    ) -> Union[Point2D, Tuple[np.ndarray, Point2D]]:
+        """
+        Calculates the convex hull of the points (Andrew's monotone chain), or of every group of points.
+
+        The vertices are ordered counter-clockwise, starting from the lowest x (and then y), and the hull is not
+        closed (the first vertex is not repeated). Collinear and duplicate points are not included.
+
+        :param offsets: optional CSR offsets of a batch of groups - group i is the rows offsets[i]:offsets[i + 1]
+                        (grouped by labels? sort the rows by their labels first, e.g. with argsort_by)
+        :return: if offsets is None - the hull vertices (an object of the same type as self),
+                 otherwise - a Tuple of the CSR offsets of the hulls (len(offsets)) and their vertices
+        """
+        hull_offsets, hull_indices = self._hull_indices(_ragged_offsets(offsets, len(self)))
+        vertices = self.take(hull_indices)
+        return vertices if offsets is None else (hull_offsets, vertices)
+
+    def _hull_indices(self, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self._convex_hull(self.view(np.ndarray), offsets)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _min_enclosing_circle(points: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n_groups = len(offsets) - 1
+        centers = np.empty((n_groups, 2))
+        radii = np.empty(n_groups)
+        for group in prange(n_groups):
+            centers[group, 0], centers[group, 1], radii[group] = \
+                _group_min_enclosing_circle(points, offsets[group], offsets[group + 1])
+        return centers, radii
+
+    def min_enclosing_circle(self, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None
+                             ) -> Tuple[Point2D, Union[float, np.ndarray]]:
+        """
+        Calculates the minimum enclosing circle of the points (Welzl's algorithm), or of every group of points.
+
+        Note: the circle of an empty group is undefined (nan).
+
+        :param offsets: optional CSR offsets of a batch of groups - group i is the rows offsets[i]:offsets[i + 1]
+        :return: a Tuple of the center(s) (an object of the same type as self - of len 1, or one per group)
+                 and the radius (or a 1D numpy array of the radius of every group)
+        """
+        centers, radii = self._min_enclosing_circle(self.view(np.ndarray), _ragged_offsets(offsets, len(self)))
+        return centers.view(type(self)), (radii[0] if offsets is None else radii)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _bin_dense(points: np.ndarray, values: np.ndarray, grid_spec: GridSpec,
+                   n_chunks: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        A single pass over the rows - every chunk accumulates into its own (thread-local) cells, and the chunk cells
+        are summed up at the end (in parallel over cells).
+        """
+        x1_min, x2_min, x1_cell_size, x2_cell_size, x1_bins, x2_bins = grid_spec
+        n, n_cells, n_values = len(points), x1_bins * x2_bins, values.shape[1]
+        counts = np.zeros((n_chunks, n_cells), dtype=np.int64)
+        sums = np.zeros((n_chunks, n_cells, n_values))
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        for chunk in prange(n_chunks):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                key = _bin_cell_key(points[i, 0], points[i, 1], x1_min, x2_min, x1_cell_size, x2_cell_size,
+                                    x1_bins, x2_bins)
+                if key >= 0:
+                    counts[chunk, key] += 1
+                    for v in range(n_values):
+                        sums[chunk, key, v] += values[i, v]
+        for key in prange(n_cells):
+            for chunk in range(1, n_chunks):
+                counts[0, key] += counts[chunk, key]
+                for v in range(n_values):
+                    sums[0, key, v] += sums[chunk, key, v]
+        return counts[0], sums[0]
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _bin_keys(points: np.ndarray, grid_spec: GridSpec) -> np.ndarray:
+        x1_min, x2_min, x1_cell_size, x2_cell_size, x1_bins, x2_bins = grid_spec
+        keys = np.empty(len(points), dtype=np.int64)
+        for i in prange(len(points)):
+            keys[i] = _bin_cell_key(points[i, 0], points[i, 1], x1_min, x2_min, x1_cell_size, x2_cell_size,
+                                    x1_bins, x2_bins)
+        return keys
+
+    @staticmethod
+    @njit(nogil=True)
+    def _bin_sparse(keys: np.ndarray, order: np.ndarray,
+                    values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every non-empty cell is a run of rows in the order of the (sorted) cell keys.
+        """
+        n, n_values = len(keys), values.shape[1]
+        start = 0
+        while start < n and keys[order[start]] < 0:  # rows outside the grid come first
+            start += 1
+        n_cells = 0
+        for pos in range(start, n):
+            if pos == start or keys[order[pos]] != keys[order[pos - 1]]:
+                n_cells += 1
+        cells = np.empty(n_cells, dtype=np.int64)
+        counts = np.zeros(n_cells, dtype=np.int64)
+        sums = np.zeros((n_cells, n_values))
+        cell = -1
+        for pos in range(start, n):
+            i = order[pos]
+            if pos == start or keys[i] != keys[order[pos - 1]]:
+                cell += 1
+                cells[cell] = keys[i]
+            counts[cell] += 1
+            for v in range(n_values):
+                sums[cell, v] += values[i, v]
+        return cells, counts, sums
+
+    def bin(self, grid_spec: GridSpec, values: Optional[np.ndarray] = None, *, sparse: bool = False) -> Binned:
+        """
+        Bins the points into the cells of a regular grid, and aggregates the counts (and the sums and means of the
+        attached values) of every cell.
+
+        Note: the dense aggregation is a single parallel pass with thread-local cells. For huge grids (much more
+        cells than points), prefer the sparse aggregation, which holds only the non-empty cells (found by sorting
+        the cell keys of the points).
+
+        :param grid_spec: the grid (points outside of it are ignored)
+        :param values: optional values attached to the points - a 1D array of len(self), or of shape (len(self), V)
+        :param sparse: whether to aggregate only the non-empty cells
+        :return: a Binned of the per cell aggregations (with a trailing dimension of V, for 2D values)
+        """
+        assert grid_spec.x1_bins > 0 and grid_spec.x2_bins > 0, 'the grid must not be empty'
+        grid_spec = GridSpec(float(grid_spec.x1_min), float(grid_spec.x2_min), float(grid_spec.x1_cell_size),
+                             float(grid_spec.x2_cell_size), int(grid_spec.x1_bins), int(grid_spec.x2_bins))
+        points = self.view(np.ndarray)
+        n_values = None if values is None else np.shape(values)[1:]
+        values = np.empty((len(self), 0)) if values is None else np.asarray(values, dtype=float).reshape(len(self), -1)
+
+        if sparse:
+            keys = self._bin_keys(points, grid_spec)
+            cells, counts, sums = self._bin_sparse(keys, np.argsort(keys), values)
+        else:
+            cells = None
+            # every chunk holds its own cells
+            n_chunks = _n_group_chunks(len(self), grid_spec.x1_bins * grid_spec.x2_bins)
+            counts, sums = self._bin_dense(points, values, grid_spec, n_chunks)
+            counts = counts.reshape(grid_spec.x1_bins, grid_spec.x2_bins)
+            sums = sums.reshape(grid_spec.x1_bins, grid_spec.x2_bins, -1)
+
+        if n_values is None:
+            return Binned(cells=cells, counts=counts, sums=None, means=None)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts[..., np.newaxis]
+        shape = counts.shape + n_values
+        return Binned(cells=cells, counts=counts, sums=sums.reshape(shape), means=means.reshape(shape))
+
+    def dbscan(self, eps: float, min_samples: int = 5) -> np.ndarray:
+        """
+        Clusters the points by density (DBSCAN), by the euclidean distance.
+
+        A point with at least min_samples points (including itself) within a distance of eps (inclusive) is a core
+        point. Core points within eps of each other belong to the same cluster, and every other point joins the
+        cluster of its nearest core point within eps, if any (otherwise, it's noise).
+        Note: the points are bucketed into a grid of cells of ~eps (see vectorized2d.clustering).
+
+        :param eps: the neighbourhood radius
+        :param min_samples: the minimal number of points in the neighbourhood of a core point (including itself)
+        :return: a 1D numpy array of the cluster label of every point - clusters are numbered from 0 by the order of
+                 their first core point, and noise is labeled -1
+        """
+        from vectorized2d import clustering
+        return clustering.dbscan(self.x1, self.x2, eps, min_samples, geo=False)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _spatial_keys(key_of, points: np.ndarray, x1_min: float, x1_scale: float, x2_min: float, x2_scale: float,
+                      bits: int) -> np.ndarray:
+        max_cell = (1 << bits) - 1
+        keys = np.empty(len(points), dtype=np.int64)
+        for i in prange(len(points)):
+            keys[i] = key_of(_curve_cell(points[i, 0], x1_min, x1_scale, max_cell),
+                             _curve_cell(points[i, 1], x2_min, x2_scale, max_cell), bits)
+        return keys
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _bounds(points: np.ndarray, n_chunks: int) -> np.ndarray:
+        # (x1_min, x1_max, x2_min, x2_max) of every chunk - nan is ignored (by the comparisons)
+        n = len(points)
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        bounds = np.empty((n_chunks, 4))
+        for chunk in prange(n_chunks):
+            x1_min, x1_max, x2_min, x2_max = np.inf, -np.inf, np.inf, -np.inf
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                x1, x2 = points[i, 0], points[i, 1]
+                if x1 < x1_min:
+                    x1_min = x1
+                if x1 > x1_max:
+                    x1_max = x1
+                if x2 < x2_min:
+                    x2_min = x2
+                if x2 > x2_max:
+                    x2_max = x2
+            bounds[chunk, 0], bounds[chunk, 1], bounds[chunk, 2], bounds[chunk, 3] = x1_min, x1_max, x2_min, x2_max
+        return bounds
+
+    def _default_curve_bounds(self) -> Tuple[float, float, float, float]:
+        bounds = self._bounds(self.view(np.ndarray), _n_chunks(len(self)))
+        return bounds[:, 0].min(), bounds[:, 1].max(), bounds[:, 2].min(), bounds[:, 3].max()
+
+    def spatial_keys(self, curve: Curve = Curve.HILBERT, bits: int = 16,
+                     bounds: Optional[Tuple[float, float, float, float]] = None) -> np.ndarray:
+        """
+        Calculates the space-filling curve (Morton or Hilbert) key of every point, in a single parallel pass.
+        The bounds are divided into a grid of 2**bits x 2**bits cells, and the key of a point is the position of its
+        cell along the curve - thus, points with close keys are close to each other (and the Hilbert curve keeps
+        consecutive cells adjacent, while the Morton curve is cheaper to compute).
+
+        Examples:
+        --------
+        >>> p1 = Point2D([[0., 0.], [0., 1.], [1., 1.], [1., 0.]])
+
+        >>> p1.spatial_keys(bits=1)
+        array([0, 1, 2, 3])
+
+        >>> p1.spatial_keys(Point2D.Curve.MORTON, bits=1)
+        array([0, 1, 3, 2])
+
+        :param curve: an enum, specifies the space-filling curve
+        :param bits: the resolution - the number of bits per axis (between 1 and 31)
+        :param bounds: optional (x1_min, x1_max, x2_min, x2_max) of the grid (points outside of it are clamped to its
+                       border cells) - the bounding box of the points otherwise (the whole globe, for Coordinate).
+                       Keys are comparable across arrays (e.g. partitions) only for the same bounds.
+        :return: a 1D numpy array of the (int64, of 2 * bits bits) key of every point
+        """
+        assert 1 <= bits <= 31, 'bits must be between 1 and 31'
+        x1_min, x1_max, x2_min, x2_max = self._default_curve_bounds() if bounds is None else bounds
+        x1_scale = (1 << bits) / (x1_max - x1_min) if x1_max > x1_min else 0.
+        x2_scale = (1 << bits) / (x2_max - x2_min) if x2_max > x2_min else 0.
+        key_of = _hilbert_key if curve is self.Curve.HILBERT else _morton_key
+        return self._spatial_keys(key_of, self.view(np.ndarray), float(x1_min), x1_scale, float(x2_min), x2_scale,
+                                  bits)
+
+    def sort_spatially(self, curve: Curve = Curve.HILBERT, bits: int = 16,
+                       bounds: Optional[Tuple[float, float, float, float]] = None) -> Tuple[Point2D, np.ndarray]:
+        """
+        Reorders the points along a space-filling curve (see Point2D.spatial_keys), so that nearby points are nearby
+        in memory as well - which improves the cache locality of the kernels that follow (e.g. pairwise tiles, joins,
+        binning and index builds).
+
+        :param curve: an enum, specifies the space-filling curve
+        :param bits: the resolution - the number of bits per axis (between 1 and 31)
+        :param bounds: optional (x1_min, x1_max, x2_min, x2_max) of the grid - the bounding box of the points otherwise
+        :return: a Tuple of the reordered points (of the same type as self), and the permutation - the index of every
+                 reordered point in self
+        """
+        order = radix_argsort(self.spatial_keys(curve, bits, bounds), 2 * bits)
+        return self.take(order), order
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _douglas_peucker(dist_of, points: np.ndarray, offsets: np.ndarray, tolerance: float) -> np.ndarray:
+        """
+        An iterative Douglas-Peucker of every track in parallel - the stack of the pending segments of a track is kept
+        in its own rows of a shared buffer (a track of m points has less than m pending segments), so that there is
+        no allocation per track. The distance function is a compile-time argument, so that it's inlined.
+        """
+        keep = np.zeros(len(points), dtype=np.bool_)
+        stack = np.empty((len(points), 2), dtype=np.int64)
+        for track in prange(len(offsets) - 1):
+            start, end = offsets[track], offsets[track + 1]
+            if end - start <= 2:
+                keep[start:end] = True
+                continue
+            keep[start] = keep[end - 1] = True
+            stack[start, 0], stack[start, 1] = start, end - 1
+            top = start + 1
+            while top > start:
+                top -= 1
+                a, b = stack[top, 0], stack[top, 1]
+                max_dist, farthest = -1., -1
+                for i in range(a + 1, b):
+                    dist = dist_of(points, i, a, b)
+                    if dist > max_dist:
+                        max_dist, farthest = dist, i
+                if max_dist > tolerance:
+                    keep[farthest] = True
+                    if farthest - a >= 2:
+                        stack[top, 0], stack[top, 1] = a, farthest
+                        top += 1
+                    if b - farthest >= 2:
+                        stack[top, 0], stack[top, 1] = farthest, b
+                        top += 1
+        return keep
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _visvalingam(area_of, points: np.ndarray, offsets: np.ndarray, tolerance: float) -> np.ndarray:
+        """
+        Visvalingam-Whyatt of every track in parallel - the points are removed by their smallest effective area,
+        from a min-heap with lazy deletion (stale entries are skipped once popped). A track of m points has at most 3m
+        heap entries, which are kept in its own rows of shared buffers (no allocation per track). The area function is
+        a compile-time argument, so that it's inlined.
+        """
+        n = len(points)
+        keep = np.zeros(n, dtype=np.bool_)
+        areas = np.empty(n)
+        prev_points, next_points = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64)
+        heap_keys, heap_indices = np.empty(3 * n), np.empty(3 * n, dtype=np.int64)
+        for track in prange(len(offsets) - 1):
+            start, end = offsets[track], offsets[track + 1]
+            keep[start:end] = True
+            if end - start <= 2:
+                continue
+            track_keys, track_indices = heap_keys[3 * start:3 * end], heap_indices[3 * start:3 * end]
+            size = 0
+            for i in range(start + 1, end - 1):
+                prev_points[i], next_points[i] = i - 1, i + 1
+                areas[i] = area_of(points, i - 1, i, i + 1)
+                size = _min_heap_push(track_keys, track_indices, size, areas[i], i)
+            prev_points[end - 1], next_points[start] = end - 2, start + 1
+            while size > 0:
+                area, i = track_keys[0], track_indices[0]
+                size = _min_heap_pop(track_keys, track_indices, size)
+                if not keep[i] or area != areas[i]:  # a stale entry
+                    continue
+                if not area < tolerance:
+                    break
+                keep[i] = False
+                a, b = prev_points[i], next_points[i]
+                next_points[a], prev_points[b] = b, a
+                # the effective area of a neighbour is never smaller than that of a point removed before it
+                if a > start:
+                    areas[a] = max(area_of(points, prev_points[a], a, b), area)
+                    size = _min_heap_push(track_keys, track_indices, size, areas[a], a)
+                if b < end - 1:
+                    areas[b] = max(area_of(points, a, b, next_points[b]), area)
+                    size = _min_heap_push(track_keys, track_indices, size, areas[b], b)
+        return keep
+
+    def _simplification_metrics(self):
+        # the (compiled) point-to-segment distance and triangle area functions of the simplification kernels
+        return _segment_dist, _triangle_area
+
+    def simplify_mask(self, tolerance: float, method: Simplification = Simplification.DOUGLAS_PEUCKER, *,
+                      offsets: Optional[Union[np.ndarray, Iterable[int]]] = None) -> np.ndarray:
+        """
+        Simplifies a polyline (or a batch of polylines) of points, in a single parallel pass over the polylines.
+        The first and last points of every polyline are always kept.
+
+        Examples:
+        --------
+        >>> p1 = Point2D([[0., 0.], [1., 0.1], [2., 0.], [3., 2.], [4., 0.]])
+
+        >>> p1.simplify_mask(0.5)
+        array([ True, False,  True,  True,  True])
+
+        :param tolerance: the maximal distance of a removed point from the simplified polyline (Douglas-Peucker),
+                          or the minimal effective (triangle) area of a kept point (Visvalingam-Whyatt)
+        :param method: an enum, specifies the simplification algorithm
+        :param offsets: optional CSR offsets of a batch of polylines - polyline k is the rows offsets[k]:offsets[k + 1]
+        :return: a 1D boolean numpy array - whether every point is kept (rows outside of the polylines are not)
+        """
+        assert tolerance >= 0, 'tolerance must be non-negative'
+        dist_of, area_of = self._simplification_metrics()
+        points = np.ascontiguousarray(self.view(np.ndarray))
+        offsets = _ragged_offsets(offsets, len(self))
+        if method is self.Simplification.VISVALINGAM:
+            return self._visvalingam(area_of, points, offsets, float(tolerance))
+        return self._douglas_peucker(dist_of, points, offsets, float(tolerance))
+
+    def simplify(self, tolerance: float, method: Simplification = Simplification.DOUGLAS_PEUCKER, *,
+                 offsets: Optional[Union[np.ndarray, Iterable[int]]] = None
+                 ) -> Union[Point2D, Tuple[Point2D, np.ndarray]]:
+        """
+        Simplifies a polyline (or a batch of polylines) of points (see Point2D.simplify_mask), into a compacted array.
+
+        :param tolerance: the maximal distance of a removed point from the simplified polyline (Douglas-Peucker),
+                          or the minimal effective (triangle) area of a kept point (Visvalingam-Whyatt)
+        :param method: an enum, specifies the simplification algorithm
+        :param offsets: optional CSR offsets of a batch of polylines - polyline k is the rows offsets[k]:offsets[k + 1]
+        :return: the kept points (of the same type as self), or (for a batch of polylines) a Tuple of the kept points
+                 and their CSR offsets
+        """
+        keep = self.simplify_mask(tolerance, method, offsets=offsets)
+        simplified = self[keep]
+        if offsets is None:
+            return simplified
+        kept_before = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept_before[1:])
+        return simplified, kept_before[_ragged_offsets(offsets, len(self))]
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.coordinate import Coordinate, _METERS_PER_RADIAN, _delta_east_and_north_terms
+
+
+@njit(parallel=True, nogil=True)
+def _pairwise_geo_dist(q_lat: np.ndarray, q_lon: np.ndarray, q_cos_half_lat: np.ndarray, q_sin_half_lat: np.ndarray,
+                       t_lat: np.ndarray, t_lon: np.ndarray, t_cos_half_lat: np.ndarray,
+                       t_sin_half_lat: np.ndarray) -> np.ndarray:
+    dists = np.empty((len(q_lat), len(t_lat)))
+    for i in prange(len(q_lat)):
+        for j in range(len(t_lat)):
+            d_east, d_north = _delta_east_and_north_terms(q_lat[i], q_lon[i], q_cos_half_lat[i], q_sin_half_lat[i],
+                                                          t_lat[j], t_lon[j], t_cos_half_lat[j], t_sin_half_lat[j])
+            dists[i, j] = math.sqrt(d_east ** 2 + d_north ** 2)
+    return dists
+
+
+@njit(parallel=True, nogil=True)
+def _pairwise_bearing(q_lat: np.ndarray, q_lon: np.ndarray, q_cos_half_lat: np.ndarray, q_sin_half_lat: np.ndarray,
+                      t_lat: np.ndarray, t_lon: np.ndarray, t_cos_half_lat: np.ndarray,
+                      t_sin_half_lat: np.ndarray) -> np.ndarray:
+    bearings = np.empty((len(q_lat), len(t_lat)))
+    for i in prange(len(q_lat)):
+        for j in range(len(t_lat)):
+            d_east, d_north = _delta_east_and_north_terms(q_lat[i], q_lon[i], q_cos_half_lat[i], q_sin_half_lat[i],
+                                                          t_lat[j], t_lon[j], t_cos_half_lat[j], t_sin_half_lat[j])
+            bearings[i, j] = math.atan2(d_east, d_north) % (2 * math.pi)
+    return bearings
+
+
+@njit(parallel=True, nogil=True)
+def _nearest(q_lat: np.ndarray, q_lon: np.ndarray, q_cos_half_lat: np.ndarray, q_sin_half_lat: np.ndarray,
+             s_lat: np.ndarray, s_lon: np.ndarray, s_cos_half_lat: np.ndarray, s_sin_half_lat: np.ndarray,
+             order: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the nearest target for every query, scanning the latitude-sorted targets outwards from the query latitude.
+    The north delta is a lower bound of the distance, so the scan stops as soon as it exceeds the best distance found.
+    """
+    m = len(s_lat)
+    min_dists = np.empty(len(q_lat))
+    argmins = np.empty(len(q_lat), dtype=np.int64)
+    for i in prange(len(q_lat)):
+        hi = np.searchsorted(s_lat, q_lat[i])
+        lo = hi - 1
+        best_dist_squared = np.inf
+        best_j = -1
+        while lo >= 0 or hi < m:
+            lo_lat_delta = q_lat[i] - s_lat[lo] if lo >= 0 else np.inf
+            hi_lat_delta = s_lat[hi] - q_lat[i] if hi < m else np.inf
+            if lo_lat_delta <= hi_lat_delta:
+                j = lo
+                lat_delta = lo_lat_delta
+                lo -= 1
+            else:
+                j = hi
+                lat_delta = hi_lat_delta
+                hi += 1
+
+            if (lat_delta * _METERS_PER_RADIAN) ** 2 > best_dist_squared:
+                break
+
+            d_east, d_north = _delta_east_and_north_terms(q_lat[i], q_lon[i], q_cos_half_lat[i], q_sin_half_lat[i],
+                                                          s_lat[j], s_lon[j], s_cos_half_lat[j], s_sin_half_lat[j])
+            dist_squared = d_east ** 2 + d_north ** 2
+            if dist_squared < best_dist_squared or (dist_squared == best_dist_squared and order[j] < order[best_j]):
+                best_dist_squared = dist_squared
+                best_j = j
+
+        min_dists[i] = math.sqrt(best_dist_squared)
+        argmins[i] = order[best_j]
+    return min_dists, argmins
+
+
+@njit(parallel=True, nogil=True)
+def _within_radius(q_lat: np.ndarray, q_lon: np.ndarray, q_cos_half_lat: np.ndarray, q_sin_half_lat: np.ndarray,
+                   s_lat: np.ndarray, s_lon: np.ndarray, s_cos_half_lat: np.ndarray, s_sin_half_lat: np.ndarray,
+                   order: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Finds all the targets within radius of every query, as CSR arrays (offsets, indices, distances).
+    Only the targets inside the latitude band of the query are examined.
+    """
+    n = len(q_lat)
+    radius_squared = radius ** 2
+    lat_band = radius / _METERS_PER_RADIAN
+
+    band_starts = np.empty(n, dtype=np.int64)
+    band_ends = np.empty(n, dtype=np.int64)
+    counts = np.zeros(n, dtype=np.int64)
+    for i in prange(n):
+        band_starts[i] = np.searchsorted(s_lat, q_lat[i] - lat_band, side='left')
+        band_ends[i] = np.searchsorted(s_lat, q_lat[i] + lat_band, side='right')
+        for j in range(band_starts[i], band_ends[i]):
+            d_east, d_north = _delta_east_and_north_terms(q_lat[i], q_lon[i], q_cos_half_lat[i], q_sin_half_lat[i],
+                                                          s_lat[j], s_lon[j], s_cos_half_lat[j], s_sin_half_lat[j])
+            if d_east ** 2 + d_north ** 2 <= radius_squared:
+                counts[i] += 1
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    indices = np.empty(offsets[-1], dtype=np.int64)
+    dists = np.empty(offsets[-1])
+    for i in prange(n):
+        k = offsets[i]
+        for j in range(band_starts[i], band_ends[i]):
+            d_east, d_north = _delta_east_and_north_terms(q_lat[i], q_lon[i], q_cos_half_lat[i], q_sin_half_lat[i],
+                                                          s_lat[j], s_lon[j], s_cos_half_lat[j], s_sin_half_lat[j])
+            dist_squared = d_east ** 2 + d_north ** 2
+            if dist_squared <= radius_squared:
+                indices[k] = order[j]
+                dists[k] = math.sqrt(dist_squared)
+                k += 1
+
+        # keep every row ordered by target index, independently of the internal latitude ordering
+        row_order = np.argsort(indices[offsets[i]:offsets[i + 1]])
+        indices[offsets[i]:offsets[i + 1]] = indices[offsets[i]:offsets[i + 1]][row_order]
+        dists[offsets[i]:offsets[i + 1]] = dists[offsets[i]:offsets[i + 1]][row_order]
+
+    return offsets, indices, dists
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+class PreparedCoordinate:
+    """
+    An immutable set of target coordinates, prepared for repeated one-to-many geo queries.
+
+    All the per-target terms of the geo approximation (as well as a latitude-sorted index) are computed once,
+    upon creation, so that batched queries only pay for the per-query terms.
+    Results of recent queries are memoized in an LRU memo, keyed on the hash of the query batch.
+
+    Note: memoized results are shared between calls, thus all returned arrays are read-only.
+
+    Examples:
+    ---------
+    >>> sites = Coordinate(lat=[33, 33.5, 34], lon=[34, 34.5, 35], units=Coordinate.Units.DEGREES)
+    >>> prepared = sites.prepare()
+    >>> positions = Coordinate(lat=[33.1, 33.9], lon=[34.1, 34.9], units=Coordinate.Units.DEGREES)
+    >>> prepared.argmin_geo_dist(positions)
+    array([0, 2])
+    """
+
+    __slots__ = ('_coordinate', '_lat', '_lon', '_cos_half_lat', '_sin_half_lat',
+                 '_order', '_sorted_lat', '_sorted_lon', '_sorted_cos_half_lat', '_sorted_sin_half_lat',
+                 '_memo', '_memo_size', '_memo_lock')
+
+    def __init__(self, coordinate: Coordinate, memo_size: int = 128):
+        """
+
+        :param coordinate: the target coordinate(s) to prepare.
+        :param memo_size: the maximal number of memoized query results (0 disables memoization).
+        """
+        assert memo_size >= 0, 'memo_size must be non-negative'
+        setattr_ = super().__setattr__
+
+        setattr_('_coordinate', _readonly(coordinate.copy()))
+        setattr_('_lat', _readonly(np.ascontiguousarray(coordinate.lat)))
+        setattr_('_lon', _readonly(np.ascontiguousarray(coordinate.lon)))
+        setattr_('_cos_half_lat', _readonly(np.cos(self._lat / 2)))
+        setattr_('_sin_half_lat', _readonly(np.sin(self._lat / 2)))
+
+        order = np.argsort(self._lat, kind='stable')
+        setattr_('_order', _readonly(order))
+        setattr_('_sorted_lat', _readonly(self._lat[order]))
+        setattr_('_sorted_lon', _readonly(self._lon[order]))
+        setattr_('_sorted_cos_half_lat', _readonly(self._cos_half_lat[order]))
+        setattr_('_sorted_sin_half_lat', _readonly(self._sin_half_lat[order]))
+
+        setattr_('_memo', OrderedDict())
+        setattr_('_memo_size', memo_size)
+        # queries may run concurrently (e.g. by the executors) - the memo is only accessed under its lock
+        setattr_('_memo_lock', threading.Lock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __len__(self) -> int:
+        return len(self._coordinate)
+
+    @property
+    def coordinate(self) -> Coordinate:
+        """
+        This property holds the (read-only) target coordinate(s)
+        :return: a Coordinate object of the prepared targets
+        """
+        return self._coordinate
+
+    def clear_memo(self):
+        """
+        Drops all the memoized query results.
+        """
+        with self._memo_lock:
+            self._memo.clear()
+
+    def _memoized(self, key: Hashable, query: Coordinate, compute: Callable[[], Tuple[np.ndarray, ...]]):
+        if self._memo_size == 0:
+            return compute()
+
+        memo_key = (key, len(query), hash(query))
+        with self._memo_lock:
+            entry = self._memo.get(memo_key)
+            if entry is not None and entry[0] == query:  # guard against hash collisions
+                self._memo.move_to_end(memo_key)
+                return entry[1]
+
+        # the query is computed outside of the lock, so that concurrent queries run in parallel
+        result = tuple(_readonly(a) for a in compute())
+        with self._memo_lock:
+            self._memo[memo_key] = (query.copy(), result)
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _query_terms(query: Coordinate) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        lat = np.ascontiguousarray(query.lat)
+        lon = np.ascontiguousarray(query.lon)
+        return lat, lon, np.cos(lat / 2), np.sin(lat / 2)
+
+    def _target_terms(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self._lat, self._lon, self._cos_half_lat, self._sin_half_lat
+
+    def _sorted_target_terms(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self._sorted_lat, self._sorted_lon, self._sorted_cos_half_lat, self._sorted_sin_half_lat, self._order
+
+    def geo_dist(self, query: Coordinate) -> np.ndarray:
+        """
+        Calculates an approximation of the geographical distances between all pairs of query and target coordinates.
+
+        :param query: the source coordinate(s) for distance calculations
+        :return: a 2D numpy array of shape=(len(query), len(self)), of geographical distances [meters]
+        """
+        dists, = self._memoized('geo_dist', query, lambda: (
+            _pairwise_geo_dist(*self._query_terms(query), *self._target_terms()),
+        ))
+        return dists
+
+    def bearing(self, query: Coordinate) -> np.ndarray:
+        """
+        Calculates an approximation of the bearings from all query coordinates to all target coordinates.
+
+        :param query: the source coordinate(s) for bearing calculations
+        :return: a 2D numpy array of shape=(len(query), len(self)), of bearings [radians]
+        """
+        bearings, = self._memoized('bearing', query, lambda: (
+            _pairwise_bearing(*self._query_terms(query), *self._target_terms()),
+        ))
+        return bearings
+
+    def geo_dist_and_bearing(self, query: Coordinate) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates an approximation of the geographical distances and bearings between all pairs of query and target
+        coordinates.
+
+        :param query: the source coordinate(s) for distance and bearing calculations
+        :return: a Tuple of two 2D numpy arrays of shape=(len(query), len(self)), of geographical distances and
+                 bearings ([meters], [radians])
+        """
+        return self.geo_dist(query), self.bearing(query)
+
+    def _compute_nearest(self, query: Coordinate) -> Tuple[np.ndarray, np.ndarray]:
+        # not memoized - e.g. for the chunks of a query, which would only evict the memoized (whole) queries
+        assert len(self) > 0, 'nearest target is undefined for an empty target set'
+        return _nearest(*self._query_terms(query), *self._sorted_target_terms())
+
+    def _nearest(self, query: Coordinate) -> Tuple[np.ndarray, np.ndarray]:
+        return self._memoized('nearest', query, lambda: self._compute_nearest(query))
+
+    def min_geo_dist(self, query: Coordinate) -> np.ndarray:
+        """
+        Calculates an approximation of the geographical distance from every query coordinate to its nearest target.
+
+        :param query: the source coordinate(s) for distance calculations
+        :return: a 1D numpy array of shape=(len(query),), of geographical distances [meters]
+        """
+        min_dists, _ = self._nearest(query)
+        return min_dists
+
+    def argmin_geo_dist(self, query: Coordinate) -> np.ndarray:
+        """
+        Finds the nearest target for every query coordinate (ties are broken in favour of the lowest target index).
+
+        :param query: the source coordinate(s) for distance calculations
+        :return: a 1D numpy array of shape=(len(query),), of target indices
+        """
+        _, argmins = self._nearest(query)
+        return argmins
+
+    def within_radius(self, query: Coordinate, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all the targets within a geographical distance of radius from every query coordinate.
+
+        The result is given in CSR form - the targets of query i are indices[offsets[i]:offsets[i + 1]]
+        (in ascending order), and their distances are dists[offsets[i]:offsets[i + 1]].
+
+        :param query: the source coordinate(s) for distance calculations
+        :param radius: the maximal geographical distance of a matched target [meters]
+        :return: a Tuple of three 1D numpy arrays - offsets (len(query) + 1), indices and distances [meters]
+        """
+        return self._memoized(('within_radius', float(radius)), query,
+                              lambda: self._compute_within_radius(query, radius))
+
+    def _compute_within_radius(self, query: Coordinate, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return _within_radius(*self._query_terms(query), *self._sorted_target_terms(), float(radius))
@@ -0,0 +1,196 @@
+"""
+Bulk map projections of Coordinate rows - Web Mercator, equirectangular and UTM.
+
+Every projection is a parallel compiled kernel over the rows, which may write into a preallocated output. The
+projected rows are (x, y) rows in meters - easting first and northing second (note that Coordinate rows are
+(lat, lon) - northing first).
+
+    1. Web Mercator (EPSG:3857) - the spherical Mercator projection of web map tiles.
+    2. Equirectangular - longitude and latitude scaled to meters, with the longitude scaled by the cosine of a
+       standard parallel (EPSG:4087 for a standard parallel at the equator).
+    3. UTM - the transverse Mercator projection of the WGS84 ellipsoid in 6 degree zones, by the Krüger series
+       (to the third order - a sub-millimeter accuracy within the zones). Zones are signed - positive in the northern
+       hemisphere and negative in the southern hemisphere (with a false northing of 10,000km), and are detected per
+       coordinate (including the exceptions around Norway and Svalbard) unless given.
+"""
+import math
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from numba import njit, prange
+
+from vectorized2d.array2d import Array2D
+from vectorized2d.coordinate import _wrapped_angle
+
+# WGS84 ellipsoid - semi-major axis [meters] and flattening
+_WGS84_A = 6_378_137.0
+_WGS84_F = 1 / 298.257223563
+
+_UTM_SCALE = 0.9996
+_UTM_FALSE_EASTING = 500_000.0
+_UTM_FALSE_NORTHING = 10_000_000.0  # of the southern hemisphere
+
+# Krüger series terms (Karney, 2011)
+_N = _WGS84_F / (2 - _WGS84_F)
+_RECTIFYING_RADIUS = _WGS84_A / (1 + _N) * (1 + _N ** 2 / 4 + _N ** 4 / 64)
+_ALPHA = (_N / 2 - 2 * _N ** 2 / 3 + 5 * _N ** 3 / 16, 13 * _N ** 2 / 48 - 3 * _N ** 3 / 5, 61 * _N ** 3 / 240)
+_BETA = (_N / 2 - 2 * _N ** 2 / 3 + 37 * _N ** 3 / 96, _N ** 2 / 48 + _N ** 3 / 15, 17 * _N ** 3 / 480)
+_DELTA = (2 * _N - 2 * _N ** 2 / 3 - 2 * _N ** 3, 7 * _N ** 2 / 3 - 8 * _N ** 3 / 5, 56 * _N ** 3 / 15)
+_CONFORMAL_FACTOR = 2 * math.sqrt(_N) / (1 + _N)
+
+
+@njit(parallel=True, nogil=True)
+def _to_mercator(coordinates: np.ndarray, out: np.ndarray):
+    for i in prange(len(coordinates)):
+        out[i, 0] = _WGS84_A * coordinates[i, 1]
+        out[i, 1] = _WGS84_A * math.log(math.tan(math.pi / 4 + coordinates[i, 0] / 2))
+
+
+@njit(parallel=True, nogil=True)
+def _from_mercator(points: np.ndarray, out: np.ndarray):
+    for i in prange(len(points)):
+        out[i, 0] = 2 * math.atan(math.exp(points[i, 1] / _WGS84_A)) - math.pi / 2
+        out[i, 1] = points[i, 0] / _WGS84_A
+
+
+@njit(parallel=True, nogil=True)
+def _to_equirectangular(coordinates: np.ndarray, cos_standard_lat: float, out: np.ndarray):
+    for i in prange(len(coordinates)):
+        out[i, 0] = _WGS84_A * coordinates[i, 1] * cos_standard_lat
+        out[i, 1] = _WGS84_A * coordinates[i, 0]
+
+
+@njit(parallel=True, nogil=True)
+def _from_equirectangular(points: np.ndarray, cos_standard_lat: float, out: np.ndarray):
+    for i in prange(len(points)):
+        out[i, 0] = points[i, 1] / _WGS84_A
+        out[i, 1] = points[i, 0] / (_WGS84_A * cos_standard_lat)
+
+
+@njit(nogil=True)
+def _utm_zone(lat: float, lon: float) -> int:
+    lat_degrees = math.degrees(lat)
+    lon_degrees = (math.degrees(lon) + 180) % 360 - 180
+    zone = int((lon_degrees + 180) // 6) % 60 + 1
+    if 56 <= lat_degrees < 64 and 3 <= lon_degrees < 12:  # southwestern Norway
+        zone = 32
+    elif 72 <= lat_degrees < 84 and 0 <= lon_degrees < 42:  # Svalbard
+        zone = 31 if lon_degrees < 9 else 33 if lon_degrees < 21 else 35 if lon_degrees < 33 else 37
+    return zone if lat >= 0 else -zone
+
+
+@njit(nogil=True)
+def _central_meridian(zone: int) -> float:
+    return math.radians(6 * abs(zone) - 183)
+
+
+@njit(nogil=True)
+def _kruger_series(terms: Tuple[float, float, float], xi: float, eta: float) -> Tuple[float, float]:
+    """
+    Returns the sums of terms[j] * cos(2(j+1)xi) * sinh(2(j+1)eta) and of terms[j] * sin(2(j+1)xi) * cosh(2(j+1)eta),
+    with the multiple angles expanded from the double angle (a single sin/cos and exp, rather than 12 of them).
+    """
+    sin_1, cos_1 = math.sin(2 * xi), math.cos(2 * xi)
+    exp_1 = math.exp(2 * eta)
+    sinh_1, cosh_1 = (exp_1 - 1 / exp_1) / 2, (exp_1 + 1 / exp_1) / 2
+    sin_2, cos_2 = 2 * sin_1 * cos_1, 2 * cos_1 * cos_1 - 1
+    sinh_2, cosh_2 = 2 * sinh_1 * cosh_1, 2 * cosh_1 * cosh_1 - 1
+    sin_3, cos_3 = sin_1 * cos_2 + cos_1 * sin_2, cos_1 * cos_2 - sin_1 * sin_2
+    sinh_3, cosh_3 = sinh_1 * cosh_2 + cosh_1 * sinh_2, cosh_1 * cosh_2 + sinh_1 * sinh_2
+    return (terms[0] * cos_1 * sinh_1 + terms[1] * cos_2 * sinh_2 + terms[2] * cos_3 * sinh_3,
+            terms[0] * sin_1 * cosh_1 + terms[1] * sin_2 * cosh_2 + terms[2] * sin_3 * cosh_3)
+
+
+@njit(nogil=True)
+def _detected_zone(zones: np.ndarray, i: int, lat: float, lon: float) -> int:
+    zones[i] = _utm_zone(lat, lon)
+    return zones[i]
+
+
+@njit(nogil=True)
+def _given_zone(zones: np.ndarray, i: int, lat: float, lon: float) -> int:
+    return zones[i]
+
+
+@njit(parallel=True, nogil=True)
+def _to_utm(zone_of, coordinates: np.ndarray, zones: np.ndarray, out: np.ndarray):
+    for i in prange(len(coordinates)):
+        lat, lon = coordinates[i, 0], coordinates[i, 1]
+        zone = zone_of(zones, i, lat, lon)
+        d_lon = _wrapped_angle(lon - _central_meridian(zone))
+        sin_lat = math.sin(lat)
+        t = math.sinh(math.atanh(sin_lat) - _CONFORMAL_FACTOR * math.atanh(_CONFORMAL_FACTOR * sin_lat))
+        xi = math.atan2(t, math.cos(d_lon))
+        eta = math.atanh(math.sin(d_lon) / math.sqrt(1 + t * t))
+        d_eta, d_xi = _kruger_series(_ALPHA, xi, eta)
+        out[i, 0] = _UTM_FALSE_EASTING + _UTM_SCALE * _RECTIFYING_RADIUS * (eta + d_eta)
+        out[i, 1] = _UTM_SCALE * _RECTIFYING_RADIUS * (xi + d_xi) + (_UTM_FALSE_NORTHING if zone < 0 else 0.)
+
+
+@njit(parallel=True, nogil=True)
+def _from_utm(points: np.ndarray, zones: np.ndarray, out: np.ndarray):
+    for i in prange(len(points)):
+        zone = zones[i]
+        northing = points[i, 1] - (_UTM_FALSE_NORTHING if zone < 0 else 0.)
+        xi = northing / (_UTM_SCALE * _RECTIFYING_RADIUS)
+        eta = (points[i, 0] - _UTM_FALSE_EASTING) / (_UTM_SCALE * _RECTIFYING_RADIUS)
+        d_eta, d_xi = _kruger_series(_BETA, xi, eta)
+        xi_, eta_ = xi - d_xi, eta - d_eta
+        chi = math.asin(math.sin(xi_) / math.cosh(eta_))
+        sin_1, cos_1 = math.sin(2 * chi), math.cos(2 * chi)
+        sin_2 = 2 * sin_1 * cos_1
+        sin_3 = sin_1 * (2 * cos_1 * cos_1 - 1) + cos_1 * sin_2
+        out[i, 0] = chi + _DELTA[0] * sin_1 + _DELTA[1] * sin_2 + _DELTA[2] * sin_3
+        out[i, 1] = _central_meridian(zone) + math.atan2(math.sinh(eta_), math.cos(xi_))
+
+
+def to_mercator(coordinates: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = Array2D._out_buffer(out, len(coordinates))
+    _to_mercator(np.asarray(coordinates), np.asarray(out))
+    return out
+
+
+def from_mercator(points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = Array2D._out_buffer(out, len(points))
+    _from_mercator(np.asarray(points, dtype=float).reshape(-1, 2), np.asarray(out))
+    return out
+
+
+def to_equirectangular(coordinates: np.ndarray, standard_lat: float,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = Array2D._out_buffer(out, len(coordinates))
+    _to_equirectangular(np.asarray(coordinates), math.cos(standard_lat), np.asarray(out))
+    return out
+
+
+def from_equirectangular(points: np.ndarray, standard_lat: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = Array2D._out_buffer(out, len(points))
+    _from_equirectangular(np.asarray(points, dtype=float).reshape(-1, 2), math.cos(standard_lat), np.asarray(out))
+    return out
+
+
+def _utm_zones(zone: Union[int, np.ndarray], n: int) -> np.ndarray:
+    zones = np.asarray(zone, dtype=np.int64).reshape(-1)
+    assert np.all((np.abs(zones) >= 1) & (np.abs(zones) <= 60)), 'UTM zones must be between 1 and 60 (signed)'
+    # a single zone is broadcast with a zero stride
+    return zones if len(zones) == n else np.broadcast_to(zones, (n,))
+
+
+def to_utm(coordinates: np.ndarray, zone: Optional[Union[int, np.ndarray]] = None,
+           out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(coordinates)
+    out = Array2D._out_buffer(out, n)
+    if zone is None:
+        zones = np.empty(n, dtype=np.int64)
+        _to_utm(_detected_zone, np.asarray(coordinates), zones, np.asarray(out))
+    else:
+        zones = _utm_zones(zone, n)
+        _to_utm(_given_zone, np.asarray(coordinates), zones, np.asarray(out))
+    return out, zones
+
+
+def from_utm(points: np.ndarray, zone: Union[int, np.ndarray], out: Optional[np.ndarray] = None) -> np.ndarray:
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    out = Array2D._out_buffer(out, len(points))
+    _from_utm(points, _utm_zones(zone, len(points)), np.asarray(out))
+    return out
@@ -0,0 +1,297 @@
+"""
+Lightweight scalar counterparts of Point2D, Vector2D and Coordinate, for code that works on a single element at a
+time (e.g. per-message handlers).
+
+A scalar holds two plain floats in __slots__ and implements the same methods with the `math` module - there is no
+ndarray allocation, no __array_finalize__ and no numba dispatch, which dominate the cost of the array types for N=1.
+The formulas are the same ones of the array types, so that both paths agree (up to floating point rounding).
+"""
+from __future__ import annotations
+
+import math
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from vectorized2d.array2d import Array2D
+from vectorized2d.coordinate import _EARTH_RADIUS, Coordinate
+from vectorized2d.point2d import Point2D
+from vectorized2d.utils import units as units
+from vectorized2d.vector2d import Vector2D
+
+
+class Scalar2D:
+    """
+    A single 2D element, the scalar counterpart of Array2D.
+    """
+    __slots__ = ('x1', 'x2')
+    _array_type = Array2D
+
+    def __init__(self, x1: float, x2: float):
+        self.x1 = float(x1)
+        self.x2 = float(x2)
+
+    @classmethod
+    def from_array(cls, array: Array2D) -> Scalar2D:
+        """
+        Creates a scalar from a single-element (1x2) array.
+
+        :param array: an array of shape=(1x2) (or of shape=(2,))
+        :return: the scalar of the array element
+        """
+        array = np.asarray(array).reshape(-1)
+        assert len(array) == 2, 'only a single element array can be converted to a scalar'
+        return cls._from_values(array[0], array[1])
+
+    @classmethod
+    def _from_values(cls, x1: float, x2: float) -> Scalar2D:
+        # bypasses the (possibly keyword-only) constructors of the subclasses
+        scalar = cls.__new__(cls)
+        Scalar2D.__init__(scalar, x1, x2)
+        return scalar
+
+    def to_array(self) -> Array2D:
+        """
+        :return: the array type counterpart of the scalar - of shape=(1x2)
+        """
+        return np.array([[self.x1, self.x2]]).view(self._array_type)
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.x1
+        yield self.x2
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Scalar2D):
+            return NotImplemented
+        return self.x1 == other.x1 and self.x2 == other.x2
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.x1!r}, {self.x2!r})'
+
+    def __add__(self, other: Scalar2D) -> Scalar2D:
+        return self._from_values(self.x1 + other.x1, self.x2 + other.x2)
+
+    def __sub__(self, other: Scalar2D) -> Scalar2D:
+        return self._from_values(self.x1 - other.x1, self.x2 - other.x2)
+
+    def __mul__(self, factor: float) -> Scalar2D:
+        return self._from_values(self.x1 * factor, self.x2 * factor)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor: float) -> Scalar2D:
+        return self._from_values(self.x1 / divisor, self.x2 / divisor)
+
+    def __neg__(self) -> Scalar2D:
+        return self._from_values(-self.x1, -self.x2)
+
+    @property
+    def norm(self) -> float:
+        return math.sqrt(self.x1 ** 2 + self.x2 ** 2)
+
+    @property
+    def norm_squared(self) -> float:
+        return self.x1 ** 2 + self.x2 ** 2
+
+    def normalized(self) -> Scalar2D:
+        norm = self.norm
+        return self / norm if norm != 0 else self._from_values(self.x1, self.x2)
+
+
+class ScalarPoint2D(Scalar2D):
+    """
+    A single 2D point, the scalar counterpart of Point2D.
+    """
+    __slots__ = ()
+    _array_type = Point2D
+
+    def euclid_dist(self, other: ScalarPoint2D) -> float:
+        """
+        Calculate the euclidean distance between self and other.
+
+        :param other: the target point for distance calculations
+        :return: the euclidean distance between self and other
+        """
+        return math.hypot(self.x1 - other.x1, self.x2 - other.x2)
+
+    def euclid_dist_squared(self, other: ScalarPoint2D) -> float:
+        """
+        Calculate the euclidean distance squared between self and other.
+
+        :param other: the target point for distance calculations
+        :return: the euclidean distance squared between self and other
+        """
+        return (self.x1 - other.x1) ** 2 + (self.x2 - other.x2) ** 2
+
+
+class ScalarVector2D(Scalar2D):
+    """
+    A single 2D vector, the scalar counterpart of Vector2D.
+    """
+    __slots__ = ()
+    _array_type = Vector2D
+    Units = Vector2D.Units
+
+    @classmethod
+    def from_polar(cls, magnitude: float, direction: float,
+                   direction_units: Units = Vector2D.Units.RADIANS) -> ScalarVector2D:
+        """
+
+        :param magnitude: the magnitude of a physical quantity vector.
+        :param direction: the direction of a physical quantity vector.
+        :param direction_units: an enum, specifies whether the input direction is given in radians or degrees.
+        :return: a ScalarVector2D object
+        """
+        if direction_units is Vector2D.Units.DEGREES:
+            direction = math.radians(direction)
+        return cls(magnitude * math.cos(direction), magnitude * math.sin(direction))
+
+    @property
+    def direction(self) -> float:
+        """
+        Returns the (positive - between 0 and 2*pi) direction of the vector in radians.
+        """
+        return math.atan2(self.x2, self.x1) % (2 * math.pi)
+
+    def dot(self, other: ScalarVector2D) -> float:
+        return self.x1 * other.x1 + self.x2 * other.x2
+
+    def cross(self, other: ScalarVector2D) -> float:
+        return self.x1 * other.x2 - self.x2 * other.x1
+
+    def perp(self) -> ScalarVector2D:
+        """
+        Returns the perpendicular vector - rotated by 90 degrees.
+        """
+        return self._from_values(-self.x2, self.x1)
+
+    def project_onto(self, onto: ScalarVector2D) -> ScalarVector2D:
+        """
+        Calculate a projection of itself onto another vector.
+
+        :param onto: a direction vector to project itself onto.
+        :return: the projected vector.
+        """
+        onto_norm_squared = onto.norm_squared
+        return onto * (self.dot(onto) / onto_norm_squared if onto_norm_squared else 0.)
+
+    def rotated(self, rotation_angle: float, rotation_units: Units = Vector2D.Units.RADIANS) -> ScalarVector2D:
+        """
+        Calculates a rotated vector by given rotation angle
+        """
+        if rotation_units is Vector2D.Units.DEGREES:
+            rotation_angle = math.radians(rotation_angle)
+        return self.from_polar(self.norm, self.direction + rotation_angle)
+
+    def angle_to(self, v_towards: ScalarVector2D) -> float:
+        """
+        Returns the angle between the current vector and v_towards.
+        The angle is defined such that [(self.direction + angle) % 2*pi = v_towards.direction]
+        """
+        dot, cross = self.dot(v_towards), self.cross(v_towards)
+        if dot == 0 and cross == 0:  # a zero vector (atan2 of signed zeros is either 0 or pi)
+            return 0.
+        angle = math.atan2(cross, dot)
+        return angle if angle != math.pi else -math.pi
+
+    def angle_between(self, other: ScalarVector2D) -> float:
+        """
+        Returns the (unsigned - between 0 and pi) angle between the current vector and other.
+        """
+        dot, cross = self.dot(other), self.cross(other)
+        if dot == 0 and cross == 0:  # a zero vector (atan2 of signed zeros is either 0 or pi)
+            return 0.
+        return math.atan2(abs(cross), dot)
+
+
+class ScalarCoordinate(ScalarPoint2D):
+    """
+    A single 2D spatial coordinate (latitude and longitude) in radians, the scalar counterpart of Coordinate.
+    """
+    __slots__ = ()
+    _array_type = Coordinate
+    Units = Coordinate.Units
+
+    def __init__(self, *, lat: float, lon: float, units: Units = Coordinate.Units.RADIANS):
+        """
+
+        :param lat: the latitude of the coordinate.
+        :param lon: the longitude of the coordinate.
+        :param units: an enum, specifies whether the input lan/lon is given in radians or degrees.
+        """
+        if units is Coordinate.Units.DEGREES:
+            lat, lon = math.radians(lat), math.radians(lon)
+        super().__init__(lat, lon)
+
+    @property
+    def lat(self) -> float:
+        return self.x1
+
+    @property
+    def lon(self) -> float:
+        return self.x2
+
+    def _delta_east_and_north(self, other: ScalarCoordinate) -> Tuple[float, float]:
+        d_north = math.degrees(other.x1 - self.x1) * 60
+        d_east = math.degrees(other.x2 - self.x2) * 60 * math.cos((self.x1 + other.x1) / 2)
+        return d_east * units.NM_TO_METERS, d_north * units.NM_TO_METERS
+
+    def geo_dist(self, other: ScalarCoordinate) -> float:
+        """
+        Calculates an approximation of the geographical distance between self and other.
+
+        :param other: the target coordinate for distance calculations
+        :return: the geographical distance between self and other [meters]
+        """
+        d_east, d_north = self._delta_east_and_north(other)
+        return math.sqrt(d_east ** 2 + d_north ** 2)
+
+    def geo_dist_squared(self, other: ScalarCoordinate) -> float:
+        """
+        Calculates an approximation the geographical distance squared between self and other.
+
+        :param other: the target coordinate for distance calculations
+        :return: the geographical distance squared between self and other [meters**2]
+        """
+        d_east, d_north = self._delta_east_and_north(other)
+        return d_east ** 2 + d_north ** 2
+
+    def bearing(self, other: ScalarCoordinate) -> float:
+        """
+        Calculates an approximation of the bearing between self and other.
+
+        :param other: the target coordinate for bearing calculations
+        :return: the bearing between self and other [radians]
+        """
+        d_east, d_north = self._delta_east_and_north(other)
+        return math.atan2(d_east, d_north) % (2 * math.pi)
+
+    def geo_dist_and_bearing(self, other: ScalarCoordinate) -> Tuple[float, float]:
+        """
+        Calculates an approximation of the geographical distance and bearing between self and other.
+
+        :param other: the target coordinate for distance and bearing calculations
+        :return: a Tuple of the geographical distance and bearing between self and other ([meters], [radians])
+        """
+        d_east, d_north = self._delta_east_and_north(other)
+        return math.sqrt(d_east ** 2 + d_north ** 2), math.atan2(d_east, d_north) % (2 * math.pi)
+
+    def shifted(self, geo_dist: float, bearing: float) -> ScalarCoordinate:
+        """
+        Calculates a coordinate shifted by given distance and bearing.
+
+        :param geo_dist: the distance to the shifted coordinate [meters]
+        :param bearing: the bearing to the shifted coordinate [radians]
+        :return: a ScalarCoordinate object that represents the coordinate shifted by given distance and bearing
+        """
+        angular_dist = geo_dist / _EARTH_RADIUS
+        sin_angular_dist = math.sin(angular_dist)
+        cos_angular_dist = math.cos(angular_dist)
+        sin_lat = math.sin(self.x1)
+        cos_lat = math.cos(self.x1)
+        sin_shifted_lat = sin_lat * cos_angular_dist + cos_lat * sin_angular_dist * math.cos(bearing)
+        shifted_lon = self.x2 + math.atan2(math.sin(bearing) * sin_angular_dist * cos_lat,
+                                           cos_angular_dist - sin_lat * sin_shifted_lat)
+        return self._from_values(math.asin(sin_shifted_lat), shifted_lon)
@@ -0,0 +1,124 @@
+"""
+A compact uniform grid over 2D rows, used to accelerate spatial joins.
+
+Rows are bucketed into cells of a regular grid, and are ordered by their (row-major) cell key. Thus, a run of
+neighbouring cells along a single grid row is a contiguous range of keys, that is found with two binary searches.
+The grid is held in plain arrays and tuples, so that it can be built and queried from within compiled kernels.
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+# The largest number of cells (keys are int64)
+_MAX_CELLS = 2.0 ** 62
+
+# (x0, y0, cell_size, n_cols, n_rows, order, sorted_keys)
+Grid = Tuple[float, float, float, int, int, np.ndarray, np.ndarray]
+
+
+@njit(nogil=True)
+def build_grid(x: np.ndarray, y: np.ndarray, cell_size: float) -> Grid:
+    """
+    Buckets the rows (x, y) into a grid of square cells of (at least) cell_size.
+    The cells are coarsened when needed, so that the number of cells fits the int64 keys.
+    """
+    if len(x) == 0:
+        return 0.0, 0.0, 1.0, 1, 1, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    x0, y0 = x.min(), y.min()
+    x_extent, y_extent = x.max() - x0, y.max() - y0
+    if cell_size <= 0:
+        cell_size = max(x_extent, y_extent, 1.0)
+    while (np.floor(x_extent / cell_size) + 1) * (np.floor(y_extent / cell_size) + 1) > _MAX_CELLS:
+        cell_size *= 2
+    n_cols = int(math.floor(x_extent / cell_size)) + 1
+    n_rows = int(math.floor(y_extent / cell_size)) + 1
+
+    keys = np.empty(len(x), dtype=np.int64)
+    for i in range(len(x)):
+        col = min(int(math.floor((x[i] - x0) / cell_size)), n_cols - 1)
+        row = min(int(math.floor((y[i] - y0) / cell_size)), n_rows - 1)
+        keys[i] = row * n_cols + col
+    order = np.argsort(keys, kind='mergesort')
+    return x0, y0, cell_size, n_cols, n_rows, order, keys[order]
+
+
+@njit(nogil=True)
+def grid_cell(grid: Grid, x: float, y: float) -> Tuple[float, float]:
+    """
+    Returns the (unclamped) column and row of the grid cell of (x, y), as floats.
+    """
+    x0, y0, cell_size = grid[0], grid[1], grid[2]
+    return np.floor((x - x0) / cell_size), np.floor((y - y0) / cell_size)
+
+
+@njit(nogil=True)
+def grid_row_range(grid: Grid, row: float, col_start: float, col_end: float) -> Tuple[int, int]:
+    """
+    Returns the range [lo, hi) of positions (into the grid order) of the rows in cells [col_start, col_end]
+    of grid row `row`. Cells outside of the grid are ignored.
+    """
+    n_cols, n_rows, sorted_keys = grid[3], grid[4], grid[6]
+    col_start = max(col_start, 0.0)
+    col_end = min(col_end, n_cols - 1.0)
+    if row < 0 or row >= n_rows or col_start > col_end:
+        return 0, 0
+    row_key = int(row) * n_cols
+    lo = np.searchsorted(sorted_keys, row_key + int(col_start), side='left')
+    hi = np.searchsorted(sorted_keys, row_key + int(col_end), side='right')
+    return lo, hi
+
+
+@njit(nogil=True)
+def sort_csr_row(indices: np.ndarray, values: np.ndarray, start: int, end: int):
+    """
+    Sorts a single row [start, end) of a CSR structure (in place) by index.
+    """
+    order = np.argsort(indices[start:end])
+    indices[start:end] = indices[start:end][order]
+    values[start:end] = values[start:end][order]
+
+
+@njit(nogil=True)
+def counts_to_offsets(counts: np.ndarray) -> np.ndarray:
+    """
+    Converts per-row counts into CSR offsets.
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    return offsets
+
+
+@njit(nogil=True)
+def radix_argsort(keys: np.ndarray, n_bits: int) -> np.ndarray:
+    """
+    Returns the (stable) sorting order of non-negative int64 keys of up to n_bits bits - by a least significant digit
+    radix sort of 16 bit digits, which carries the keys along with the order (so that every pass reads sequentially).
+    """
+    n = len(keys)
+    if n == 0:
+        return np.arange(0)
+    order, order_buffer = np.arange(n), np.empty(n, dtype=np.int64)
+    sorted_keys, keys_buffer = keys.copy(), np.empty(n, dtype=np.int64)
+    counts = np.empty(1 << 16, dtype=np.int64)
+    for shift in range(0, n_bits, 16):
+        counts[:] = 0
+        for i in range(n):
+            counts[(sorted_keys[i] >> shift) & 0xFFFF] += 1
+        if counts[(sorted_keys[0] >> shift) & 0xFFFF] == n:
+            continue  # a single digit - the order is unchanged
+        position = 0
+        for digit in range(1 << 16):
+            count = counts[digit]
+            counts[digit] = position
+            position += count
+        for i in range(n):
+            digit = (sorted_keys[i] >> shift) & 0xFFFF
+            order_buffer[counts[digit]] = order[i]
+            keys_buffer[counts[digit]] = sorted_keys[i]
+            counts[digit] += 1
+        order, order_buffer = order_buffer, order
+        sorted_keys, keys_buffer = keys_buffer, sorted_keys
+    return order
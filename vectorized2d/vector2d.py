@@ -1,12 +1,55 @@
 from __future__ import annotations
 
-from typing import Iterable, Union
+import math
+from typing import Iterable, Optional, Tuple, Union
 
 import numpy as np
 from fast_enum import FastEnum
-from numba import njit
+from numba import njit, prange
 
 from vectorized2d import Array2D
+from vectorized2d.point2d import Point2D
+
+
+@njit(nogil=True)
+def _dot_terms(x1: float, y1: float, x2: float, y2: float) -> float:
+    return x1 * x2 + y1 * y2
+
+
+@njit(nogil=True)
+def _cross_terms(x1: float, y1: float, x2: float, y2: float) -> float:
+    return x1 * y2 - y1 * x2
+
+
+@njit(nogil=True)
+def _angle_to_terms(x1: float, y1: float, x2: float, y2: float) -> float:
+    # the signed angle from the first vector to the second, in [-pi, pi) - as the difference of their directions
+    dot, cross = x1 * x2 + y1 * y2, x1 * y2 - y1 * x2
+    if dot == 0 and cross == 0:  # a zero vector (atan2 of signed zeros is either 0 or pi)
+        return 0.
+    angle = math.atan2(cross, dot)
+    return angle if angle != math.pi else -math.pi
+
+
+@njit(nogil=True)
+def _angle_between_terms(x1: float, y1: float, x2: float, y2: float) -> float:
+    dot, cross = x1 * x2 + y1 * y2, x1 * y2 - y1 * x2
+    if dot == 0 and cross == 0:  # a zero vector (atan2 of signed zeros is either 0 or pi)
+        return 0.
+    return math.atan2(abs(cross), dot)
+
+
+@njit(nogil=True)
+def _polar_lerp(vectors: np.ndarray, i: int, j: int, weight: float, out: np.ndarray, row: int):
+    # interpolates the magnitude linearly, and the direction along the shorter arc between rows i and j
+    magnitude = math.hypot(vectors[i, 0], vectors[i, 1])
+    next_magnitude = math.hypot(vectors[j, 0], vectors[j, 1])
+    direction = math.atan2(vectors[i, 1], vectors[i, 0])
+    turn = (math.atan2(vectors[j, 1], vectors[j, 0]) - direction + math.pi) % (2 * math.pi) - math.pi
+    magnitude += weight * (next_magnitude - magnitude)
+    direction += weight * turn
+    out[row, 0] = magnitude * math.cos(direction)
+    out[row, 1] = magnitude * math.sin(direction)
 
 
 class Vector2D(Array2D):
@@ -18,6 +61,8 @@ class Vector2D(Array2D):
         RADIANS = 0
         DEGREES = 1
 
+    Pairing = Point2D.Pairing
+
     def __new__(cls,
                 *,  # make magnitude and direction keyword-only arguments
                 magnitude: Union[float, np.ndarray, Iterable[float]],
@@ -65,20 +110,164 @@ class Vector2D(Array2D):
         return super().__new__(cls, input_array=input_array)
 
     @staticmethod
-    @njit
-    def _project_onto(v: Vector2D, onto_unit: Vector2D) -> np.ndarray:
-        projection_magnitude = (v[:, 0] * onto_unit[:, 0] + v[:, 1] * onto_unit[:, 1]).reshape(-1, 1)
-        return projection_magnitude * onto_unit
+    @njit(parallel=True, nogil=True)
+    def _from_polar(magnitude: np.ndarray, direction: np.ndarray, scale: float) -> np.ndarray:
+        out = np.empty((len(magnitude), 2))
+        for i in prange(len(magnitude)):
+            theta = direction[i] * scale
+            out[i, 0] = magnitude[i] * math.cos(theta)
+            out[i, 1] = magnitude[i] * math.sin(theta)
+        return out
+
+    @classmethod
+    def from_polar(cls, magnitude: Union[float, np.ndarray, Iterable[float]],
+                   direction: Union[float, np.ndarray, Iterable[float]],
+                   direction_units: Units = Units.RADIANS) -> Vector2D:
+        """
+        Creates a Vector2D object from magnitude(s) and direction(s), in a single fused pass (with no temporaries)
+        into a C-contiguous Nx2 buffer.
+        A scalar magnitude/direction is broadcast to the length of the other one.
+
+        :param magnitude: magnitude(s) of a physical quantity vector(s).
+        :param direction: direction(s) of a physical quantity vector(s).
+        :param direction_units: an enum, specifies whether the input direction is given in radians or degrees.
+        :return: a Vector2D object
+        """
+        magnitude, direction = cls._broadcast_columns(magnitude, direction)
+        scale = np.pi / 180 if direction_units is Vector2D.Units.DEGREES else 1.0
+        return cls._from_polar(magnitude, direction, scale).view(cls)
+
+    def interpolate(self, times: Union[np.ndarray, Iterable[float]], query_times: Union[np.ndarray, Iterable[float]],
+                    *, offsets: Optional[Union[np.ndarray, Iterable[int]]] = None,
+                    query_offsets: Optional[Union[np.ndarray, Iterable[int]]] = None) -> Vector2D:
+        """
+        Interpolates a track (or a batch of tracks) of time-indexed vectors at query times (see
+        Array2D.interpolate). The magnitude is interpolated linearly, and the direction is interpolated along the
+        shorter arc (e.g. from 350 to 10 degrees through 0 degrees), so that a turning vector keeps its magnitude.
+
+        :param times: the (non-decreasing, within every track) time of every vector
+        :param query_times: the times to interpolate the tracks at
+        :param offsets: optional CSR offsets of a batch of tracks - track k is the rows offsets[k]:offsets[k + 1]
+        :param query_offsets: optional CSR offsets of the query times of every track - otherwise, every track is
+                              interpolated at all the query times
+        :return: the interpolated vectors (nan outside the time span of their track)
+        """
+        return self._interpolate_with(_polar_lerp, times, query_times, offsets, query_offsets)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _aligned_terms(terms, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        out = np.empty(len(a))
+        for i in prange(len(a)):
+            out[i] = terms(a[i, 0], a[i, 1], b[i, 0], b[i, 1])
+        return out
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _all_terms(terms, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        out = np.empty((len(a), len(b)))
+        for i in prange(len(a)):
+            for j in range(len(b)):
+                out[i, j] = terms(a[i, 0], a[i, 1], b[j, 0], b[j, 1])
+        return out
+
+    @staticmethod
+    def _broadcast_rows(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        assert len(a) == len(b) or len(a) == 1 or len(b) == 1, \
+            'ALIGNED pairing is supported only for the same number of vectors (or a single vector)'
+        # broadcasting is zero-copy (a single vector is read with a zero stride)
+        n = max(len(a), len(b))
+        return tuple(x if len(x) == n else np.broadcast_to(x, (n, 2)) for x in (a, b))
+
+    def _pairwise_terms(self, terms, other: Vector2D, pairing: Pairing) -> np.ndarray:
+        a = self.view(np.ndarray)
+        b = np.asarray(other, dtype=float).reshape(-1, 2)
+        if pairing is self.Pairing.ALL and len(a) > 1 and len(b) > 1:
+            return self._all_terms(terms, a, b)
+        terms = self._aligned_terms(terms, *self._broadcast_rows(a, b))
+        return terms.reshape(len(a), len(b)) if pairing is self.Pairing.ALL else terms
+
+    def dot(self, other: Vector2D, *, pairing: Pairing = Pairing.ALIGNED) -> np.ndarray:
+        """
+        Calculates the dot product(s) of self and other, in a single compiled pass.
+
+        Examples:
+        --------
+        >>> v1 = Vector2D.from_polar([1, 2], [0, 90], direction_units=Vector2D.Units.DEGREES)
+
+        >>> v1.dot(Array2D([3., 4.]))
+        array([3., 8.])
+
+        :param other: the other vector(s) - a single vector is broadcast to all the vectors of self (for ALIGNED)
+        :param pairing: an enum, specifies whether to calculate the products of ALIGNED (corresponding) vectors, or of
+                        ALL the pairs of vectors (see Point2D.Pairing)
+        :return: a 1D numpy array of the products of the aligned pairs, or (for ALL) a 2D numpy array of
+                 shape=(len(self), len(other))
+        """
+        return self._pairwise_terms(_dot_terms, other, pairing)
+
+    def cross(self, other: Vector2D, *, pairing: Pairing = Pairing.ALIGNED) -> np.ndarray:
+        """
+        Calculates the (scalar) cross product(s) of self and other - positive when other is in the direction of
+        rotation (counterclockwise) from self, in a single compiled pass.
+
+        :param other: the other vector(s) - a single vector is broadcast to all the vectors of self (for ALIGNED)
+        :param pairing: an enum, specifies whether to calculate the products of ALIGNED (corresponding) vectors, or of
+                        ALL the pairs of vectors (see Point2D.Pairing)
+        :return: a 1D numpy array of the products of the aligned pairs, or (for ALL) a 2D numpy array of
+                 shape=(len(self), len(other))
+        """
+        return self._pairwise_terms(_cross_terms, other, pairing)
+
+    def angle_between(self, other: Vector2D, *, pairing: Pairing = Pairing.ALIGNED) -> np.ndarray:
+        """
+        Calculates the (unsigned - between 0 and pi) angle(s) between self and other in radians, in a single compiled
+        pass (with no directions).
+
+        :param other: the other vector(s) - a single vector is broadcast to all the vectors of self (for ALIGNED)
+        :param pairing: an enum, specifies whether to calculate the angles of ALIGNED (corresponding) vectors, or of
+                        ALL the pairs of vectors (see Point2D.Pairing)
+        :return: a 1D numpy array of the angles of the aligned pairs, or (for ALL) a 2D numpy array of
+                 shape=(len(self), len(other))
+        """
+        return self._pairwise_terms(_angle_between_terms, other, pairing)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _perp(v: np.ndarray) -> np.ndarray:
+        out = np.empty((len(v), 2))
+        for i in prange(len(v)):
+            out[i, 0] = -v[i, 1]
+            out[i, 1] = v[i, 0]
+        return out
+
+    def perp(self) -> Vector2D:
+        """
+        Returns the perpendicular vector(s) - rotated by 90 degrees (with no trigonometry).
+        """
+        return self._perp(self.view(np.ndarray)).view(Vector2D)
+
+    @staticmethod
+    @njit(parallel=True, nogil=True)
+    def _project_onto(v: np.ndarray, onto: np.ndarray) -> np.ndarray:
+        out = np.empty((len(v), 2))
+        for i in prange(len(v)):
+            onto_norm_squared = onto[i, 0] ** 2 + onto[i, 1] ** 2
+            # the projection onto a zero vector is a zero vector
+            scale = (v[i, 0] * onto[i, 0] + v[i, 1] * onto[i, 1]) / onto_norm_squared if onto_norm_squared else 0.
+            out[i, 0] = scale * onto[i, 0]
+            out[i, 1] = scale * onto[i, 1]
+        return out
 
     def project_onto(self, onto: Vector2D) -> Vector2D:
         """
-        Calculate a projection of itself onto another vector.
+        Calculate a projection of itself onto another vector, in a single compiled pass.
 
-        :param onto: a direction vector to project itself onto.
+        :param onto: a direction vector(s) to project itself onto (a single vector is broadcast to all the vectors).
         :return: the projected vector.
         """
-        onto_unit = onto.normalized()
-        return self._project_onto(self, onto_unit).view(Vector2D)
+        v, onto = self._broadcast_rows(self.view(np.ndarray), np.asarray(onto, dtype=float).reshape(-1, 2))
+        return self._project_onto(v, onto).view(Vector2D)
 
     def rotated(self, rotation_angle: Union[float, np.ndarray, Iterable[float]],
                 rotation_units: Units = Units.RADIANS) -> Vector2D:
@@ -90,26 +279,15 @@ class Vector2D(Array2D):
         new_direction = self.direction + rotation_angle
         return Vector2D(magnitude=self.norm, direction=new_direction)
 
-    @staticmethod
-    @njit
-    def _calc_angle_diff(direction_from: np.ndarray, direction_to: np.ndarray) -> np.ndarray:
-        raw_diff = direction_to - direction_from
-        diff = np.abs(raw_diff) % (2 * np.pi)
-        diff[diff > np.pi] = 2 * np.pi - diff[diff > np.pi]
-
-        mask = ((raw_diff >= -np.pi) & (raw_diff <= 0)) | ((raw_diff >= np.pi) & (raw_diff <= 2 * np.pi))
-        diff[mask] *= -1
-        return diff
-
     def angle_to(self, v_towards: Vector2D):
         """
-        Returns the angle between the current vector(s) and v_towards.
+        Returns the angle between the current vector(s) and v_towards, in a single compiled pass.
         The angle is defined such that [(self.direction + angle) % 2*pi = v_towards.direction]
         """
-        return self._calc_angle_diff(direction_from=self.direction, direction_to=v_towards.direction)
+        return self._pairwise_terms(_angle_to_terms, v_towards, self.Pairing.ALIGNED)
 
     @staticmethod
-    @njit
+    @njit(nogil=True)
     def _direction(v: Vector2D) -> np.ndarray:
         return np.arctan2(v[:, 1], v[:, 0]) % (2 * np.pi)
 